@@ -0,0 +1,42 @@
+"""Add import_jobs table
+
+Revision ID: 8f3a1c2d9b47
+Revises: 5e479d4850ba
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8f3a1c2d9b47'
+down_revision: Union[str, None] = '5e479d4850ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('import_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('bytes_processed', sa.Integer(), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('success_count', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=True),
+    sa.Column('detail', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_import_jobs_id'), 'import_jobs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_import_jobs_id'), table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -0,0 +1,48 @@
+"""Add repricing_jobs table
+
+Revision ID: a9d4c6e8f152
+Revises: f7b2d8e4a913
+Create Date: 2026-10-17 20:05:41.772960
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a9d4c6e8f152'
+down_revision: Union[str, None] = 'f7b2d8e4a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('repricing_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('dry_run', sa.Boolean(), nullable=False),
+    sa.Column('reresolve', sa.Boolean(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('chunk_size', sa.Integer(), nullable=False),
+    sa.Column('last_order_id', sa.String(length=36), nullable=True),
+    sa.Column('rows_total', sa.Integer(), nullable=False),
+    sa.Column('rows_processed', sa.Integer(), nullable=False),
+    sa.Column('rows_changed', sa.Integer(), nullable=False),
+    sa.Column('rows_unresolved', sa.Integer(), nullable=False),
+    sa.Column('tax_delta', sa.Float(), nullable=False),
+    sa.Column('total_delta', sa.Float(), nullable=False),
+    sa.Column('summary', sa.JSON(), nullable=True),
+    sa.Column('detail', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_repricing_jobs_id'), 'repricing_jobs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_repricing_jobs_id'), table_name='repricing_jobs')
+    op.drop_table('repricing_jobs')
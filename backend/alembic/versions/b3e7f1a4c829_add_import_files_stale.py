@@ -0,0 +1,26 @@
+"""Add import_files.stale
+
+Revision ID: b3e7f1a4c829
+Revises: a9d4c6e8f152
+Create Date: 2026-10-17 21:14:09.318554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b3e7f1a4c829'
+down_revision: Union[str, None] = 'a9d4c6e8f152'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('import_files', sa.Column('stale', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('import_files') as batch_op:
+        batch_op.drop_column('stale')
@@ -0,0 +1,44 @@
+"""Add order_daily_stats table
+
+Revision ID: b7d2e4f1a9c3
+Revises: 8f3a1c2d9b47
+Create Date: 2026-10-17 11:04:27.552931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b7d2e4f1a9c3'
+down_revision: Union[str, None] = '8f3a1c2d9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('order_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('subtotal_sum', sa.Float(), nullable=False),
+    sa.Column('tax_sum', sa.Float(), nullable=False),
+    sa.Column('total_sum', sa.Float(), nullable=False),
+    sa.Column('rate_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    # Заповнення агрегатів з уже існуючих замовлень
+    day_expr = "date(timestamp)" if op.get_bind().dialect.name == "sqlite" else "CAST(timestamp AT TIME ZONE 'UTC' AS DATE)"
+    op.execute(f"""
+        INSERT INTO order_daily_stats (day, order_count, subtotal_sum, tax_sum, total_sum, rate_sum)
+        SELECT {day_expr}, COUNT(*), COALESCE(SUM(subtotal), 0), COALESCE(SUM(tax_amount), 0),
+               COALESCE(SUM(total_amount), 0), COALESCE(SUM(composite_tax_rate), 0)
+        FROM orders
+        WHERE timestamp IS NOT NULL
+        GROUP BY {day_expr}
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('order_daily_stats')
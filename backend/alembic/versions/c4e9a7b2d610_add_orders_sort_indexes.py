@@ -0,0 +1,55 @@
+"""Add orders timestamp and sort indexes
+
+Revision ID: c4e9a7b2d610
+Revises: b7d2e4f1a9c3
+Create Date: 2026-10-17 13:42:10.218734
+
+"""
+from typing import Sequence, Union
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c4e9a7b2d610'
+down_revision: Union[str, None] = 'b7d2e4f1a9c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_INDEXES = {
+    'ix_orders_timestamp_id': ['timestamp', 'id'],
+    'ix_orders_subtotal_id': ['subtotal', 'id'],
+    'ix_orders_composite_tax_rate_id': ['composite_tax_rate', 'id'],
+    'ix_orders_tax_amount_id': ['tax_amount', 'id'],
+    'ix_orders_total_amount_id': ['total_amount', 'id'],
+}
+
+
+def _normalize_sqlite_timestamps(bind) -> None:
+    # Раніше імпорт CSV писав час у ISO-форматі ("2025-11-04T10:00:00+00:00"), а ORM — у форматі
+    # SQLAlchemy ("2025-11-04 10:00:00.000000"). У SQLite це рядки, тому для коректних
+    # діапазонних запитів по індексу приводимо все до одного формату (UTC).
+    rows = bind.execute(sa.text("SELECT id, timestamp FROM orders WHERE timestamp LIKE '%T%'")).fetchall()
+    updates = []
+    for row_id, value in rows:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc)
+        updates.append({'id': row_id, 'ts': parsed.strftime('%Y-%m-%d %H:%M:%S.%f')})
+    if updates:
+        bind.execute(sa.text("UPDATE orders SET timestamp = :ts WHERE id = :id"), updates)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        _normalize_sqlite_timestamps(bind)
+
+    for name, columns in SORT_INDEXES.items():
+        op.create_index(name, 'orders', columns, unique=False)
+
+
+def downgrade() -> None:
+    for name in reversed(list(SORT_INDEXES)):
+        op.drop_index(name, table_name='orders')
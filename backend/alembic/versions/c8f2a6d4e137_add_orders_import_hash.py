@@ -0,0 +1,27 @@
+"""Add orders.import_hash
+
+Revision ID: c8f2a6d4e137
+Revises: b3e7f1a4c829
+Create Date: 2026-10-17 22:02:47.105392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c8f2a6d4e137'
+down_revision: Union[str, None] = 'b3e7f1a4c829'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Замовлення, імпортовані раніше, лишаються без зв'язку з файлом і не роблять його запис застарілим
+    op.add_column('orders', sa.Column('import_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('import_hash')
@@ -0,0 +1,106 @@
+"""Add jurisdiction_profiles and replace per-order JSON breakdown with profile_id
+
+Revision ID: d5f8b3c1e720
+Revises: c4e9a7b2d610
+Create Date: 2026-10-17 16:08:54.106392
+
+"""
+from typing import Sequence, Union
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd5f8b3c1e720'
+down_revision: Union[str, None] = 'c4e9a7b2d610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RATE_FIELDS = ('state_rate', 'county_rate', 'city_rate', 'special_rates')
+
+
+def _county(jurisdictions: list) -> str:
+    last = jurisdictions[-1] if jurisdictions else ""
+    for suffix in (" County (Borough)", " County"):
+        if last.endswith(suffix):
+            return last[:-len(suffix)]
+    return last
+
+
+def _backfill_profiles(bind) -> None:
+    # Кожна унікальна пара (breakdown, jurisdictions) стає профілем; JSON порівнюється як текст,
+    # бо тип json у PostgreSQL не підтримує операцію рівності
+    pairs = bind.execute(sa.text(
+        "SELECT DISTINCT CAST(breakdown AS TEXT), CAST(jurisdictions AS TEXT) FROM orders "
+        "WHERE breakdown IS NOT NULL AND jurisdictions IS NOT NULL"
+    )).fetchall()
+
+    profile_ids = {}
+    for breakdown_text, jurisdictions_text in pairs:
+        breakdown = json.loads(breakdown_text)
+        jurisdictions = json.loads(jurisdictions_text)
+        key = (_county(jurisdictions), *(round(float(breakdown.get(field) or 0.0), 6) for field in RATE_FIELDS))
+        if key not in profile_ids:
+            profile_ids[key] = bind.execute(
+                sa.text(
+                    "INSERT INTO jurisdiction_profiles (county, state_rate, county_rate, city_rate, special_rates, jurisdictions) "
+                    "VALUES (:county, :state_rate, :county_rate, :city_rate, :special_rates, :jurisdictions) RETURNING id"
+                ),
+                {'county': key[0], **dict(zip(RATE_FIELDS, key[1:])), 'jurisdictions': jurisdictions_text}
+            ).scalar_one()
+        bind.execute(
+            sa.text(
+                "UPDATE orders SET profile_id = :profile_id "
+                "WHERE CAST(breakdown AS TEXT) = :breakdown AND CAST(jurisdictions AS TEXT) = :jurisdictions"
+            ),
+            {'profile_id': profile_ids[key], 'breakdown': breakdown_text, 'jurisdictions': jurisdictions_text}
+        )
+
+
+def upgrade() -> None:
+    op.create_table('jurisdiction_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('county', sa.String(), nullable=False),
+    sa.Column('state_rate', sa.Float(), nullable=False),
+    sa.Column('county_rate', sa.Float(), nullable=False),
+    sa.Column('city_rate', sa.Float(), nullable=False),
+    sa.Column('special_rates', sa.Float(), nullable=False),
+    sa.Column('jurisdictions', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('county', 'state_rate', 'county_rate', 'city_rate', 'special_rates', name='uq_jurisdiction_profiles_rates')
+    )
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.add_column(sa.Column('profile_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_orders_profile_id', 'jurisdiction_profiles', ['profile_id'], ['id'])
+
+    _backfill_profiles(op.get_bind())
+
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('breakdown')
+        batch_op.drop_column('jurisdictions')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.add_column(sa.Column('breakdown', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('jurisdictions', sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+    profiles = bind.execute(sa.text(
+        "SELECT id, state_rate, county_rate, city_rate, special_rates, CAST(jurisdictions AS TEXT) FROM jurisdiction_profiles"
+    )).fetchall()
+    for profile_id, *rates, jurisdictions_text in profiles:
+        bind.execute(
+            sa.text("UPDATE orders SET breakdown = :breakdown, jurisdictions = :jurisdictions WHERE profile_id = :profile_id"),
+            {
+                'breakdown': json.dumps(dict(zip(RATE_FIELDS, rates))),
+                'jurisdictions': jurisdictions_text,
+                'profile_id': profile_id,
+            }
+        )
+
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_constraint('fk_orders_profile_id', type_='foreignkey')
+        batch_op.drop_column('profile_id')
+    op.drop_table('jurisdiction_profiles')
@@ -0,0 +1,75 @@
+"""Add import_files and orders.fingerprint for idempotent imports
+
+Revision ID: e6a9c4d2f831
+Revises: d5f8b3c1e720
+Create Date: 2026-10-17 17:21:36.447019
+
+"""
+from typing import Sequence, Union
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e6a9c4d2f831'
+down_revision: Union[str, None] = 'd5f8b3c1e720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _fingerprint(latitude, longitude, subtotal, timestamp) -> str:
+    # Той самий формат, що й import_dedup.fingerprint: час — мікросекунди від епохи (UTC)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    epoch_us = (timestamp - EPOCH) // timedelta(microseconds=1)
+    key = f"{latitude:.6f}|{longitude:.6f}|{subtotal:.2f}|{epoch_us}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _backfill_fingerprints(bind) -> None:
+    rows = bind.execute(sa.text(
+        "SELECT id, latitude, longitude, subtotal, timestamp FROM orders WHERE timestamp IS NOT NULL"
+    )).fetchall()
+    updates = [
+        {'id': row_id, 'fingerprint': _fingerprint(lat, lon, subtotal, ts)}
+        for row_id, lat, lon, subtotal, ts in rows
+    ]
+    for start in range(0, len(updates), BACKFILL_BATCH_SIZE):
+        bind.execute(
+            sa.text("UPDATE orders SET fingerprint = :fingerprint WHERE id = :id"),
+            updates[start:start + BACKFILL_BATCH_SIZE]
+        )
+
+
+def upgrade() -> None:
+    op.create_table('import_files',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('file_size', sa.Integer(), nullable=False),
+    sa.Column('total_processed', sa.Integer(), nullable=False),
+    sa.Column('success_count', sa.Integer(), nullable=False),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('duplicate_count', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.add_column('orders', sa.Column('fingerprint', sa.String(length=32), nullable=True))
+
+    # Відбитки для вже збережених замовлень, щоб повторні рядки старих файлів теж розпізнавалися
+    _backfill_fingerprints(op.get_bind())
+    op.create_index(op.f('ix_orders_fingerprint'), 'orders', ['fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_orders_fingerprint'), table_name='orders')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('fingerprint')
+    op.drop_table('import_files')
@@ -0,0 +1,77 @@
+"""Add orders.county_fips and order_county_daily_stats rollups
+
+Revision ID: f7b2d8e4a913
+Revises: e6a9c4d2f831
+Create Date: 2026-10-17 18:42:10.318274
+
+"""
+from typing import Sequence, Union
+import os
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f7b2d8e4a913'
+down_revision: Union[str, None] = 'e6a9c4d2f831'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GEOJSON_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "app", "data", "ny_counties.geojson")
+
+
+def _fips_by_county() -> dict:
+    # Назва округу (як у jurisdiction_profiles.county) -> FIPS з GEOID виду 05000US36041
+    with open(GEOJSON_PATH, "r", encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+    return {
+        feature["properties"].get("name", "").replace(" County", "").strip():
+            feature["properties"].get("geoid", "").rsplit("US", 1)[-1][-5:]
+        for feature in features
+    }
+
+
+def _backfill_county_fips(bind) -> None:
+    fips_by_county = _fips_by_county()
+    profiles = bind.execute(sa.text("SELECT id, county FROM jurisdiction_profiles")).fetchall()
+    for profile_id, county in profiles:
+        if county in fips_by_county:
+            bind.execute(
+                sa.text("UPDATE orders SET county_fips = :county_fips WHERE profile_id = :profile_id"),
+                {'county_fips': fips_by_county[county], 'profile_id': profile_id}
+            )
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('county_fips', sa.String(length=5), nullable=True))
+    op.create_table('order_county_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('county_fips', sa.String(length=5), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('subtotal_sum', sa.Float(), nullable=False),
+    sa.Column('tax_sum', sa.Float(), nullable=False),
+    sa.Column('total_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'county_fips')
+    )
+
+    _backfill_county_fips(op.get_bind())
+    op.create_index(op.f('ix_orders_county_fips'), 'orders', ['county_fips'], unique=False)
+
+    # Заповнення агрегатів за округами з уже існуючих замовлень
+    day_expr = "date(timestamp)" if op.get_bind().dialect.name == "sqlite" else "CAST(timestamp AT TIME ZONE 'UTC' AS DATE)"
+    op.execute(f"""
+        INSERT INTO order_county_daily_stats (day, county_fips, order_count, subtotal_sum, tax_sum, total_sum)
+        SELECT {day_expr}, county_fips, COUNT(*), COALESCE(SUM(subtotal), 0), COALESCE(SUM(tax_amount), 0),
+               COALESCE(SUM(total_amount), 0)
+        FROM orders
+        WHERE timestamp IS NOT NULL AND county_fips IS NOT NULL
+        GROUP BY {day_expr}, county_fips
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('order_county_daily_stats')
+    op.drop_index(op.f('ix_orders_county_fips'), table_name='orders')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('county_fips')
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Optional
 import os
 class Settings(BaseSettings):
     """
@@ -23,6 +24,57 @@ class Settings(BaseSettings):
     NY_LON_MIN: float = -79.762590
     NY_LON_MAX: float = -71.777491
 
+    # Розмір комірки (у градусах) сітки швидкого пошуку округу
+    GEO_GRID_CELL_SIZE: float = 0.01
+
+    # Паралельний розрахунок податків: кількість процесів (1 — без пулу) та мінімальний розмір батчу
+    TAX_PARALLEL_WORKERS: int = 1
+    TAX_PARALLEL_MIN_ROWS: int = 200_000
+
+    # Потоковий імпорт CSV: розмір блоку (рядків) та частота фіксації транзакції (у блоках)
+    IMPORT_CHUNK_SIZE: int = 50_000
+    IMPORT_COMMIT_EVERY: int = 1
+
+    # Кеш котирувань: кількість записів LRU та точність квантування координат (знаків після коми)
+    QUOTE_CACHE_SIZE: int = 100_000
+    QUOTE_CACHE_PRECISION: int = 5
+
+    # Максимальна кількість замовлень в одному запиті POST /orders/batch
+    ORDER_BATCH_MAX_SIZE: int = 5000
+
+    # Фонові завдання імпорту: кількість воркерів та каталог для тимчасових файлів (None — системний)
+    IMPORT_WORKERS: int = 2
+    IMPORT_JOBS_DIR: Optional[str] = None
+
+    # Пул CPU-роботи (податки, розбір CSV) поза циклом подій: потоки, довжина черги очікування
+    # та значення Retry-After (секунди) для відхилених запитів, коли черга заповнена
+    CPU_WORKERS: int = 2
+    CPU_QUEUE_SIZE: int = 8
+    CPU_RETRY_AFTER: int = 5
+
+    # Розмір партії масового запису замовлень (executemany у SQLite, COPY у PostgreSQL)
+    BULK_INSERT_BATCH_SIZE: int = 10_000
+
+    # Кеш перевірених адміністраторів (TTL у секундах, кількість записів) та потоки для bcrypt
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_HASH_WORKERS: int = 2
+
+    # Побудова податкового сервісу (геодані, R-Tree, ставки) під час старту воркера, а не на першому запиті
+    WARMUP_ON_STARTUP: bool = True
+
+    # Переоцінка збережених замовлень: розмір блоку (рядків), що оновлюється в одній транзакції
+    REPRICE_CHUNK_SIZE: int = 10_000
+
+    # Пропуск рядків CSV, що вже є в БД (за відбитком координат, суми та часу), якщо запит не вказує dedupe
+    IMPORT_DEDUPE_ROWS: bool = False
+
+    # Профілювання окремих запитів на вимогу (заголовок X-Profile або ?profile=1, лише для адміністраторів):
+    # каталог для профілів та формат за замовчуванням ("pstats" — cProfile, "html" — pyinstrument)
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "profiles"
+    PROFILING_FORMAT: str = "pstats"
+
     # Ігноруємо зайві змінні з .env, щоб не викликати помилок Pydantic
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
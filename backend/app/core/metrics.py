@@ -0,0 +1,229 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Межі бакетів гістограм тривалості (секунди): від швидких запитів до імпорту великих файлів
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+THROUGHPUT_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series["count"] if series else 0
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted((key, dict(series, counts=list(series["counts"]))) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series["counts"]):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Значення, що зчитується функцією в момент експорту (стан пулів, кешів).
+    kind="counter" — для лічильників, які вже ведуться самим компонентом.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback, kind: str = "gauge"):
+        super().__init__(name, documentation)
+        self._callback = callback
+        self.kind = kind
+
+    def _samples(self) -> list:
+        return [f"{self.name} {_format_value(self._callback())}"]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Метрика {metric.name} вже зареєстрована")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Тривалість етапів обробки замовлень: upload_read, csv_parse, validate, spatial_join,
+# tax_math, prepare_rows, db_insert
+PIPELINE_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "order_pipeline_stage_seconds", "Тривалість етапів імпорту та розрахунку податків", labels=("stage",)
+))
+IMPORT_ROWS_PER_SECOND = REGISTRY.register(Histogram(
+    "order_import_rows_per_second", "Швидкість імпорту CSV (рядків за секунду)", labels=("mode",),
+    buckets=THROUGHPUT_BUCKETS
+))
+IMPORT_ROWS_TOTAL = REGISTRY.register(Counter(
+    "order_import_rows_total", "Кількість імпортованих рядків за результатом", labels=("result",)
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Тривалість HTTP-запитів за маршрутом", labels=("method", "route", "status")
+))
+SPATIAL_QUERIES_TOTAL = REGISTRY.register(Counter(
+    "spatial_index_queries_total", "Кількість запитів до просторового індексу STRtree", labels=("kind",)
+))
+SPATIAL_QUERY_POINTS_TOTAL = REGISTRY.register(Counter(
+    "spatial_index_query_points_total", "Кількість точок, для яких знадобився STRtree (поза сіткою)", labels=("kind",)
+))
+SPATIAL_AMBIGUOUS_POINTS_TOTAL = REGISTRY.register(Counter(
+    "spatial_index_ambiguous_points_total", "Точки у перекритті буферизованих полігонів кількох округів",
+    labels=("kind",)
+))
+GRID_LOOKUPS_TOTAL = REGISTRY.register(Counter(
+    "geo_grid_lookups_total", "Точки, визначені за сіткою, за результатом", labels=("result",)
+))
+DB_QUERY_SECONDS = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Тривалість SQL-запитів за типом операції", labels=("operation",)
+))
+
+
+@contextmanager
+def stage(name: str):
+    """Вимірює тривалість етапу обробки замовлень."""
+    with PIPELINE_STAGE_SECONDS.time(stage=name):
+        yield
+
+
+def record_import(mode: str, success: int, errors: int, elapsed: float):
+    IMPORT_ROWS_TOTAL.inc(success, result="success")
+    IMPORT_ROWS_TOTAL.inc(errors, result="error")
+    if elapsed > 0 and success + errors:
+        IMPORT_ROWS_PER_SECOND.observe((success + errors) / elapsed, mode=mode)
+
+
+def instrument_engine(engine):
+    """Підписує синхронний рушій SQLAlchemy на події виконання для гістограми тривалості запитів."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_SECONDS.observe(time.perf_counter() - starts.pop(), operation=operation)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,176 @@
+"""
+Профілювання окремих запитів на вимогу (PROFILING_ENABLED).
+Запит з заголовком X-Profile (або параметром ?profile=) від адміністратора виконується під
+профайлером, результат зберігається у PROFILING_DIR з маршрутом і тривалістю в імені файлу.
+Формати: "pstats" — детермінований cProfile (файл .prof для pstats/snakeviz),
+"html" — семплюючий pyinstrument (flamegraph), якщо пакет встановлено.
+"""
+import os
+import re
+import time
+import logging
+import cProfile
+import pstats
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_FORMATS = ("pstats", "html")
+_ENABLED_VALUES = {"1", "true", "yes", "on"}
+
+# Профіль поточного запиту: успадковується задачами asyncio, які запускає обробник
+_current_profile = ContextVar("current_request_profile", default=None)
+
+# cProfile/pyinstrument перехоплюють профілювання всього потоку, тому одночасно — лише один запит
+_profile_slot = threading.Lock()
+
+
+def pyinstrument_available() -> bool:
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def requested_format(request) -> str | None:
+    """Формат профілю, запитаний заголовком або параметром запиту; None — профілювання не запитано."""
+    value = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in _ENABLED_VALUES:
+        value = settings.PROFILING_FORMAT
+    if value not in PROFILE_FORMATS:
+        return None
+    if value == "html" and not pyinstrument_available():
+        logger.warning("pyinstrument не встановлено, профіль буде збережено у форматі pstats.")
+        return "pstats"
+    return value
+
+
+async def is_admin_request(request) -> bool:
+    """Перевіряє Bearer-токен запиту так само, як get_current_admin (кеш, потім БД)."""
+    from app.core.security import authenticate_token
+    from app.db.database import AsyncSessionLocal
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    async with AsyncSessionLocal() as db:
+        return await authenticate_token(token, db) is not None
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+class RequestProfile:
+    """
+    Профіль одного запиту: профайлер потоку циклу подій та окремі профайлери для кожної
+    функції, переданої у пул CPU (cpu_executor) під час запиту; результати об'єднуються.
+    """
+
+    def __init__(self, fmt: str):
+        self.format = fmt
+        self._profiler = None
+        self._lock = threading.Lock()
+        self._worker_results = []
+
+    def _new_profiler(self, async_mode: str = "disabled"):
+        if self.format == "html":
+            from pyinstrument import Profiler
+            return Profiler(async_mode=async_mode)
+        return cProfile.Profile()
+
+    @staticmethod
+    def _start(profiler):
+        if isinstance(profiler, cProfile.Profile):
+            profiler.enable()
+        else:
+            profiler.start()
+
+    @staticmethod
+    def _stop(profiler):
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            return profiler
+        return profiler.stop()
+
+    def start(self):
+        self._profiler = self._new_profiler(async_mode="enabled")
+        self._start(self._profiler)
+
+    def stop(self):
+        self._stop(self._profiler)
+
+    def call(self, func, *args, **kwargs):
+        """Виконує func у потоці пулу під власним профайлером."""
+        profiler = self._new_profiler()
+        self._start(profiler)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            result = self._stop(profiler)
+            with self._lock:
+                self._worker_results.append(result)
+
+    def save(self, directory: str, method: str, route: str, elapsed: float) -> str:
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        extension = "html" if self.format == "html" else "prof"
+        path = os.path.join(directory, f"{stamp}_{method}_{slug}_{elapsed * 1000:.0f}ms.{extension}")
+
+        with self._lock:
+            worker_results = list(self._worker_results)
+        if self.format == "html":
+            from pyinstrument.renderers import HTMLRenderer
+            from pyinstrument.session import Session
+
+            session = self._profiler.last_session
+            for worker_session in worker_results:
+                session = Session.combine(session, worker_session)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(HTMLRenderer().render(session))
+        else:
+            stats = pstats.Stats(self._profiler)
+            for worker_profiler in worker_results:
+                stats.add(worker_profiler)
+            stats.dump_stats(path)
+        return path
+
+
+async def profile_request(request, call_next, fmt: str):
+    """
+    Виконує запит під профайлером і зберігає профіль; ім'я файлу повертається у заголовку X-Profile-File.
+    Профілюється обробник до повернення відповіді (тіло StreamingResponse генерується вже після).
+    """
+    if not _profile_slot.acquire(blocking=False):
+        logger.warning("Інший запит уже профілюється, запит виконано без профілювання.")
+        return await call_next(request)
+
+    profile = RequestProfile(fmt)
+    token = _current_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        profile.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profile.stop()
+    finally:
+        _current_profile.reset(token)
+        _profile_slot.release()
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    path = profile.save(settings.PROFILING_DIR, request.method, route.path if route else request.url.path, elapsed)
+    logger.info(f"Профіль запиту {request.method} {request.url.path} ({elapsed:.3f} с) збережено у {path}")
+    response.headers["X-Profile-File"] = os.path.basename(path)
+    return response
@@ -1,3 +1,8 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import jwt  
@@ -6,42 +11,170 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_async_db
 from app.db.models.models import Admin
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="admins/login")
 
-def get_current_admin(
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-) -> Admin:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Не удалось подтвердить учетные данные",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+
+class PrincipalCache:
+    """
+    Кэш проверенных администраторов (email -> id, is_active) с ограничением по времени жизни и размеру.
+    Убирает запрос к БД из каждого защищенного запроса. Записи сбрасываются после фиксации транзакции,
+    изменившей или удалившей администратора; в других процессах устаревание ограничено TTL.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return principal
+
+    def put(self, admin: Admin):
+        with self._lock:
+            self._entries[admin.email] = (time.monotonic() + self.ttl, (admin.id, admin.email, admin.is_active))
+            self._entries.move_to_end(admin.email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_SIZE)
+
+
+_PENDING_KEY = "principal_cache_pending"
+_CLEAR_ALL = object()
+
+
+def _pending(session) -> set:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+@event.listens_for(Admin, "after_update")
+@event.listens_for(Admin, "after_delete")
+def _invalidate_admin(mapper, connection, target):
+    """Запоминает измененного/удаленного администратора (включая прежний email) до фиксации транзакции."""
+    pending = _pending(inspect(target).session)
+    pending.add(target.email)
+    pending.update(inspect(target).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_on_bulk_admin_change(orm_execute_state):
+    """Массовые UPDATE/DELETE через query().update() не вызывают событий маппера — после фиксации сбрасываем весь кэш."""
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is not None and orm_execute_state.bind_mapper.class_ is Admin:
+        _pending(orm_execute_state.session).add(_CLEAR_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidation(session):
+    """
+    Кэш сбрасывается только после успешной фиксации: при сбросе во время flush параллельный
+    запрос успевал прочитать из БД еще не измененную запись и снова положить ее в кэш.
+    """
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if _CLEAR_ALL in pending:
+        principal_cache.clear()
+        return
+    for email in pending:
+        principal_cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidation(session):
+    """Откаченные изменения кэш не затрагивают."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def authenticate_token(token: str, db: AsyncSession) -> Admin | None:
+    """Администратор по JWT (сначала кэш, затем БД); None для невалидного токена или неактивного администратора."""
     try:
         # Декодируем токен
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            return None
     except JWTError:
-        raise credentials_exception
+        return None
         
-    # Проверяем наличие админа в базе данных
-    admin = db.query(Admin).filter(Admin.email == email).first()
-    if admin is None:
-        raise credentials_exception
+    # Сначала кэш; в БД идем только при промахе
+    principal = principal_cache.get(email)
+    if principal is not None:
+        admin_id, admin_email, is_active = principal
+        admin = Admin(id=admin_id, email=admin_email, is_active=is_active)
+    else:
+        admin = (await db.execute(select(Admin).where(Admin.email == email))).scalar_one_or_none()
+        if admin is None:
+            return None
+        principal_cache.put(admin)
+
+    # Деактивированный администратор теряет доступ, даже если токен еще не истек
+    if admin.is_active is False:
+        return None
         
     return admin
+
+
+async def get_current_admin(
+    token: str = Depends(oauth2_scheme), 
+    db: AsyncSession = Depends(get_async_db)
+) -> Admin:
+    admin = await authenticate_token(token, db)
+    if admin is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Не удалось подтвердить учетные данные",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return admin
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+_hash_executor = None
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Отдельный пул для bcrypt: медленное хеширование не занимает цикл событий и общий пул потоков."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_executor
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), get_password_hash, password)
+
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Создает JWT токен для авторизованного пользователя"""
@@ -1,7 +1,10 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core import metrics
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
@@ -10,7 +13,22 @@ engine = create_engine(
     connect_args={"check_same_thread": False}
 )
 
-@event.listens_for(engine, "connect")
+# Асинхронні драйвери для відповідних синхронних URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str):
+    """Переводить URL бази даних на асинхронний драйвер (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS and parsed.drivername != ASYNC_DRIVERS[backend]:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    return parsed
+
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL))
+
 def set_sqlite_pragma(dbapi_connection, connection_record):
     """
     Оптимізація SQLite для високопродуктивного масового запису (bulk insert).
@@ -22,7 +40,15 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA temp_store=MEMORY")
     cursor.close()
 
+for _engine in (engine, async_engine.sync_engine):
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", set_sqlite_pragma)
+    # Гістограма тривалості SQL-запитів (/metrics)
+    metrics.instrument_engine(_engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: після commit атрибути не перечитуються неявно (в async це заборонено)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -31,4 +57,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Асинхронна сесія бази даних: запити не блокують цикл подій."""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import Column, Float, DateTime, JSON, String, Integer, Boolean
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Float, DateTime, Date, JSON, String, Integer, Boolean, Index, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func, false
 from ..database import Base 
 class Admin(Base):
     __tablename__ = "admins"
@@ -9,10 +9,32 @@ class Admin(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
 
+class JurisdictionProfile(Base):
+    """
+    Профіль юрисдикцій: округ, складові ставки та перелік юрисдикцій.
+    Таких комбінацій лише кілька десятків, тому замовлення посилаються на профіль за profile_id
+    замість того, щоб зберігати однакові JSON-деталізації в кожному рядку.
+    """
+    __tablename__ = "jurisdiction_profiles"
+
+    id = Column(Integer, primary_key=True)
+    county = Column(String, nullable=False)
+    state_rate = Column(Float, nullable=False)
+    county_rate = Column(Float, nullable=False)
+    city_rate = Column(Float, nullable=False)
+    special_rates = Column(Float, nullable=False)
+    jurisdictions = Column(JSON, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("county", "state_rate", "county_rate", "city_rate", "special_rates",
+                         name="uq_jurisdiction_profiles_rates"),
+    )
+
+
 class Order(Base):
     """
     SQLAlchemy модель для таблиці замовлень.
-    Зберігає координати, фінансові показники та деталізацію податків (у форматі JSON).
+    Зберігає координати, фінансові показники та посилання на профіль юрисдикцій (деталізація податків).
     """
     __tablename__ = "orders"
 
@@ -27,5 +49,134 @@ class Order(Base):
     tax_amount = Column(Float, nullable=True)
     total_amount = Column(Float, nullable=True)
     
-    breakdown = Column(JSON, nullable=True) 
-    jurisdictions = Column(JSON, nullable=True)
\ No newline at end of file
+    profile_id = Column(Integer, ForeignKey("jurisdiction_profiles.id"), nullable=True)
+
+    # FIPS-код округу (36061 — Мангеттен): звітність за юрисдикціями без розбору профілів
+    county_fips = Column(String(5), nullable=True, index=True)
+
+    # Відбиток (координати, сума, час) для пропуску повторно імпортованих рядків
+    fingerprint = Column(String(32), nullable=True, index=True)
+
+    # SHA-256 файлу (import_files), з якого імпортовано замовлення; NULL для створених через API
+    import_hash = Column(String(64), nullable=True)
+
+    # Складені індекси (колонка сортування, id) обслуговують фільтр за діапазоном часу
+    # та keyset-пагінацію без сортування всієї таблиці
+    __table_args__ = (
+        Index("ix_orders_timestamp_id", "timestamp", "id"),
+        Index("ix_orders_subtotal_id", "subtotal", "id"),
+        Index("ix_orders_composite_tax_rate_id", "composite_tax_rate", "id"),
+        Index("ix_orders_tax_amount_id", "tax_amount", "id"),
+        Index("ix_orders_total_amount_id", "total_amount", "id"),
+    )
+
+
+class ImportJob(Base):
+    """
+    Фонове завдання імпорту CSV.
+    Зберігає стан обробки та прогрес, щоб клієнт міг опитувати його через API.
+    """
+    __tablename__ = "import_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    filename = Column(String, nullable=True)
+    status = Column(String(16), nullable=False, default="queued")
+
+    file_size = Column(Integer, nullable=False, default=0)
+    bytes_processed = Column(Integer, nullable=False, default=0)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    success_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+
+    errors = Column(JSON, nullable=True)
+    detail = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class RepricingJob(Base):
+    """
+    Завдання переоцінки збережених замовлень за поточною таблицею ставок.
+    Замовлення обробляються блоками в порядку id; last_order_id фіксується в тій самій транзакції,
+    що й оновлені рядки, тож перерване завдання продовжується з місця зупинки.
+    """
+    __tablename__ = "repricing_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
+    status = Column(String(16), nullable=False, default="queued")
+    dry_run = Column(Boolean, nullable=False, default=False)
+    reresolve = Column(Boolean, nullable=False, default=False)
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    chunk_size = Column(Integer, nullable=False)
+
+    last_order_id = Column(String(36), nullable=True)
+    rows_total = Column(Integer, nullable=False, default=0)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_changed = Column(Integer, nullable=False, default=0)
+    rows_unresolved = Column(Integer, nullable=False, default=0)
+    tax_delta = Column(Float, nullable=False, default=0.0)
+    total_delta = Column(Float, nullable=False, default=0.0)
+
+    # Підсумок змін: за округами (FIPS) та приклади змінених замовлень
+    summary = Column(JSON, nullable=True)
+    detail = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ImportFile(Base):
+    """
+    Імпортований CSV-файл за SHA-256 вмісту.
+    Повторне завантаження того самого файлу (наприклад, після тайм-ауту) повертає збережений
+    результат без повторної обробки та без дублювання замовлень.
+    stale — після видалення замовлень цього файлу запис більше не гарантує, що всі його рядки є в БД.
+    """
+    __tablename__ = "import_files"
+
+    content_hash = Column(String(64), primary_key=True)
+    filename = Column(String, nullable=True)
+    file_size = Column(Integer, nullable=False, default=0)
+
+    total_processed = Column(Integer, nullable=False, default=0)
+    success_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)
+    stale = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class OrderDailyStats(Base):
+    """
+    Агрегати замовлень за день (UTC), що підтримуються при кожному записі/видаленні.
+    Дозволяють рахувати підсумки дашборду за O(днів) замість повного сканування orders.
+    """
+    __tablename__ = "order_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    subtotal_sum = Column(Float, nullable=False, default=0.0)
+    tax_sum = Column(Float, nullable=False, default=0.0)
+    total_sum = Column(Float, nullable=False, default=0.0)
+    rate_sum = Column(Float, nullable=False, default=0.0)
+
+
+class OrderCountyDailyStats(Base):
+    """
+    Агрегати замовлень за округом (FIPS) і днем (UTC), що підтримуються при кожному записі/видаленні.
+    Звіт за юрисдикціями (щомісячна декларація до NY DTF) читає O(днів × округів) рядків замість orders.
+    """
+    __tablename__ = "order_county_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    county_fips = Column(String(5), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    subtotal_sum = Column(Float, nullable=False, default=0.0)
+    tax_sum = Column(Float, nullable=False, default=0.0)
+    total_sum = Column(Float, nullable=False, default=0.0)
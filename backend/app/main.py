@@ -1,12 +1,62 @@
-from fastapi import FastAPI
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.routers import orders, admins
 from app.core.config import settings
+from app.core import metrics, profiling
+from app.services.tax_service import get_tax_service, is_tax_service_ready
+from app.services.jurisdiction_profiles import profile_registry
+
+logger = logging.getLogger(__name__)
+
+def warm_up():
+    """Будує податковий сервіс (геодані, R-Tree, сітку, ставки) до першого запиту."""
+    start = time.perf_counter()
+    try:
+        get_tax_service()
+    except Exception as e:
+        # /ready лишається 503, сервіс буде побудовано на першому запиті
+        logger.error(f"Помилка прогріву податкового сервісу: {e}")
+        return
+    logger.info(f"Податковий сервіс прогріто за {time.perf_counter() - start:.2f} с.")
+
+def warm_up_worker():
+    """
+    Прогрів воркера: податковий сервіс і профілі юрисдикцій для поточної таблиці ставок.
+    Профілі читаються з БД, тому не входять у warm_up, що виконується в майстрі gunicorn до fork.
+    """
+    warm_up()
+    if not is_tax_service_ready():
+        return
+    try:
+        profile_registry.warm_up(get_tax_service().rate_table)
+    except Exception as e:
+        # Профілі буде синхронізовано першим записом замовлень
+        logger.error(f"Помилка завантаження профілів юрисдикцій: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Прогрів запускається у фоні, щоб воркер одразу відповідав на перевірку живості (/),
+    а /ready повертав 503, доки індекс не готовий. Під gunicorn з preload_app сервіс уже
+    побудовано в майстер-процесі до fork (див. gunicorn.conf.py), і воркер лише завантажує профілі юрисдикцій.
+    """
+    task = None
+    if settings.WARMUP_ON_STARTUP:
+        task = asyncio.create_task(asyncio.to_thread(warm_up_worker))
+    yield
+    if task is not None and not task.done():
+        await task
 
 app = FastAPI(
     title="Instant Wellness Kits Tax API",
     description="API для розрахунку податків на доставку дронами у штаті Нью-Йорк",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = [
@@ -23,6 +73,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Тривалість запиту за шаблоном маршруту (/orders/{order_id}, а не конкретний ID)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=str(status)
+        )
+
+async def profile_admin_request(request: Request, call_next):
+    """Профілювання запиту на вимогу адміністратора (заголовок X-Profile або ?profile=)."""
+    fmt = profiling.requested_format(request)
+    if fmt is None or not await profiling.is_admin_request(request):
+        return await call_next(request)
+    return await profiling.profile_request(request, call_next, fmt)
+
+# Middleware реєструється лише з PROFILING_ENABLED, тож у звичайному режимі не додає накладних витрат
+if settings.PROFILING_ENABLED:
+    app.middleware("http")(profile_admin_request)
+
 # Підключаємо роутери
 app.include_router(orders.router)
 app.include_router(admins.router)
@@ -30,4 +109,16 @@ app.include_router(admins.router)
 @app.get("/")
 def read_root():
     """Health check ендпоінт для перевірки статусу сервера."""
-    return {"status": "success", "message": "Wellness Drone Tax API is running!"}
\ No newline at end of file
+    return {"status": "success", "message": "Wellness Drone Tax API is running!"}
+
+@app.get("/ready")
+def read_ready():
+    """Перевірка готовності: 200 лише після побудови просторового індексу, інакше 503."""
+    if not is_tax_service_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return {"status": "ready"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Метрики у текстовому форматі Prometheus: етапи імпорту, маршрути, просторовий індекс, SQL."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
\ No newline at end of file
@@ -1,13 +1,14 @@
 # app/routers/users.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
 from app.db.models.models import Admin
 from app.schemas.admin import AdminCreate, AdminResponse
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from datetime import timedelta
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password_async, create_access_token
 from app.core.config import settings
 
 router = APIRouter(
@@ -15,17 +16,17 @@ router = APIRouter(
     tags=["admins"]
 )
 @router.post("/login", response_model=dict)
-def login_admin(
+async def login_admin(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Ищем админа в базе. 
     # Важно: OAuth2PasswordRequestForm всегда ожидает поле 'username', 
     # поэтому мы передаем email с фронтенда в поле username.
-    admin = db.query(Admin).filter(Admin.email == form_data.username).first()
+    admin = (await db.execute(select(Admin).where(Admin.email == form_data.username))).scalar_one_or_none()
     
-    # 2. Проверяем, существует ли админ и совпадает ли пароль
-    if not admin or not verify_password(form_data.password, admin.hashed_password):
+    # 2. Проверяем, существует ли админ и совпадает ли пароль (bcrypt — в отдельном пуле потоков)
+    if not admin or not await verify_password_async(form_data.password, admin.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
@@ -44,9 +45,9 @@ def login_admin(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/register", response_model=AdminResponse, status_code=status.HTTP_201_CREATED)
-def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
+async def register_admin(admin: AdminCreate, db: AsyncSession = Depends(get_async_db)):
     # Проверка, существует ли уже админ с таким email
-    db_admin = db.query(Admin).filter(Admin.email == admin.email).first()
+    db_admin = (await db.execute(select(Admin).where(Admin.email == admin.email))).scalar_one_or_none()
     if db_admin:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +55,7 @@ def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
         )
     
     # Хеширование пароля
-    hashed_password = get_password_hash(admin.password)
+    hashed_password = await get_password_hash_async(admin.password)
     
     # Создание нового админа
     new_admin = Admin(
@@ -64,7 +65,7 @@ def register_admin(admin: AdminCreate, db: Session = Depends(get_db)):
     
     # Сохранение в базу данных
     db.add(new_admin)
-    db.commit()
-    db.refresh(new_admin)
+    await db.commit()
+    await db.refresh(new_admin)
     
     return new_admin
\ No newline at end of file
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, status, Query, File, UploadFile, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
-from typing import Optional
-
-from app.db.database import get_db
-from app.db.models.models import Order
-from app.schemas.order import OrderCreate, OrderResponse
+from fastapi import APIRouter, Depends, status, Query, File, UploadFile, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, delete
+from typing import Optional, List
+from datetime import datetime, time, timedelta, timezone
+
+from app.db.database import get_async_db
+from app.db.models.models import Order, ImportJob, ImportFile, RepricingJob
+from app.schemas.order import (
+    OrderCreate, OrderResponse, BatchOrdersResponse, TaxQuoteRequest, TaxQuoteResponse, CountyTaxReportResponse
+)
+from app.schemas.import_job import ImportJobResponse
+from app.schemas.repricing_job import RepricingJobResponse
 from app.services.tax_service import get_tax_service, TaxCalculatorService
 from app.services.order_service import OrderService
+from app.services.cpu_executor import cpu_executor
+from app.services.jurisdiction_profiles import profile_registry
+from app.services import import_jobs, stats_service, export_service, repricing
+from app.services.pagination import keyset_page
 from app.core.security import get_current_admin
+from app.core.config import settings
 
 router = APIRouter(
     prefix="/orders",
@@ -17,11 +28,64 @@ router = APIRouter(
 )
 
 def get_order_service(
-    db: Session = Depends(get_db), 
+    db: AsyncSession = Depends(get_async_db), 
     tax_svc: TaxCalculatorService = Depends(get_tax_service)
 ) -> OrderService:
     return OrderService(db, tax_svc)
 
+# Колонки, за якими дозволене сортування (для курсорної пагінації потрібен стабільний порядок)
+SORTABLE_COLUMNS = {"timestamp", "subtotal", "composite_tax_rate", "tax_amount", "total_amount", "id"}
+
+def _parse_day(value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Невірний формат дати: {value}. Очікується YYYY-MM-DD")
+
+def _day_start(day) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+def apply_order_filters(query, search: Optional[str], start_day=None, end_day=None):
+    """
+    Фільтри списку замовлень, які може обслужити індекс:
+    - пошук за префіксом ID як діапазон [prefix, наступний_префікс) по первинному ключу;
+    - дати як напіввідкритий діапазон часу [start_day 00:00, end_day + 1 день 00:00) UTC.
+    """
+    if search:
+        prefix = search.strip().lower()
+        if prefix:
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            query = query.filter(Order.id >= prefix, Order.id < upper)
+    if start_day:
+        query = query.filter(Order.timestamp >= _day_start(start_day))
+    if end_day:
+        query = query.filter(Order.timestamp < _day_start(end_day + timedelta(days=1)))
+    return query
+
+def _month_range(value: str):
+    try:
+        start_day = datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Невірний формат місяця: {value}. Очікується YYYY-MM")
+    next_month = (start_day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start_day, next_month - timedelta(days=1)
+
+def parse_date_range(date: Optional[str], start_date: Optional[str], end_date: Optional[str], month: Optional[str] = None):
+    """
+    Параметри дат запиту -> (start_day, end_day); date — скорочення для діапазону в один день,
+    month (YYYY-MM) — для календарного місяця.
+    """
+    if date:
+        day = _parse_day(date)
+        return day, day
+    if month:
+        return _month_range(month)
+    start_day = _parse_day(start_date) if start_date else None
+    end_day = _parse_day(end_date) if end_date else None
+    if start_day and end_day and start_day > end_day:
+        raise HTTPException(status_code=400, detail="start_date не може бути пізніше за end_date")
+    return start_day, end_day
+
 @router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_manual_order(
     order_data: OrderCreate, 
@@ -30,70 +94,249 @@ async def create_manual_order(
     """Створення нового замовлення вручну."""
     return await service.create_manual_order(order_data)
 
+@router.post("/quote", response_model=TaxQuoteResponse)
+async def quote_tax(
+    quote_data: TaxQuoteRequest,
+    tax_svc: TaxCalculatorService = Depends(get_tax_service)
+):
+    """
+    Котирування податку для точки доставки без створення замовлення.
+    Влучання в кеш округів обслуговується одразу; точний пошук при промаху — у пулі CPU,
+    під тим самим обмеженням черги (503 + Retry-After).
+    """
+    args = (quote_data.latitude, quote_data.longitude, quote_data.subtotal, quote_data.timestamp)
+    quote = tax_svc.quote_cached(*args)
+    if quote is None:
+        quote = await cpu_executor.run(tax_svc.quote, *args)
+    return quote
+
+@router.get("/quote/stats")
+def quote_cache_stats(tax_svc: TaxCalculatorService = Depends(get_tax_service)):
+    """Статистика LRU-кешу котирувань: влучання, промахи, витіснення."""
+    return tax_svc.county_cache.stats()
+
+@router.post("/batch", response_model=BatchOrdersResponse)
+async def create_orders_batch(
+    orders_data: List[OrderCreate],
+    service: OrderService = Depends(get_order_service)
+):
+    """Пакетне створення замовлень одним запитом (векторний розрахунок податків і один масовий запис)."""
+    if not orders_data:
+        raise HTTPException(status_code=400, detail="Список замовлень порожній")
+    if len(orders_data) > settings.ORDER_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Забагато замовлень в одному запиті (максимум {settings.ORDER_BATCH_MAX_SIZE})"
+        )
+    return await service.create_orders_batch(orders_data)
+
 @router.post("/import")
 async def import_csv_orders(
+    response: Response,
     file: UploadFile = File(...), 
+    stream: bool = Query(False, description="Потоковий імпорт блоками рядків"),
+    chunk_size: Optional[int] = Query(None, ge=1, description="Розмір блоку для потокового імпорту"),
+    commit_every: Optional[int] = Query(None, ge=1, description="Фіксувати транзакцію кожні N блоків"),
+    background: bool = Query(False, description="Фоновий імпорт: одразу повертає ID завдання"),
+    dedupe: Optional[bool] = Query(None, description="Пропускати рядки, що вже є в БД (координати, сума, час)"),
+    db: AsyncSession = Depends(get_async_db),
     service: OrderService = Depends(get_order_service)
 ):
-    """Імпорт списку замовлень через CSV-файл."""
+    """Імпорт списку замовлень через CSV-файл (повторне завантаження того самого файлу повертає збережений результат)."""
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Файл має бути формату CSV")
     
-    return await service.process_csv_import(file)
+    if background:
+        job = await import_jobs.submit_import_job(db, file, dedupe)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return import_jobs.get_job_progress(job)
+    if stream:
+        return await service.process_csv_import_streaming(file, chunk_size, commit_every, dedupe)
+    return await service.process_csv_import(file, dedupe)
+
+@router.get("/import/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Стан фонового завдання імпорту: прогрес, кількість рядків, швидкість та ETA."""
+    job = await db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Завдання імпорту не знайдено")
+    return import_jobs.get_job_progress(job)
+
+@router.post("/reprice", response_model=RepricingJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_repricing(
+    dry_run: bool = Query(False, description="Лише підсумок змін, без запису в БД"),
+    reresolve: bool = Query(False, description="Визначати округ за координатами для всіх замовлень"),
+    start_date: Optional[str] = Query(None, description="Початок діапазону дат YYYY-MM-DD (включно)"),
+    end_date: Optional[str] = Query(None, description="Кінець діапазону дат YYYY-MM-DD (включно)"),
+    chunk_size: Optional[int] = Query(None, ge=1, description="Кількість замовлень в одній транзакції"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Переоцінка збережених замовлень за поточною таблицею ставок у фоні; повертає ID завдання."""
+    start_day, end_day = parse_date_range(None, start_date, end_date)
+    job = repricing.new_job(dry_run, reresolve, start_day, end_day, chunk_size)
+    job.rows_total = await db.run_sync(repricing.count_orders, job)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    repricing.submit_job(job.id)
+    return repricing.get_job_progress(job)
+
+@router.get("/reprice/{job_id}", response_model=RepricingJobResponse)
+async def get_repricing_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Стан завдання переоцінки: прогрес, кількість змінених рядків та підсумок змін за округами."""
+    job = await db.get(RepricingJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Завдання переоцінки не знайдено")
+    return repricing.get_job_progress(job)
+
+@router.post("/reprice/{job_id}/resume", response_model=RepricingJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_repricing_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Продовжує перерване завдання переоцінки з останнього зафіксованого блоку."""
+    job = await db.get(RepricingJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Завдання переоцінки не знайдено")
+    if job.status == "completed":
+        raise HTTPException(status_code=409, detail="Завдання переоцінки вже завершено")
+
+    repricing.submit_job(job.id)
+    return repricing.get_job_progress(job)
+
+@router.get("/export")
+def export_orders(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="Формат файлу: csv, ndjson або parquet"),
+    sortBy: str = Query("timestamp"),
+    sortOrder: str = Query("desc"),
+    search: Optional[str] = Query(None, description="Пошук за початком ID"),
+    date: Optional[str] = Query(None, description="Фільтр за датою YYYY-MM-DD"),
+    start_date: Optional[str] = Query(None, description="Початок діапазону дат YYYY-MM-DD (включно)"),
+    end_date: Optional[str] = Query(None, description="Кінець діапазону дат YYYY-MM-DD (включно)"),
+):
+    """
+    Потоковий експорт замовлень з тими ж фільтрами, що й у списку.
+    Рядки читаються з курсора БД партіями і одразу віддаються клієнту, без обмеження кількості.
+    """
+    if format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=501, detail="Експорт у Parquet недоступний: не встановлено pyarrow")
+
+    start_day, end_day = parse_date_range(date, start_date, end_date)
+    sort_column = getattr(Order, sortBy if sortBy in SORTABLE_COLUMNS else "timestamp")
+    ordering = (sort_column.desc(), Order.id.desc()) if sortOrder == "desc" else (sort_column.asc(), Order.id.asc())
+
+    def build_query(db):
+        return apply_order_filters(db.query(Order), search, start_day, end_day).order_by(*ordering)
+
+    media_type, extension = export_service.EXPORT_FORMATS[format]
+    filename = f"tax_orders_report_{datetime.now(timezone.utc).date().isoformat()}.{extension}"
+    return StreamingResponse(
+        export_service.STREAMERS[format](build_query),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/reports/counties", response_model=CountyTaxReportResponse)
+async def get_county_tax_report(
+    month: Optional[str] = Query(None, description="Звітний місяць YYYY-MM"),
+    start_date: Optional[str] = Query(None, description="Початок діапазону дат YYYY-MM-DD (включно)"),
+    end_date: Optional[str] = Query(None, description="Кінець діапазону дат YYYY-MM-DD (включно)"),
+    db: AsyncSession = Depends(get_async_db),
+    tax_svc: TaxCalculatorService = Depends(get_tax_service)
+):
+    """
+    Суми продажів і податку за округами (FIPS) для щомісячної декларації до NY DTF.
+    Читає агрегати за округом і днем, а не замовлення, тож не залежить від кількості рядків.
+    """
+    start_day, end_day = parse_date_range(None, start_date, end_date, month)
+    rows = await db.run_sync(stats_service.get_county_totals, start_day, end_day)
+
+    names = dict(zip(tax_svc.county_fips, tax_svc.county_names))
+    return {
+        "start_date": start_day,
+        "end_date": end_day,
+        "order_count": sum(row["order_count"] for row in rows),
+        "subtotal_sum": sum(row["subtotal_sum"] for row in rows),
+        "tax_sum": sum(row["tax_sum"] for row in rows),
+        "items": [{**row, "county": names.get(row["county_fips"])} for row in rows],
+    }
 
 @router.get("")
-def get_orders_list(
+async def get_orders_list(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     sortBy: str = Query("timestamp"),
     sortOrder: str = Query("desc"),
-    search: Optional[str] = Query(None, description="Пошук за ID"),
+    search: Optional[str] = Query(None, description="Пошук за початком ID"),
     date: Optional[str] = Query(None, description="Фільтр за датою YYYY-MM-DD"),
-    db: Session = Depends(get_db)
+    start_date: Optional[str] = Query(None, description="Початок діапазону дат YYYY-MM-DD (включно)"),
+    end_date: Optional[str] = Query(None, description="Кінець діапазону дат YYYY-MM-DD (включно)"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="Режим пагінації: offset або cursor"),
+    cursor: Optional[str] = Query(None, description="Курсор next_cursor/prev_cursor з попередньої відповіді"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Отримання списку замовлень з пагінацією, фільтрацією та сортуванням."""
-    query = db.query(Order)
-    
-    if search:
-        query = query.filter(Order.id.ilike(f"%{search}%"))
-    if date:
-        query = query.filter(cast(Order.timestamp, Date) == date)
+    """
+    Отримання списку замовлень з пагінацією, фільтрацією та сортуванням.
+    У режимі cursor (або якщо передано cursor) сторінка вибирається за ключем сортування та id,
+    без OFFSET; page у цьому режимі ігнорується.
+    """
+    start_day, end_day = parse_date_range(date, start_date, end_date)
+    query = apply_order_filters(select(Order), search, start_day, end_day)
 
-    total_count = query.count()
-    total_tax = query.with_entities(func.sum(Order.tax_amount)).scalar() or 0.0
-    avg_rate = query.with_entities(func.avg(Order.composite_tax_rate)).scalar() or 0.0
+    if search:
+        aggregates = await db.execute(query.with_only_columns(
+            func.count(Order.id), func.sum(Order.tax_amount), func.avg(Order.composite_tax_rate)
+        ))
+        total_count, total_tax, avg_rate = aggregates.one()
+        total_tax, avg_rate = total_tax or 0.0, avg_rate or 0.0
+    else:
+        # Без пошуку за ID підсумки беруться з денних агрегатів — O(днів), а не O(рядків)
+        totals = await db.run_sync(stats_service.get_totals, start_day, end_day)
+        total_count, total_tax, avg_rate = totals["total"], totals["total_tax"], totals["avg_rate"]
     
-    sort_column = getattr(Order, sortBy, Order.timestamp)
-    if sortOrder == "desc":
-        query = query.order_by(sort_column.desc())
+    sort_column = getattr(Order, sortBy if sortBy in SORTABLE_COLUMNS else "timestamp")
+    next_cursor, prev_cursor = None, None
+    if pagination == "cursor" or cursor:
+        orders, next_cursor, prev_cursor = await keyset_page(
+            db, query, sort_column, Order.id, sortOrder == "desc", limit, cursor
+        )
     else:
-        query = query.order_by(sort_column.asc())
+        if sortOrder == "desc":
+            query = query.order_by(sort_column.desc(), Order.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Order.id.asc())
 
-    skip = (page - 1) * limit
-    orders = query.offset(skip).limit(limit).all()
-    
+        skip = (page - 1) * limit
+        orders = (await db.execute(query.offset(skip).limit(limit))).scalars().all()
+
+    await profile_registry.ensure(db, [order.profile_id for order in orders])
     return {
-        "items": orders,
+        # Деталізація податків відновлюється з профілів юрисдикцій (OrderResponse)
+        "items": [OrderResponse.model_validate(order) for order in orders],
         "total": total_count,
         "total_tax": float(total_tax),
         "avg_rate": float(avg_rate),
         "page": page,
-        "size": limit
+        "size": limit,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
     }
 
 @router.delete("/clear", status_code=status.HTTP_200_OK)
-def clear_all_orders(db: Session = Depends(get_db)):
+async def clear_all_orders(db: AsyncSession = Depends(get_async_db)):
     """Повне очищення бази даних замовлень."""
     try:
-        db.query(Order).delete()
-        db.commit()
+        await db.execute(delete(Order))
+        # Записи про імпортовані файли видаляються разом із замовленнями, інакше повторне
+        # завантаження того самого файлу повернуло б збережений результат без вставки рядків
+        await db.execute(delete(ImportFile))
+        await db.run_sync(stats_service.clear)
+        await db.commit()
         return {"detail": "Всі дані успішно видалено"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Помилка при видаленні даних з БД")
     
 @router.delete("/{order_id}")
-async def delete_single_order(order_id: str, db: Session = Depends(get_db)):
+async def delete_single_order(order_id: str, db: AsyncSession = Depends(get_async_db)):
     """API ендпоінт для видалення одного замовлення за його ID."""
     from app.services.tax_service import get_tax_service
     
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List, Union
+
+
+class ImportRowError(BaseModel):
+    """Помилка обробки окремого рядка CSV."""
+    row: Union[int, str]
+    reason: str
+
+
+class ImportJobResponse(BaseModel):
+    """Стан фонового завдання імпорту з прогресом, швидкістю та оцінкою часу до завершення."""
+    job_id: str
+    filename: Optional[str] = None
+    status: str
+    progress: float
+    rows_processed: int
+    success_count: int
+    error_count: int
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    errors: List[ImportRowError] = []
+    detail: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
 from typing import Optional, List, Dict
 import uuid
+from app.services.jurisdiction_profiles import profile_registry
 
 class OrderBase(BaseModel):
     """Базова схема замовлення з географічною та фінансовою валідацією."""
@@ -12,6 +13,10 @@ class OrderBase(BaseModel):
 class OrderCreate(OrderBase):
     pass
 
+class TaxQuoteRequest(OrderBase):
+    """Запит на котирування податку (без створення замовлення)."""
+    timestamp: Optional[datetime] = Field(None, description="Момент продажу; за замовчуванням — зараз")
+
 class TaxBreakdown(BaseModel):
     """Деталізація розрахунку складових податку."""
     state_rate: float = 0.0
@@ -26,12 +31,42 @@ class OrderResponse(OrderBase):
     composite_tax_rate: float
     tax_amount: float
     total_amount: float
-    breakdown: Optional[TaxBreakdown]
+    breakdown: Optional[TaxBreakdown] = None
     jurisdictions: List[str] = []
 
     class Config:
         from_attributes = True
 
+    @model_validator(mode="before")
+    @classmethod
+    def attach_profile(cls, data):
+        """
+        Деталізація податків та юрисдикції відновлюються з кешованого профілю за profile_id.
+        Без звернення до БД: обробник довантажує профілі заздалегідь (profile_registry.ensure).
+        """
+        if isinstance(data, dict):
+            if "breakdown" in data or "profile_id" not in data:
+                return data
+            values = dict(data)
+        else:
+            values = {name: getattr(data, name) for name in cls.model_fields if hasattr(data, name)}
+            values["profile_id"] = getattr(data, "profile_id", None)
+
+        profile = profile_registry.get(values.pop("profile_id", None))
+        if profile is not None:
+            values["breakdown"] = profile["breakdown"]
+            values["jurisdictions"] = profile["jurisdictions"]
+        return values
+
+class TaxQuoteResponse(BaseModel):
+    """Схема відповіді з котируванням податку."""
+    county: str
+    composite_tax_rate: float
+    tax_amount: float
+    total_amount: float
+    breakdown: TaxBreakdown
+    jurisdictions: List[str]
+
 class PaginatedOrdersResponse(BaseModel):
     """Схема пагінованої відповіді з агрегованою статистикою для дашборду."""
     total: int
@@ -39,4 +74,36 @@ class PaginatedOrdersResponse(BaseModel):
     avg_rate: float
     page: int
     limit: int
-    items: List[OrderResponse]
\ No newline at end of file
+    items: List[OrderResponse]
+
+class BatchOrderResult(BaseModel):
+    """Результат обробки одного елемента пакетного створення замовлень."""
+    index: int
+    status: str
+    order: Optional[OrderResponse] = None
+    error: Optional[str] = None
+
+class BatchOrdersResponse(BaseModel):
+    """Схема відповіді пакетного створення замовлень з результатом для кожного елемента."""
+    total: int
+    success_count: int
+    error_count: int
+    results: List[BatchOrderResult]
+
+class CountyTaxReportItem(BaseModel):
+    """Підсумки замовлень одного округу за період."""
+    county_fips: str
+    county: Optional[str] = None
+    order_count: int
+    subtotal_sum: float
+    tax_sum: float
+    total_sum: float
+
+class CountyTaxReportResponse(BaseModel):
+    """Звіт за юрисдикціями (округами) для податкової декларації."""
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    order_count: int
+    subtotal_sum: float
+    tax_sum: float
+    items: List[CountyTaxReportItem]
@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Optional, List, Dict
+
+
+class RepricingCountySummary(BaseModel):
+    """Зміни переоцінки в одному окрузі (за новим FIPS)."""
+    changed: int
+    tax_delta: float
+
+
+class RepricingSample(BaseModel):
+    """Приклад зміненого замовлення: пари [було, стало]."""
+    id: str
+    county_fips: List[Optional[str]]
+    composite_tax_rate: List[Optional[float]]
+    tax_amount: List[Optional[float]]
+
+
+class RepricingSummary(BaseModel):
+    counties: Dict[str, RepricingCountySummary] = {}
+    samples: List[RepricingSample] = []
+
+
+class RepricingJobResponse(BaseModel):
+    """Стан завдання переоцінки замовлень з прогресом та підсумком змін (у dry run — без запису)."""
+    job_id: str
+    status: str
+    dry_run: bool
+    reresolve: bool
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    progress: float
+    rows_total: int
+    rows_processed: int
+    rows_changed: int
+    rows_unresolved: int
+    tax_delta: float
+    total_delta: float
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    summary: RepricingSummary
+    detail: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,148 @@
+import io
+import logging
+import pandas as pd
+import sqlalchemy as sa
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ORDER_COLUMNS = [
+    'id', 'timestamp', 'latitude', 'longitude', 'subtotal',
+    'composite_tax_rate', 'tax_amount', 'total_amount', 'profile_id', 'county_fips', 'fingerprint', 'import_hash'
+]
+
+
+def _python_records(frame: pd.DataFrame) -> list:
+    """Кортежі рядків з timestamp як звичайним datetime (драйвери не знають pandas.Timestamp)."""
+    timestamps = frame['timestamp'].dt.to_pydatetime()
+    return [
+        (row[0], timestamp, *row[2:])
+        for row, timestamp in zip(frame[ORDER_COLUMNS].itertuples(index=False, name=None), timestamps)
+    ]
+
+
+class BulkWriter:
+    """
+    Масовий запис замовлень у таблицю orders.
+    Робота розділена на дві фази: prepare(frame) — лише CPU (можна виконувати у пулі, без БД),
+    write(session, payload) — запис у транзакції синхронної сесії (для AsyncSession через run_sync).
+    frame містить колонки ORDER_COLUMNS; timestamp — datetime з часовим поясом UTC,
+    profile_id — id профілю юрисдикцій (jurisdiction_profiles), fingerprint — відбиток рядка (import_dedup),
+    import_hash — хеш файлу, з якого імпортовано рядок (або None).
+    """
+    name = "base"
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = batch_size or settings.BULK_INSERT_BATCH_SIZE
+
+    def _batches(self, items):
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+    def prepare(self, frame: pd.DataFrame):
+        raise NotImplementedError
+
+    def write(self, session, payload) -> int:
+        raise NotImplementedError
+
+
+class SQLiteWriter(BulkWriter):
+    """executemany партіями з плейсхолдерами '?' (pysqlite/aiosqlite)."""
+    name = "sqlite-executemany"
+
+    # Формат DateTime, у якому SQLAlchemy зберігає час у SQLite: рядкове порівняння = хронологічне
+    TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+    SQL = (
+        f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in ORDER_COLUMNS)})"
+    )
+
+    def prepare(self, frame: pd.DataFrame) -> list:
+        frame = frame.assign(timestamp=frame['timestamp'].dt.strftime(self.TIMESTAMP_FORMAT))
+        return list(frame[ORDER_COLUMNS].itertuples(index=False, name=None))
+
+    def write(self, session, records: list) -> int:
+        cursor = session.connection().connection.cursor()
+        for batch in self._batches(records):
+            cursor.executemany(self.SQL, batch)
+        return len(records)
+
+
+class PsycopgCopyWriter(BulkWriter):
+    """COPY ... FROM STDIN (CSV) через psycopg2: рядки передаються потоком, без розбору INSERT на кожен рядок."""
+    name = "postgresql-copy"
+
+    SQL = f"COPY orders ({', '.join(ORDER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+    def prepare(self, frame: pd.DataFrame) -> list:
+        # Кожна партія — окремий CSV-буфер (текст, кількість рядків); час у ISO-форматі з часовим поясом
+        frame = frame[ORDER_COLUMNS]
+        chunks = []
+        for start in range(0, len(frame), self.batch_size):
+            batch = frame.iloc[start:start + self.batch_size]
+            chunks.append((batch.to_csv(header=False, index=False), len(batch)))
+        return chunks
+
+    def write(self, session, chunks: list) -> int:
+        cursor = session.connection().connection.cursor()
+        rows = 0
+        for text, count in chunks:
+            cursor.copy_expert(self.SQL, io.StringIO(text))
+            rows += count
+        return rows
+
+
+class AsyncpgCopyWriter(BulkWriter):
+    """COPY через asyncpg (copy_records_to_table) з AsyncSession: виклик з run_sync через await_only."""
+    name = "asyncpg-copy"
+
+    def prepare(self, frame: pd.DataFrame) -> list:
+        return _python_records(frame)
+
+    def write(self, session, records: list) -> int:
+        from sqlalchemy.util import await_only
+
+        driver_connection = session.connection().connection.driver_connection
+        for batch in self._batches(records):
+            await_only(driver_connection.copy_records_to_table("orders", records=batch, columns=ORDER_COLUMNS))
+        return len(records)
+
+
+class CoreInsertWriter(BulkWriter):
+    """Загальний варіант для інших СУБД: INSERT через SQLAlchemy Core (executemany драйвера)."""
+    name = "core-insert"
+
+    TABLE = sa.table("orders", *[
+        sa.column(column, sa.DateTime(timezone=True)) if column == 'timestamp' else sa.column(column)
+        for column in ORDER_COLUMNS
+    ])
+
+    def prepare(self, frame: pd.DataFrame) -> list:
+        return [dict(zip(ORDER_COLUMNS, record)) for record in _python_records(frame)]
+
+    def write(self, session, rows: list) -> int:
+        for batch in self._batches(rows):
+            session.execute(sa.insert(self.TABLE), batch)
+        return len(rows)
+
+
+_writers = {}
+
+
+def get_bulk_writer(dialect) -> BulkWriter:
+    """Стратегія запису за діалектом і драйвером рушія (dialect з engine/session.get_bind())."""
+    key = (dialect.name, dialect.driver)
+    writer = _writers.get(key)
+    if writer is None:
+        if dialect.name == "sqlite":
+            writer = SQLiteWriter()
+        elif dialect.name == "postgresql" and dialect.driver == "psycopg2":
+            writer = PsycopgCopyWriter()
+        elif dialect.name == "postgresql" and dialect.driver == "asyncpg":
+            writer = AsyncpgCopyWriter()
+        else:
+            writer = CoreInsertWriter()
+        logger.info(f"Масовий запис для {dialect.name}+{dialect.driver}: {writer.name}.")
+        _writers[key] = writer
+    return writer
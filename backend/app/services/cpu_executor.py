@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core import metrics, profiling
+
+logger = logging.getLogger(__name__)
+
+
+class CPUExecutor:
+    """
+    Виконавець CPU-навантаженої роботи (pandas, просторовий пошук) поза циклом подій.
+    Одночасно виконується не більше max_workers завдань, ще max_queue чекають у черзі;
+    коли черга заповнена, нові завдання одразу відхиляються з 503 і заголовком Retry-After,
+    замість того щоб накопичуватися і гальмувати решту запитів воркера.
+    NumPy, pandas та shapely 2 відпускають GIL у важких операціях, тому достатньо потоків.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+        return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                logger.warning(f"CPU-черга заповнена ({self._in_flight} завдань), запит відхилено.")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Сервер перевантажений обробкою даних, спробуйте пізніше",
+                    headers={"Retry-After": str(self.retry_after)}
+                )
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, func, *args, **kwargs):
+        """Виконує func(*args, **kwargs) у пулі та очікує результат, не блокуючи цикл подій."""
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            call = partial(func, *args, **kwargs)
+            profile = profiling.current_profile()
+            if profile is not None:
+                # Запит профілюється: робота у потоці пулу потрапляє в той самий профіль
+                call = partial(profile.call, call)
+            return await loop.run_in_executor(self._get_executor(), call)
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "rejected": self.rejected,
+            }
+
+
+cpu_executor = CPUExecutor(settings.CPU_WORKERS, settings.CPU_QUEUE_SIZE, settings.CPU_RETRY_AFTER)
+
+metrics.REGISTRY.register(metrics.Gauge(
+    "cpu_executor_in_flight", "Задачі у пулі CPU (виконуються та в черзі)", lambda: cpu_executor.stats()["in_flight"]
+))
+metrics.REGISTRY.register(metrics.Gauge(
+    "cpu_executor_rejected_total", "Кількість задач, відхилених через переповнену чергу (503)",
+    lambda: cpu_executor.stats()["rejected"], kind="counter"
+))
@@ -0,0 +1,184 @@
+import io
+import csv
+import json
+import logging
+from app.db.database import SessionLocal
+from app.db.models.models import Order
+from app.services.jurisdiction_profiles import profile_registry
+
+logger = logging.getLogger(__name__)
+
+# Кількість рядків, які читаються з курсора БД і віддаються клієнту за один раз
+EXPORT_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = [
+    'id', 'timestamp', 'latitude', 'longitude', 'subtotal',
+    'composite_tax_rate', 'tax_amount', 'total_amount',
+    'state_rate', 'county_rate', 'city_rate', 'special_rates', 'jurisdictions'
+]
+BREAKDOWN_KEYS = ['state_rate', 'county_rate', 'city_rate', 'special_rates']
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _flatten(row, iso_timestamps: bool = True) -> dict:
+    """
+    Рядок вибірки -> плоский словник: складові ставок профілю юрисдикцій виносяться в окремі колонки.
+    iso_timestamps=False лишає timestamp як datetime (для типізованої колонки Parquet).
+    """
+    profile = profile_registry.get(row.profile_id) or {}
+    breakdown = profile.get('breakdown', {})
+    timestamp = row.timestamp
+    if iso_timestamps and timestamp is not None:
+        timestamp = timestamp.isoformat()
+    record = {
+        'id': row.id,
+        'timestamp': timestamp,
+        'latitude': row.latitude,
+        'longitude': row.longitude,
+        'subtotal': row.subtotal,
+        'composite_tax_rate': row.composite_tax_rate,
+        'tax_amount': row.tax_amount,
+        'total_amount': row.total_amount,
+    }
+    for key in BREAKDOWN_KEYS:
+        record[key] = breakdown.get(key)
+    record['jurisdictions'] = list(profile.get('jurisdictions', []))
+    return record
+
+
+def _flatten_batch(db, rows: list, iso_timestamps: bool = True) -> list:
+    # Профілі, створені іншими процесами, дочитуються один раз на партію (генератор працює в пулі потоків)
+    if profile_registry.missing(row.profile_id for row in rows):
+        profile_registry.refresh(db)
+    return [_flatten(row, iso_timestamps) for row in rows]
+
+
+def _iter_batches(build_query, batch_size: int = None, iso_timestamps: bool = True):
+    """
+    Читає замовлення з серверного курсора партіями по batch_size рядків.
+    Сесія створюється тут, бо генератор виконується вже після завершення обробника запиту.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    db = SessionLocal()
+    try:
+        query = build_query(db).with_entities(
+            Order.id, Order.timestamp, Order.latitude, Order.longitude, Order.subtotal,
+            Order.composite_tax_rate, Order.tax_amount, Order.total_amount, Order.profile_id
+        ).execution_options(yield_per=batch_size, stream_results=True)
+
+        batch = []
+        for row in query:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield _flatten_batch(db, batch, iso_timestamps)
+                batch = []
+        if batch:
+            yield _flatten_batch(db, batch, iso_timestamps)
+    finally:
+        db.close()
+
+
+def stream_csv(build_query, batch_size: int = None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM, щоб Excel коректно відкривав UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in _iter_batches(build_query, batch_size):
+        for record in batch:
+            record['jurisdictions'] = "; ".join(record['jurisdictions'])
+            writer.writerow([record[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(build_query, batch_size: int = None):
+    for batch in _iter_batches(build_query, batch_size):
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode("utf-8")
+
+
+class _ChunkSink:
+    """Файлоподібний приймач для ParquetWriter: накопичені байти забираються після кожної row group."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_parquet(build_query, batch_size: int = None):
+    """Кожна партія записується окремою row group, тож у пам'яті не більше однієї партії."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.string()),
+        # Наївний час із SQLite зберігається в UTC, тож інтерпретується як UTC
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('latitude', pa.float64()),
+        ('longitude', pa.float64()),
+        ('subtotal', pa.float64()),
+        ('composite_tax_rate', pa.float64()),
+        ('tax_amount', pa.float64()),
+        ('total_amount', pa.float64()),
+        ('state_rate', pa.float64()),
+        ('county_rate', pa.float64()),
+        ('city_rate', pa.float64()),
+        ('special_rates', pa.float64()),
+        ('jurisdictions', pa.list_(pa.string())),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for batch in _iter_batches(build_query, batch_size, iso_timestamps=False):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import struct
+import hashlib
+import logging
+import shapely
+import numpy as np
+from shapely.geometry import shape
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "data"))
+GEOJSON_PATH = os.path.join(DATA_DIR, "ny_counties.geojson")
+CACHE_PATH = os.path.join(DATA_DIR, "ny_counties.geocache")
+
+# Буфер 0.001 градуса (~100м) для обробки локацій на мостах або узбережжях
+BUFFER_DEG = 0.001
+SIMPLIFY_DEG = 0.002
+
+CACHE_MAGIC = b"NYGEO\x00"
+CACHE_FORMAT_VERSION = 3
+
+# Службові коди комірок сітки пошуку (невід'ємні значення — індекс округу)
+CELL_OUTSIDE = -1
+CELL_MIXED = -2
+
+
+def source_hash(source_path: str = GEOJSON_PATH) -> str:
+    """SHA-256 вихідного GeoJSON — ключ валідності кешу."""
+    with open(source_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _cache_key(source_path: str) -> dict:
+    return {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source_sha256": source_hash(source_path),
+        "buffer": BUFFER_DEG,
+        "simplify": SIMPLIFY_DEG,
+    }
+
+
+def county_fips(geoid: str) -> str:
+    """П'ятизначний FIPS-код округу (штат + округ) з GEOID виду 05000US36041."""
+    return geoid.rsplit("US", 1)[-1][-5:] if geoid else ""
+
+
+def process_geojson(source_path: str = GEOJSON_PATH):
+    """
+    Парсить GeoJSON і повертає назви округів, оброблені (buffer + simplify) полігони для пошуку,
+    вихідні межі без буфера (за ними розв'язуються точки, що потрапили в кілька полігонів)
+    та FIPS-коди округів.
+    """
+    names, polygons, boundaries, fips = [], [], [], []
+    with open(source_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for feature in data.get("features", []):
+        names.append(feature["properties"].get("name", "").replace(" County", "").strip())
+        fips.append(county_fips(feature["properties"].get("geoid", "")))
+        geometry = shape(feature["geometry"])
+        polygons.append(geometry.buffer(BUFFER_DEG).simplify(SIMPLIFY_DEG))
+        boundaries.append(geometry)
+    return names, polygons, boundaries, fips
+
+
+def build_grid(polygons, spatial_index, grid_params: dict) -> np.ndarray:
+    """
+    Будує рівномірну сітку над bounding box NY.
+    Комірка, що повністю лежить всередині одного округу, зберігає його індекс,
+    комірка поза всіма полігонами — CELL_OUTSIDE, а прикордонна — CELL_MIXED
+    (для неї виконується точна перевірка через R-Tree).
+    """
+    cell = grid_params["cell_size"]
+    n_rows = int(np.ceil((grid_params["lat_max"] - grid_params["lat_min"]) / cell))
+    n_cols = int(np.ceil((grid_params["lon_max"] - grid_params["lon_min"]) / cell))
+
+    lons, lats = np.meshgrid(
+        grid_params["lon_min"] + np.arange(n_cols) * cell,
+        grid_params["lat_min"] + np.arange(n_rows) * cell
+    )
+    lons, lats = lons.ravel(), lats.ravel()
+    boxes = shapely.box(lons, lats, lons + cell, lats + cell)
+
+    grid = np.full(boxes.size, CELL_OUTSIDE, dtype=np.int16)
+    box_idx, poly_idx = spatial_index.query(boxes, predicate='intersects')
+    hits = np.bincount(box_idx, minlength=boxes.size)
+    grid[hits > 0] = CELL_MIXED
+
+    # Комірка належить округу лише тоді, коли перетинає рівно один полігон і лежить строго всередині нього
+    single = hits[box_idx] == 1
+    box_idx, poly_idx = box_idx[single], poly_idx[single]
+    inside = shapely.contains_properly(np.asarray(polygons)[poly_idx], boxes[box_idx])
+    grid[box_idx[inside]] = poly_idx[inside]
+
+    logger.info(
+        f"Сітку пошуку {n_rows}x{n_cols} побудовано. "
+        f"Внутрішніх комірок: {int(inside.sum())}, прикордонних: {int((grid == CELL_MIXED).sum())}"
+    )
+    return grid.reshape(n_rows, n_cols)
+
+
+def write_cache(names, polygons, boundaries, fips, grid=None, grid_params=None,
+                source_path: str = GEOJSON_PATH, cache_path: str = CACHE_PATH) -> str:
+    """
+    Зберігає бінарний кеш геоданих: заголовок (JSON з ключем валідності, назвами та FIPS-кодами округів),
+    WKB-представлення оброблених полігонів і вихідних меж та, за наявності, сітку пошуку.
+    """
+    blobs = shapely.to_wkb(polygons)
+    boundary_blobs = shapely.to_wkb(boundaries)
+
+    header = _cache_key(source_path)
+    header["names"] = list(names)
+    header["fips"] = list(fips)
+    header["sizes"] = [len(blob) for blob in blobs]
+    header["boundary_sizes"] = [len(blob) for blob in boundary_blobs]
+    if grid is not None:
+        header["grid_params"] = grid_params
+        header["grid_shape"] = list(grid.shape)
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CACHE_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+        for blob in boundary_blobs:
+            f.write(blob)
+        if grid is not None:
+            f.write(grid.astype("<i2").tobytes())
+    os.replace(tmp_path, cache_path)
+
+    logger.info(f"Кеш геоданих збережено у {cache_path} ({len(names)} округів).")
+    return cache_path
+
+
+def load_cache(source_path: str = GEOJSON_PATH, cache_path: str = CACHE_PATH):
+    """
+    Завантажує оброблені полігони, вихідні межі (та сітку, якщо вона є) з бінарного кешу.
+    Повертає dict з ключами names, fips, polygons, boundaries, grid, grid_params або None,
+    якщо кеш відсутній чи застарів.
+    """
+    if not os.path.exists(cache_path):
+        return None
+
+    with open(cache_path, "rb") as f:
+        if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            logger.warning(f"Файл {cache_path} не є кешем геоданих, ігноруємо.")
+            return None
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+        payload = f.read()
+
+    expected = _cache_key(source_path)
+    if any(header.get(key) != value for key, value in expected.items()):
+        logger.warning("Кеш геоданих застарів (змінились вихідні дані або параметри обробки), ігноруємо.")
+        return None
+
+    def read_blobs(sizes, offset):
+        blobs = []
+        for size in sizes:
+            blobs.append(payload[offset:offset + size])
+            offset += size
+        return blobs, offset
+
+    blobs, offset = read_blobs(header["sizes"], 0)
+    boundary_blobs, offset = read_blobs(header["boundary_sizes"], offset)
+
+    grid = None
+    if "grid_shape" in header:
+        grid = np.frombuffer(payload, dtype="<i2", offset=offset).reshape(header["grid_shape"]).astype(np.int16)
+
+    return {
+        "names": header["names"],
+        "fips": header["fips"],
+        "polygons": list(shapely.from_wkb(blobs)),
+        "boundaries": list(shapely.from_wkb(boundary_blobs)),
+        "grid": grid,
+        "grid_params": header.get("grid_params"),
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.services.geo_cache         — лише полігони (не потребує налаштувань додатку)
+    # python -m app.services.geo_cache --grid  — полігони та сітка пошуку з параметрами з config
+    logging.basicConfig(level=logging.INFO)
+    names, polygons, boundaries, fips = process_geojson()
+    grid, grid_params = None, None
+    if "--grid" in sys.argv[1:]:
+        from shapely.strtree import STRtree
+        from app.core.config import settings
+
+        grid_params = {
+            "cell_size": settings.GEO_GRID_CELL_SIZE,
+            "lat_min": settings.NY_LAT_MIN,
+            "lat_max": settings.NY_LAT_MAX,
+            "lon_min": settings.NY_LON_MIN,
+            "lon_max": settings.NY_LON_MAX,
+        }
+        grid = build_grid(polygons, STRtree(polygons), grid_params)
+    write_cache(names, polygons, boundaries, fips, grid, grid_params)
@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import pandas as pd
+from sqlalchemy import select
+from app.db.database import SessionLocal
+from app.db.models.models import ImportFile, Order
+
+logger = logging.getLogger(__name__)
+
+# Розмір блоку читання файлу для хешування та кількість відбитків в одному запиті IN (...)
+HASH_BLOCK_SIZE = 1024 * 1024
+FINGERPRINT_LOOKUP_BATCH = 500
+
+EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(fileobj) -> tuple:
+    """(SHA-256, розмір у байтах) вмісту файлоподібного об'єкта; після читання позиція повертається на початок."""
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+        size += len(block)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+def fingerprint(latitude: float, longitude: float, subtotal: float, epoch_us: int) -> str:
+    """Відбиток замовлення: координати, сума та час (мікросекунди від епохи, UTC)."""
+    key = f"{latitude:.6f}|{longitude:.6f}|{subtotal:.2f}|{epoch_us}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def row_fingerprints(frame: pd.DataFrame) -> list:
+    """Відбитки рядків DataFrame з колонками latitude, longitude, subtotal, timestamp (UTC)."""
+    epoch_us = (pd.to_datetime(frame['timestamp'], utc=True) - EPOCH) // pd.Timedelta(microseconds=1)
+    return [
+        fingerprint(lat, lon, subtotal, us)
+        for lat, lon, subtotal, us in zip(frame['latitude'], frame['longitude'], frame['subtotal'], epoch_us)
+    ]
+
+
+def find_import(session, digest: str) -> dict:
+    """
+    Збережений результат імпорту файлу з таким самим вмістом або None (синхронна Session).
+    Застарілий запис (stale) не повертається: частину замовлень файлу могли видалити.
+    """
+    record = session.get(ImportFile, digest)
+    if record is None or record.stale:
+        return None
+    return {
+        "total_processed": record.total_processed,
+        "success_count": record.success_count,
+        "error_count": record.error_count,
+        "duplicate_count": record.duplicate_count,
+        "errors": record.errors or [],
+        "already_imported": True,
+        "imported_at": record.created_at,
+    }
+
+
+def check_import(session, digest: str) -> tuple:
+    """
+    (збережений результат або None, чи застарів запис про файл).
+    Файл із застарілим записом обробляється знову з обов'язковим пропуском рядків, що вже є в БД
+    (RowDeduplicator з required=True): відновлюються лише видалені замовлення.
+    """
+    stored = find_import(session, digest)
+    if stored is not None:
+        return stored, False
+    record = session.get(ImportFile, digest)
+    if record is not None:
+        logger.info(f"Запис про файл {digest[:12]} застарів після видалення замовлень, файл буде оброблено знову.")
+        return None, True
+    return None, False
+
+
+def mark_stale(session, digest: str):
+    """Позначає застарілим запис про файл, з якого імпортовано видалене замовлення."""
+    session.query(ImportFile).filter(ImportFile.content_hash == digest).update(
+        {ImportFile.stale: True}, synchronize_session=False
+    )
+
+
+def record_import(session, digest: str, filename: str, file_size: int, result: dict):
+    """
+    Запам'ятовує результат імпорту в тій самій транзакції, що й записані замовлення
+    (застарілий запис про той самий файл замінюється).
+    """
+    session.merge(ImportFile(
+        content_hash=digest,
+        filename=filename,
+        file_size=file_size,
+        total_processed=result["total_processed"],
+        success_count=result["success_count"],
+        error_count=result["error_count"],
+        duplicate_count=result.get("duplicate_count", 0),
+        errors=result["errors"],
+        stale=False,
+    ))
+
+
+class RowDeduplicator:
+    """
+    Відсіює рядки, відбиток яких уже є в orders (пошук за індексом ix_orders_fingerprint)
+    або вже трапився раніше в цьому ж імпорті. Створюється на один імпорт.
+    session — синхронна сесія імпорту (бачить ще не зафіксовані блоки); без неї кожна
+    перевірка виконується в окремій короткій сесії.
+    required — пропуск обов'язковий (повторний імпорт застарілого файлу): файл без колонки часу
+    відхиляється, бо його рядки неможливо зіставити з наявними.
+    """
+
+    def __init__(self, session=None, required: bool = False):
+        self.session = session
+        self.required = required
+        self.seen = set()
+        self.skipped = 0
+
+    def _existing(self, session, fingerprints: list) -> set:
+        existing = set()
+        for start in range(0, len(fingerprints), FINGERPRINT_LOOKUP_BATCH):
+            batch = fingerprints[start:start + FINGERPRINT_LOOKUP_BATCH]
+            existing.update(session.execute(select(Order.fingerprint).where(Order.fingerprint.in_(batch))).scalars())
+        return existing
+
+    def filter(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Повертає лише нові рядки; колонка fingerprint додається до frame."""
+        frame['fingerprint'] = row_fingerprints(frame)
+        fingerprints = frame['fingerprint']
+        candidates = ~fingerprints.duplicated() & ~fingerprints.isin(self.seen)
+
+        lookup = fingerprints[candidates].tolist()
+        if self.session is not None:
+            existing = self._existing(self.session, lookup)
+        else:
+            with SessionLocal() as session:
+                existing = self._existing(session, lookup)
+
+        keep = candidates & ~fingerprints.isin(existing)
+        self.seen.update(fingerprints[keep])
+        skipped = int((~keep).sum())
+        if skipped:
+            self.skipped += skipped
+            logger.info(f"Пропущено рядків-дублікатів: {skipped}.")
+        return frame[keep]
@@ -0,0 +1,162 @@
+import os
+import shutil
+import logging
+import tempfile
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.models import ImportJob
+from app.services.order_service import OrderService
+from app.services import import_dedup
+from app.services.tax_service import get_tax_service
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_import_executor() -> ThreadPoolExecutor:
+    """Пул воркерів для фонових імпортів (створюється при першому використанні)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import-job")
+    return _executor
+
+
+def _spool_upload(file: UploadFile) -> str:
+    """Копіює завантажений файл у тимчасовий файл, який переживе завершення HTTP-запиту."""
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".csv", dir=settings.IMPORT_JOBS_DIR)
+    with os.fdopen(fd, "wb") as out:
+        file.file.seek(0)
+        shutil.copyfileobj(file.file, out, length=1024 * 1024)
+    return path
+
+
+async def submit_import_job(db, file: UploadFile, dedupe: bool = None) -> ImportJob:
+    """Приймає файл, створює запис завдання (db — AsyncSession) і ставить його в чергу пулу воркерів."""
+    path = await run_in_threadpool(_spool_upload, file)
+
+    job = ImportJob(filename=file.filename, status="queued", file_size=os.path.getsize(path))
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    get_import_executor().submit(run_import_job, job.id, path, dedupe)
+    logger.info(f"Завдання імпорту {job.id} ({file.filename}) поставлено в чергу.")
+    return job
+
+
+def _update_job(job_id: str, **fields):
+    db = SessionLocal()
+    try:
+        db.query(ImportJob).filter(ImportJob.id == job_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_import_job(job_id: str, path: str, dedupe: bool = None):
+    """Виконується у воркері: потоковий імпорт файлу з оновленням прогресу завдання в БД."""
+    db = SessionLocal()
+    try:
+        # Усередині try: якщо оновлення статусу впаде, finally все одно видалить тимчасовий файл
+        _update_job(job_id, status="running", started_at=datetime.now(timezone.utc))
+        with open(path, "rb") as source:
+            digest, file_size = import_dedup.hash_file(source)
+            stored, stale = import_dedup.check_import(db, digest)
+            if stored is not None:
+                # Той самий файл уже імпортовано: завдання завершується збереженим результатом
+                _update_job(
+                    job_id,
+                    status="completed",
+                    detail="Файл з таким самим вмістом уже імпортовано, повторна обробка пропущена",
+                    bytes_processed=file_size,
+                    rows_processed=stored["total_processed"],
+                    success_count=stored["success_count"],
+                    error_count=stored["error_count"],
+                    errors=stored["errors"],
+                    finished_at=datetime.now(timezone.utc),
+                )
+                logger.info(f"Завдання імпорту {job_id}: файл уже імпортовано ({digest[:12]}).")
+                return
+
+            def report_progress(stats: dict):
+                _update_job(
+                    job_id,
+                    bytes_processed=source.tell(),
+                    rows_processed=stats["total_processed"],
+                    success_count=stats["success_count"],
+                    error_count=stats["error_count"],
+                )
+
+            service = OrderService(db, get_tax_service())
+            job = db.get(ImportJob, job_id)
+            result = service.import_csv_stream(
+                source, on_chunk=report_progress, dedupe=dedupe,
+                import_file=(digest, job.filename if job else None, file_size), stale=stale
+            )
+
+        # Без ключа "chunks" результат означає, що у файлі бракує обов'язкових колонок
+        missing_columns = "chunks" not in result
+        status = "failed" if missing_columns else "completed"
+        _update_job(
+            job_id,
+            status=status,
+            detail=result["errors"][0]["reason"] if missing_columns else None,
+            bytes_processed=os.path.getsize(path),
+            rows_processed=result["total_processed"],
+            success_count=result["success_count"],
+            error_count=result["error_count"],
+            errors=result["errors"],
+            finished_at=datetime.now(timezone.utc),
+        )
+        logger.info(f"Завдання імпорту {job_id} завершено зі статусом {status}.")
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Помилка фонового імпорту {job_id}: {detail}")
+        _update_job(job_id, status="failed", detail=detail, finished_at=datetime.now(timezone.utc))
+    finally:
+        db.close()
+        os.remove(path)
+
+
+def get_job_progress(job: ImportJob) -> dict:
+    """Формує відповідь зі станом завдання, швидкістю обробки та оцінкою часу до завершення."""
+    throughput, eta = None, None
+    if job.started_at:
+        started_at = job.started_at if job.started_at.tzinfo else job.started_at.replace(tzinfo=timezone.utc)
+        finished_at = job.finished_at or datetime.now(timezone.utc)
+        if finished_at.tzinfo is None:
+            finished_at = finished_at.replace(tzinfo=timezone.utc)
+        elapsed = (finished_at - started_at).total_seconds()
+
+        if elapsed > 0 and job.rows_processed:
+            throughput = round(job.rows_processed / elapsed, 1)
+        if job.status == "running" and job.bytes_processed and job.file_size:
+            # Оцінка за часткою вже прочитаних байтів файлу
+            eta = round(elapsed * (job.file_size - job.bytes_processed) / job.bytes_processed, 1)
+
+    progress = min(job.bytes_processed / job.file_size, 1.0) if job.file_size else 0.0
+    if job.status == "completed":
+        progress = 1.0
+
+    return {
+        "job_id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "progress": round(progress, 4),
+        "rows_processed": job.rows_processed,
+        "success_count": job.success_count,
+        "error_count": job.error_count,
+        "rows_per_second": throughput,
+        "eta_seconds": eta,
+        "errors": job.errors or [],
+        "detail": job.detail,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,139 @@
+import logging
+import threading
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from app.db.database import SessionLocal
+from app.db.models.models import JurisdictionProfile
+
+logger = logging.getLogger(__name__)
+
+RATE_FIELDS = ('state_rate', 'county_rate', 'city_rate', 'special_rates')
+
+
+def _key(county: str, breakdown: dict) -> tuple:
+    """Ключ профілю: округ і складові ставки (округлені, щоб не залежати від похибок float)."""
+    return (county, *(round(float(breakdown[field]), 6) for field in RATE_FIELDS))
+
+
+def county_from_jurisdictions(jurisdictions: list) -> str:
+    """Назва округу з останнього елемента переліку ("Kings County (Borough)" -> "Kings")."""
+    last = jurisdictions[-1]
+    for suffix in (" County (Borough)", " County"):
+        if last.endswith(suffix):
+            return last[:-len(suffix)]
+    return last
+
+
+class ProfileRegistry:
+    """
+    Кеш профілів юрисдикцій у пам'яті процесу.
+    Для поточної таблиці ставок тримає матрицю id профілю [версія ставок, код округу]: батч
+    отримує profile_id одним gather. Відсутні профілі створюються в БД при першій синхронізації
+    (warm_up при старті воркера або ids з нової таблиці ставок — лише поза циклом подій).
+    get лише читає кеш: профілі, створені іншими процесами, обробники довантажують заздалегідь
+    через ensure (db.run_sync), тож серіалізація відповідей не звертається до БД.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._profiles = {}
+        self._ids_by_key = {}
+        self._rate_table = None
+        self._matrix = None
+
+    def _load(self, db):
+        """Дочитує профілі з БД; профілі незмінні, тож нові лише додаються до кешу."""
+        profiles, ids_by_key = dict(self._profiles), dict(self._ids_by_key)
+        for row in db.query(JurisdictionProfile):
+            breakdown = {field: getattr(row, field) for field in RATE_FIELDS}
+            profiles[row.id] = {
+                "county": row.county,
+                "breakdown": breakdown,
+                "jurisdictions": list(row.jurisdictions),
+            }
+            ids_by_key[_key(row.county, breakdown)] = row.id
+        self._profiles, self._ids_by_key = profiles, ids_by_key
+
+    def _sync(self, rate_table):
+        """Створює профілі для всіх комбінацій (версія, округ) таблиці ставок і будує матрицю id."""
+        n_versions, n_counties = rate_table.state.shape
+        keys = {}
+        for version in range(n_versions):
+            for code in range(n_counties):
+                county = rate_table.county_names[code]
+                keys[(version, code)] = _key(county, rate_table.breakdown(version, code))
+
+        with self._session_factory() as db:
+            for attempt in range(2):
+                self._load(db)
+                missing = {}
+                for (version, code), key in keys.items():
+                    if key not in self._ids_by_key and key not in missing:
+                        missing[key] = JurisdictionProfile(
+                            county=key[0],
+                            **dict(zip(RATE_FIELDS, key[1:])),
+                            jurisdictions=list(rate_table.jurisdictions[code])
+                        )
+                if not missing:
+                    break
+                try:
+                    db.add_all(missing.values())
+                    db.commit()
+                    logger.info(f"Створено профілів юрисдикцій: {len(missing)}.")
+                except IntegrityError:
+                    # Ті самі профілі одночасно створив інший процес — перечитуємо таблицю
+                    db.rollback()
+            self._load(db)
+
+        matrix = np.empty((n_versions, n_counties), dtype=np.int64)
+        for (version, code), key in keys.items():
+            matrix[version, code] = self._ids_by_key[key]
+        self._rate_table, self._matrix = rate_table, matrix
+
+    def is_synced(self, rate_table) -> bool:
+        return self._rate_table is rate_table
+
+    def warm_up(self, rate_table):
+        """Синхронізація з таблицею ставок до першого запиту (блокуючий доступ до БД)."""
+        with self._lock:
+            if self._rate_table is not rate_table:
+                self._sync(rate_table)
+
+    def ids(self, rate_table, versions, codes) -> np.ndarray:
+        """
+        profile_id для масивів версій ставок і кодів округів.
+        Для ще не синхронізованої таблиці ставок звертається до БД — викликати в пулі потоків.
+        """
+        with self._lock:
+            if self._rate_table is not rate_table:
+                self._sync(rate_table)
+            matrix = self._matrix
+        return matrix[np.asarray(versions), np.asarray(codes)]
+
+    def missing(self, profile_ids) -> bool:
+        """Чи є серед profile_ids профілі, яких ще немає в кеші."""
+        return any(pid is not None and pid not in self._profiles for pid in profile_ids)
+
+    def refresh(self, db):
+        """Дочитує профілі через передану синхронну Session (для AsyncSession — через run_sync)."""
+        self._load(db)
+
+    async def ensure(self, db, profile_ids):
+        """Довантажує відсутні профілі (профіль міг створити інший процес з новішою таблицею ставок)."""
+        if self.missing(profile_ids):
+            await db.run_sync(self.refresh)
+
+    def get(self, profile_id) -> dict:
+        """Профіль за id ({county, breakdown, jurisdictions}) або None; лише кеш, без звернення до БД."""
+        if profile_id is None:
+            return None
+        return self._profiles.get(profile_id)
+
+    def reset(self):
+        with self._lock:
+            self._profiles, self._ids_by_key = {}, {}
+            self._rate_table, self._matrix = None, None
+
+
+profile_registry = ProfileRegistry()
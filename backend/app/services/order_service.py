@@ -5,27 +5,55 @@ import logging
 import pandas as pd
 from datetime import datetime, timezone
 from fastapi import UploadFile, HTTPException
+from sqlalchemy.exc import IntegrityError
 from app.db.models.models import Order
+from app.core.config import settings
+from app.core import metrics
+from app.services import stats_service, import_dedup
+from app.services.bulk_writer import get_bulk_writer, ORDER_COLUMNS
+from app.services.cpu_executor import cpu_executor
+from app.services.jurisdiction_profiles import profile_registry
 
 logger = logging.getLogger(__name__)
 
 class OrderService:
+    # Розумний мапінг колонок (підтримка англійських та українських назв)
+    COLUMN_ALIASES = {
+        'latitude': ['latitude', 'lat', 'широта (lat)', 'широта'],
+        'longitude': ['longitude', 'lon', 'довгота (lon)', 'довгота'],
+        'subtotal': ['subtotal', 'сума (subtotal)', 'сума', 'amount'],
+        'timestamp': ['timestamp', 'date', 'datetime', 'дата', 'дата и время', 'дата та час', 'час', 'time'],
+    }
+    REQUIRED_COLUMNS = {'latitude', 'longitude', 'subtotal'}
+    INSERT_COLUMNS = ORDER_COLUMNS
+    MAX_REPORTED_ERRORS = 50
+
     def __init__(self, db, tax_service):
+        """
+        db — AsyncSession для async-методів (обробники HTTP) або синхронна Session для
+        import_csv_stream, що виконується у фонових воркерах.
+        """
         self.db = db
         self.tax_service = tax_service
+        # Стратегія масового запису (executemany / COPY) за діалектом БД сесії
+        self.writer = get_bulk_writer(db.get_bind().dialect)
 
     async def delete_order(self, order_id: str):
         """Видалення замовлення за його ID."""
         # Шукаємо замовлення в базі
-        order = self.db.query(Order).filter(Order.id == order_id).first()
+        order = await self.db.get(Order, order_id)
         
         if not order:
             logger.warning(f"Спроба видалити неіснуюче замовлення: {order_id}")
             raise HTTPException(status_code=404, detail="Замовлення не знайдено")
             
         try:
-            self.db.delete(order)
-            self.db.commit()
+            await self.db.run_sync(stats_service.apply_order, order, -1)
+            if order.import_hash:
+                # Збережений результат імпорту файлу більше не відповідає рядкам у БД
+                await self.db.run_sync(import_dedup.mark_stale, order.import_hash)
+            await self.db.delete(order)
+            await self.db.commit()
             logger.info(f"Замовлення {order_id} успішно видалено.")
             return {
                 "status": "success", 
@@ -33,7 +61,7 @@ class OrderService:
                 "deleted_id": order_id
             }
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Помилка при видаленні замовлення {order_id}: {e}")
             raise HTTPException(status_code=500, detail="Внутрішня помилка сервера при видаленні")
         
@@ -45,138 +73,459 @@ class OrderService:
             order_data.subtotal
         )
 
+        versions, codes = [tax["rate_version"]], [tax["county_code"]]
+        if profile_registry.is_synced(self.tax_service.rate_table):
+            profile_id = self._profile_ids(versions, codes)[0]
+        else:
+            # Синхронізація профілів з новою таблицею ставок звертається до БД — поза циклом подій
+            profile_id = (await cpu_executor.run(self._profile_ids, versions, codes))[0]
+
+        timestamp = datetime.now(timezone.utc)
         new_order = Order(
             id=str(uuid.uuid4()),
-            timestamp=datetime.now(timezone.utc),
+            timestamp=timestamp,
             latitude=order_data.latitude,
             longitude=order_data.longitude,
             subtotal=order_data.subtotal,
             composite_tax_rate=tax["composite_tax_rate"],
             tax_amount=tax["tax_amount"],
             total_amount=tax["total_amount"],
-            breakdown=tax["breakdown"],
-            jurisdictions=tax["jurisdictions"]
+            profile_id=profile_id,
+            county_fips=tax["county_fips"],
+            fingerprint=import_dedup.fingerprint(
+                order_data.latitude, order_data.longitude, order_data.subtotal,
+                (timestamp - import_dedup.EPOCH) // pd.Timedelta(microseconds=1)
+            )
         )
 
         self.db.add(new_order)
-        self.db.commit()
-        self.db.refresh(new_order)
+        await self.db.run_sync(stats_service.apply_order, new_order)
+        await self.db.commit()
+        await self.db.refresh(new_order)
         return new_order
 
-    async def process_csv_import(self, file: UploadFile):
-        """Векторизований масовий імпорт із Pandas та масовим записом у БД."""
+    def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Перейменовує колонки файлу у стандартні назви."""
+        col_map = {}
+        for col in df.columns:
+            col_lower = col.lower()
+            for target, aliases in self.COLUMN_ALIASES.items():
+                if col_lower in aliases:
+                    col_map[col] = target
+                    break
+        return df.rename(columns=col_map)
+
+    def _missing_columns_result(self, df: pd.DataFrame) -> dict:
+        return {
+            "total_processed": 0, "success_count": 0, "error_count": 1,
+            "errors": [{"row": "-", "reason": f"У файлі відсутні необхідні колонки. Знайдено: {list(df.columns)}"}]
+        }
+
+    def _coerce_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Валідація та очищення даних: нечислові значення відкидаються."""
+        df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+        df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+        df['subtotal'] = pd.to_numeric(df['subtotal'], errors='coerce')
+        return df.dropna(subset=['latitude', 'longitude', 'subtotal'])
+
+    def _parse_timestamps(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Обробка дати та часу з файлу до розрахунку податків: ставка обирається на момент замовлення.
+        Значення приводяться до UTC, порожні/биті заповнюються поточним часом.
+        """
+        if 'timestamp' in df.columns:
+            # Конвертуємо значення колонки в об'єкти datetime
+            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+            
+            # Приводимо до UTC, якщо часового поясу немає в даних
+            if df['timestamp'].dt.tz is None:
+                df['timestamp'] = df['timestamp'].dt.tz_localize('UTC')
+            else:
+                df['timestamp'] = df['timestamp'].dt.tz_convert('UTC')
+                
+            # Якщо є порожні/биті значення, заповнюємо їх поточним часом у UTC
+            now_utc = pd.Timestamp.now(tz='UTC')
+            df['timestamp'] = df['timestamp'].fillna(now_utc)
+        return df
+
+    def _profile_ids(self, versions, codes) -> list:
+        """id профілів юрисдикцій для пар (версія ставок, код округу)."""
+        return profile_registry.ids(self.tax_service.rate_table, versions, codes).tolist()
+
+    def _prepare_rows(self, valid_df: pd.DataFrame, import_hash: str = None):
+        """
+        CPU-частина запису: генерує ID, рахує зміни денних агрегатів і готує дані для bulk writer.
+        import_hash — хеш файлу, з якого імпортуються рядки.
+        Повертає (payload, deltas); не звертається до БД, тож може виконуватися у пулі CPU.
+        """
+        with metrics.stage("prepare_rows"):
+            valid_df['id'] = [str(uuid.uuid4()) for _ in range(len(valid_df))]
+            valid_df['import_hash'] = import_hash
+            valid_df['profile_id'] = self._profile_ids(valid_df['rate_version'], valid_df['county_code'])
+            if 'timestamp' not in valid_df.columns:
+                # Якщо колонки timestamp немає, ставимо поточний час
+                valid_df['timestamp'] = pd.Timestamp.now(tz='UTC')
+            if 'fingerprint' not in valid_df.columns:
+                valid_df['fingerprint'] = import_dedup.row_fingerprints(valid_df)
+            deltas = stats_service.daily_deltas(valid_df)
+            return self.writer.prepare(valid_df[self.INSERT_COLUMNS]), deltas
+
+    def _write_rows(self, session, payload, deltas: list) -> int:
+        """
+        Масовий запис підготовлених рядків разом з оновленням денних агрегатів у тій самій
+        транзакції сесії. Повертає кількість записаних рядків.
+        Синхронна функція: для AsyncSession викликається через run_sync.
+        """
+        with metrics.stage("db_insert"):
+            stats_service.apply_deltas(session, deltas)
+            return self.writer.write(session, payload)
+
+    def _insert_valid_rows(self, session, valid_df: pd.DataFrame, import_hash: str = None) -> int:
+        """Підготовка та запис рядків в одному потоці (синхронний імпорт у фонових воркерах)."""
+        return self._write_rows(session, *self._prepare_rows(valid_df, import_hash))
+
+    def _collect_errors(self, invalid_df: pd.DataFrame, errors_list: list):
+        """Формування списку помилок (не більше MAX_REPORTED_ERRORS записів)."""
+        for idx in invalid_df.index:
+            if len(errors_list) >= self.MAX_REPORTED_ERRORS:
+                break
+            errors_list.append({
+                "row": int(idx) + 2, 
+                "reason": "Координати знаходяться поза межами штату Нью-Йорк"
+            })
+
+    def _finalize_errors(self, errors_list: list, invalid_total: int) -> list:
+        if invalid_total > self.MAX_REPORTED_ERRORS:
+            errors_list.append({
+                "row": "...",
+                "reason": f"Та ще {invalid_total - self.MAX_REPORTED_ERRORS} рядків з такою ж помилкою приховано..."
+            })
+        return errors_list
+
+    async def create_orders_batch(self, orders_data: list):
+        """
+        Пакетне створення замовлень: векторний розрахунок податків для всього масиву
+        та один масовий запис у БД. Повертає результат для кожного елемента у вхідному порядку.
+        """
+        prepared = await cpu_executor.run(self._prepare_batch, orders_data)
+        if prepared["records"]:
+            try:
+                await self.db.run_sync(self._write_rows, prepared["records"], prepared["deltas"])
+                await self.db.commit()
+            except Exception as e:
+                await self.db.rollback()
+                logger.error(f"Помилка пакетного створення замовлень: {e}")
+                raise HTTPException(status_code=500, detail="Внутрішня помилка сервера при збереженні замовлень")
+
+        logger.info(f"Пакетне створення: успішно {prepared['success_count']}, помилок {prepared['error_count']}.")
+        return {
+            "total": len(orders_data),
+            "success_count": prepared["success_count"],
+            "error_count": prepared["error_count"],
+            "results": prepared["results"]
+        }
+
+    def _prepare_batch(self, orders_data: list) -> dict:
+        """CPU-частина пакетного створення: податки, рядки для запису та результати по елементах."""
+        df = pd.DataFrame(
+            [order.model_dump() for order in orders_data],
+            columns=['latitude', 'longitude', 'subtotal']
+        )
+        valid_df, invalid_df = self.tax_service.enrich_dataframe_with_taxes(df)
+
+        records, deltas, created = [], [], {}
+        if not valid_df.empty:
+            # Округлення як для одиночного замовлення
+            valid_df['composite_tax_rate'] = valid_df['composite_tax_rate'].round(5)
+            valid_df['tax_amount'] = valid_df['tax_amount'].round(2)
+            valid_df['total_amount'] = (valid_df['subtotal'] + valid_df['tax_amount']).round(2)
+            records, deltas = self._prepare_rows(valid_df)
+
+            for idx, row in zip(valid_df.index, valid_df.to_dict('records')):
+                created[idx] = {
+                    "id": row['id'],
+                    "timestamp": row['timestamp'].to_pydatetime(),
+                    "latitude": row['latitude'],
+                    "longitude": row['longitude'],
+                    "subtotal": row['subtotal'],
+                    "composite_tax_rate": row['composite_tax_rate'],
+                    "tax_amount": row['tax_amount'],
+                    "total_amount": row['total_amount'],
+                    "profile_id": row['profile_id'],
+                    "county_fips": row['county_fips'],
+                }
+
+        results = []
+        for idx in range(len(df)):
+            if idx in created:
+                results.append({"index": idx, "status": "created", "order": created[idx]})
+            else:
+                results.append({"index": idx, "status": "error", "error": "Точка знаходиться поза межами штату Нью-Йорк."})
+
+        return {
+            "records": records,
+            "deltas": deltas,
+            "results": results,
+            "success_count": len(created),
+            "error_count": len(invalid_df),
+        }
+
+    def _deduplicator(self, dedupe: bool = None, session=None, stale: bool = False):
+        """
+        RowDeduplicator для імпорту, якщо пропуск наявних рядків увімкнено (запитом або IMPORT_DEDUPE_ROWS).
+        Для файлу із застарілим записом (stale) пропуск обов'язковий незалежно від dedupe.
+        """
+        if stale:
+            return import_dedup.RowDeduplicator(session, required=True)
+        enabled = settings.IMPORT_DEDUPE_ROWS if dedupe is None else dedupe
+        return import_dedup.RowDeduplicator(session) if enabled else None
+
+    async def _already_imported(self, digest: str, filename: str) -> tuple:
+        """(збережений результат або None, чи застарів запис про файл) — див. import_dedup.check_import."""
+        stored, stale = await self.db.run_sync(import_dedup.check_import, digest)
+        if stored is not None:
+            logger.info(f"Файл {filename} уже імпортовано ({digest[:12]}), повторна обробка пропущена.")
+        return stored, stale
+
+    async def _commit_import(self, digest: str, filename: str, file_size: int, result: dict) -> dict:
+        """
+        Фіксує транзакцію разом із записом про файл. Якщо той самий файл паралельно імпортував
+        інший запит, транзакція відкочується і повертається збережений результат.
+        """
+        await self.db.run_sync(import_dedup.record_import, digest, filename, file_size, result)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            logger.warning(f"Файл {filename} одночасно імпортовано іншим запитом, результат відкочено.")
+            return await self.db.run_sync(import_dedup.find_import, digest)
+        return result
+
+    async def process_csv_import(self, file: UploadFile, dedupe: bool = None):
+        """
+        Векторизований масовий імпорт із Pandas та масовим записом у БД.
+        Повторне завантаження файлу з тим самим вмістом повертає збережений результат без обробки;
+        з dedupe рядки, що вже є в БД, пропускаються.
+        """
         start_time = time.time()
         
         try:
-            content = await file.read()
-            df = pd.read_csv(io.BytesIO(content))
-            
-            # Розумний мапінг колонок (підтримка англійських та українських назв)
-            col_map = {}
-            for col in df.columns:
-                col_lower = col.lower()
-                if col_lower in ['latitude', 'lat', 'широта (lat)', 'широта']:
-                    col_map[col] = 'latitude'
-                elif col_lower in ['longitude', 'lon', 'довгота (lon)', 'довгота']:
-                    col_map[col] = 'longitude'
-                elif col_lower in ['subtotal', 'сума (subtotal)', 'сума', 'amount']:
-                    col_map[col] = 'subtotal'
-                elif col_lower in ['timestamp', 'date', 'datetime', 'дата', 'дата и время', 'дата та час', 'час', 'time']:
-                    col_map[col] = 'timestamp'
-            
-            df.rename(columns=col_map, inplace=True)
-            
-            if not {'latitude', 'longitude', 'subtotal'}.issubset(df.columns):
-                return {
-                    "total_processed": 0, "success_count": 0, "error_count": 1,
-                    "errors": [{"row": "-", "reason": f"У файлі відсутні необхідні колонки. Знайдено: {list(df.columns)}"}]
-                }
-            
-            # Валідація та очищення даних
-            df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
-            df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
-            df['subtotal'] = pd.to_numeric(df['subtotal'], errors='coerce')
-            df = df.dropna(subset=['latitude', 'longitude', 'subtotal'])
+            with metrics.stage("upload_read"):
+                content = await file.read()
+            digest = import_dedup.content_hash(content)
+            stored, stale = await self._already_imported(digest, file.filename)
+            if stored is not None:
+                return stored
 
-            total_processed = len(df)
+            # Розбір файлу, податки та підготовка рядків — у пулі CPU, поза циклом подій
+            deduplicator = self._deduplicator(dedupe, stale=stale)
+            df, prepared = await cpu_executor.run(self._read_and_prepare_file, content, deduplicator, digest)
+            
+            if prepared is None:
+                return self._missing_columns_result(df)
             
-            # Векторна обробка податків
-            valid_df, invalid_df = self.tax_service.enrich_dataframe_with_taxes(df)
+            total_processed, invalid_df, rows = prepared
             invalid_count = len(invalid_df)
             success_count = 0
 
-            if not valid_df.empty:
-                valid_df['id'] = [str(uuid.uuid4()) for _ in range(len(valid_df))]
-                
-                # --- ОБРОБКА ДАТИ ТА ЧАСУ З ФАЙЛУ ---
-                if 'timestamp' in valid_df.columns:
-                    # Конвертуємо значення колонки в об'єкти datetime
-                    valid_df['timestamp'] = pd.to_datetime(valid_df['timestamp'], errors='coerce')
-                    
-                    # Приводимо до UTC, якщо часового поясу немає в даних
-                    if valid_df['timestamp'].dt.tz is None:
-                        valid_df['timestamp'] = valid_df['timestamp'].dt.tz_localize('UTC')
-                    else:
-                        valid_df['timestamp'] = valid_df['timestamp'].dt.tz_convert('UTC')
-                        
-                    # Якщо є порожні/биті значення, заповнюємо їх поточним часом у UTC
-                    now_utc = pd.Timestamp.now(tz='UTC')
-                    valid_df['timestamp'] = valid_df['timestamp'].fillna(now_utc)
-                    
-                    # Переводимо у рядок формату ISO для запису в БД
-                    valid_df['timestamp'] = valid_df['timestamp'].apply(lambda x: x.isoformat())
-                else:
-                    # Якщо колонки timestamp немає, ставимо поточний час
-                    valid_df['timestamp'] = datetime.now(timezone.utc).isoformat()
-                # ------------------------------------
-                
-                columns_to_insert = [
-                    'id', 'timestamp', 'latitude', 'longitude', 'subtotal', 
-                    'composite_tax_rate', 'tax_amount', 'total_amount', 
-                    'breakdown', 'jurisdictions'
-                ]
-                
-                records_tuples = list(valid_df[columns_to_insert].itertuples(index=False, name=None))
-                
-                raw_conn = self.db.connection().connection
-                cursor = raw_conn.cursor()
-                
-                sql = """
-                INSERT INTO orders (id, timestamp, latitude, longitude, subtotal, composite_tax_rate, tax_amount, total_amount, breakdown, jurisdictions)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                
-                cursor.executemany(sql, records_tuples)
-                raw_conn.commit()
-                
-                success_count = len(records_tuples)
+            if rows:
+                success_count = await self.db.run_sync(self._write_rows, *rows)
 
-            # Формування списку помилок
             errors_list = []
-            if invalid_count > 0:
-                for idx in invalid_df.index:
-                    errors_list.append({
-                        "row": int(idx) + 2, 
-                        "reason": "Координати знаходяться поза межами штату Нью-Йорк"
-                    })
-                    if len(errors_list) >= 50:
-                        errors_list.append({
-                            "row": "...",
-                            "reason": f"Та ще {invalid_count - 50} рядків з такою ж помилкою приховано..."
-                        })
-                        break
+            self._collect_errors(invalid_df, errors_list)
 
             elapsed_time = time.time() - start_time
+            metrics.record_import("memory", success_count, invalid_count, elapsed_time)
             logger.info(f"Файл оброблено за {elapsed_time:.3f} с. Успішно: {success_count}, Помилок: {invalid_count}")
 
-            return {
+            result = {
                 "total_processed": total_processed,
                 "success_count": success_count,
                 "error_count": invalid_count,
-                "errors": errors_list
+                "duplicate_count": deduplicator.skipped if deduplicator else 0,
+                "errors": self._finalize_errors(errors_list, invalid_count)
             }
+            # Замовлення і запис про файл фіксуються однією транзакцією
+            return await self._commit_import(digest, file.filename, len(content), result)
 
+        except HTTPException:
+            raise
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Критична помилка імпорту CSV: {e}")
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def process_csv_import_streaming(self, file: UploadFile, chunk_size: int = None, commit_every: int = None,
+                                           dedupe: bool = None):
+        """
+        Потоковий імпорт CSV фіксованими блоками рядків з обмеженим споживанням пам'яті.
+        Кожен блок проходить векторний розрахунок податків і записується окремим батчем,
+        транзакція фіксується кожні commit_every блоків.
+        Файл запам'ятовується лише після успішного завершення: повтор перерваного імпорту
+        обробляється знову, тому для нього варто вмикати dedupe.
+        """
+        commit_every = commit_every or settings.IMPORT_COMMIT_EVERY
+        start_time = time.time()
+        stats = {"total_processed": 0, "success_count": 0, "error_count": 0, "duplicate_count": 0, "chunks": 0}
+        errors_list = []
+
+        try:
+            digest, file_size = await cpu_executor.run(import_dedup.hash_file, file.file)
+            stored, stale = await self._already_imported(digest, file.filename)
+            if stored is not None:
+                return stored
+
+            deduplicator = self._deduplicator(dedupe, stale=stale)
+            chunks = self._iter_chunks(file.file, chunk_size)
+            while True:
+                # Читання та обробка чергового блоку — у пулі CPU; у циклі подій лише запис у БД
+                chunk, prepared = await cpu_executor.run(self._read_and_prepare, chunks, deduplicator, digest)
+                if chunk is None:
+                    break
+                if prepared is None:
+                    return self._missing_columns_result(chunk)
+                processed, invalid_df, rows = prepared
+
+                if rows:
+                    stats["success_count"] += await self.db.run_sync(self._write_rows, *rows)
+                self._record_chunk(stats, errors_list, processed, invalid_df)
+
+                if stats["chunks"] % commit_every == 0:
+                    await self.db.commit()
+
+            await self.db.commit()
+            if deduplicator:
+                stats["duplicate_count"] = deduplicator.skipped
+            result = self._stream_result(stats, errors_list, start_time, "stream")
+            return await self._commit_import(digest, file.filename, file_size, result)
+
+        except HTTPException:
+            await self.db.rollback()
+            raise
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Критична помилка потокового імпорту CSV (збережено {stats['success_count']} рядків): {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    def _iter_chunks(self, source, chunk_size: int = None):
+        """Блоки рядків файлу з нормалізованими назвами колонок (час розбору кожного блоку — етап csv_parse)."""
+        reader = iter(pd.read_csv(source, chunksize=chunk_size or settings.IMPORT_CHUNK_SIZE))
+        while True:
+            start = time.perf_counter()
+            chunk = next(reader, None)
+            if chunk is None:
+                return
+            chunk = self._normalize_columns(chunk)
+            metrics.PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - start, stage="csv_parse")
+            yield chunk
+
+    def _read_and_prepare(self, chunks, deduplicator=None, import_hash: str = None):
+        """
+        Бере наступний блок з ітератора chunks та готує його до запису (без рядків,
+        відсіяних deduplicator).
+        Повертає (None, None) наприкінці файлу, (chunk, None), якщо бракує колонок,
+        інакше (chunk, (кількість коректних рядків, invalid_df, (records, deltas) або None)).
+        """
+        chunk = next(chunks, None)
+        if chunk is None:
+            return None, None
+        if not self.REQUIRED_COLUMNS.issubset(chunk.columns):
+            return chunk, None
+
+        processed, valid_df, invalid_df = self._prepare_chunk(chunk, deduplicator)
+        rows = self._prepare_rows(valid_df, import_hash) if not valid_df.empty else None
+        return chunk, (processed, invalid_df, rows)
+
+    def _read_and_prepare_file(self, content: bytes, deduplicator=None, import_hash: str = None):
+        """Те саме для цілого файлу в пам'яті як одного блоку."""
+        with metrics.stage("csv_parse"):
+            df = self._normalize_columns(pd.read_csv(io.BytesIO(content)))
+        return self._read_and_prepare(iter([df]), deduplicator, import_hash)
+
+    def _prepare_chunk(self, chunk: pd.DataFrame, deduplicator=None):
+        """
+        Очищення, розбір часу та векторний розрахунок податків для блоку.
+        Повертає (кількість коректних рядків, valid_df, invalid_df); рядки, що вже є в БД
+        або повторюються в імпорті, відсіюються deduplicator (якщо у файлі є час замовлення).
+        """
+        if deduplicator is not None and deduplicator.required and 'timestamp' not in chunk.columns:
+            raise HTTPException(
+                status_code=409,
+                detail="Файл без колонки часу вже імпортовано, але частину його замовлень видалено: "
+                       "повторний імпорт продублював би рядки, що лишилися в БД."
+            )
+        with metrics.stage("validate"):
+            chunk = self._parse_timestamps(self._coerce_numeric(chunk))
+        valid_df, invalid_df = self.tax_service.enrich_dataframe_with_taxes(chunk)
+        if deduplicator is not None and not valid_df.empty and 'timestamp' in valid_df.columns:
+            valid_df = deduplicator.filter(valid_df)
+        return len(chunk), valid_df, invalid_df
+
+    def _record_chunk(self, stats: dict, errors_list: list, processed: int, invalid_df: pd.DataFrame):
+        self._collect_errors(invalid_df, errors_list)
+        stats["total_processed"] += processed
+        stats["error_count"] += len(invalid_df)
+        stats["chunks"] += 1
+
+    def _stream_result(self, stats: dict, errors_list: list, start_time: float, mode: str) -> dict:
+        elapsed_time = time.time() - start_time
+        metrics.record_import(mode, stats["success_count"], stats["error_count"], elapsed_time)
+        logger.info(
+            f"Файл оброблено потоково за {elapsed_time:.3f} с ({stats['chunks']} блоків). "
+            f"Успішно: {stats['success_count']}, Помилок: {stats['error_count']}"
+        )
+        return {
+            **stats,
+            "errors": self._finalize_errors(errors_list, stats["error_count"])
+        }
+
+    def import_csv_stream(self, source, chunk_size: int = None, commit_every: int = None, on_chunk=None,
+                          dedupe: bool = None, import_file: tuple = None, stale: bool = False):
+        """
+        Синхронне ядро потокового імпорту для фонових воркерів (self.db — синхронна Session):
+        читає файлоподібний об'єкт source блоками.
+        on_chunk(stats) викликається після кожної фіксації транзакції зі зведенням прогресу.
+        import_file — (хеш, ім'я, розмір) файлу, що запам'ятовується після успішного імпорту;
+        stale — запис про цей файл застарів (див. import_dedup.check_import).
+        """
+        commit_every = commit_every or settings.IMPORT_COMMIT_EVERY
+        start_time = time.time()
+        stats = {"total_processed": 0, "success_count": 0, "error_count": 0, "duplicate_count": 0, "chunks": 0}
+        errors_list = []
+        deduplicator = self._deduplicator(dedupe, session=self.db, stale=stale)
+        import_hash = import_file[0] if import_file else None
+
+        try:
+            for chunk in self._iter_chunks(source, chunk_size):
+                if not self.REQUIRED_COLUMNS.issubset(chunk.columns):
+                    return self._missing_columns_result(chunk)
+                processed, valid_df, invalid_df = self._prepare_chunk(chunk, deduplicator)
+
+                if not valid_df.empty:
+                    stats["success_count"] += self._insert_valid_rows(self.db, valid_df, import_hash)
+                self._record_chunk(stats, errors_list, processed, invalid_df)
+
+                if stats["chunks"] % commit_every == 0:
+                    self.db.commit()
+                    if on_chunk:
+                        on_chunk(dict(stats))
+
+            self.db.commit()
+            if deduplicator:
+                stats["duplicate_count"] = deduplicator.skipped
+            result = self._stream_result(stats, errors_list, start_time, "background")
+            if import_file:
+                import_dedup.record_import(self.db, *import_file, result)
+                try:
+                    self.db.commit()
+                except IntegrityError:
+                    self.db.rollback()
+            return result
+
+        except HTTPException:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Критична помилка потокового імпорту CSV (збережено {stats['success_count']} рядків): {e}")
+            raise HTTPException(status_code=500, detail=str(e))
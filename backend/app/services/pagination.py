@@ -0,0 +1,74 @@
+import json
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(value, row_id: str, direction: str) -> str:
+    """Непрозорий курсор: значення ключа сортування, id рядка та напрямок гортання."""
+    if isinstance(value, datetime):
+        payload = {"t": "dt", "v": value.isoformat()}
+    else:
+        payload = {"t": "n", "v": value}
+    payload.update({"id": row_id, "d": direction})
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Повертає (значення, id, напрямок) або HTTP 400 для пошкодженого курсора."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = datetime.fromisoformat(payload["v"]) if payload["t"] == "dt" else payload["v"]
+        direction = payload["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return value, payload["id"], direction
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Невірний курсор пагінації")
+
+
+async def keyset_page(db, stmt, sort_column, id_column, descending: bool, limit: int, cursor: str = None):
+    """
+    Keyset-пагінація по (sort_column, id): замість OFFSET фільтр «після/до» останнього
+    побаченого рядка, тому глибина сторінки не впливає на вартість запиту.
+    stmt — select() сутності, db — AsyncSession. Повертає (рядки, next_cursor, prev_cursor).
+    """
+    direction = "next"
+    if cursor:
+        value, row_id, direction = decode_cursor(cursor)
+        # Для "prev" йдемо у зворотному порядку і потім розвертаємо сторінку
+        forward = descending if direction == "next" else not descending
+        if forward:
+            condition = or_(sort_column < value, and_(sort_column == value, id_column < row_id))
+        else:
+            condition = or_(sort_column > value, and_(sort_column == value, id_column > row_id))
+        stmt = stmt.where(condition)
+
+    reverse = direction == "prev"
+    scan_descending = descending != reverse
+    if scan_descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+
+    rows = list((await db.execute(stmt.limit(limit + 1))).scalars().all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if reverse:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    sort_key = sort_column.key
+    first, last = rows[0], rows[-1]
+    if reverse:
+        next_cursor = encode_cursor(getattr(last, sort_key), last.id, "next")
+        prev_cursor = encode_cursor(getattr(first, sort_key), first.id, "prev") if has_more else None
+    else:
+        next_cursor = encode_cursor(getattr(last, sort_key), last.id, "next") if has_more else None
+        prev_cursor = encode_cursor(getattr(first, sort_key), first.id, "prev") if cursor else None
+    return rows, next_cursor, prev_cursor
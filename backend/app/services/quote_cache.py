@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+
+class CountyLookupCache:
+    """
+    Обмежений LRU-кеш визначення округу за квантованими координатами.
+    Координати округлюються до precision знаків після коми (5 знаків ≈ 1 м), і округ
+    визначається саме для квантованої точки, тож результат для ключа детермінований.
+    """
+
+    def __init__(self, resolver, maxsize: int, precision: int):
+        self._resolver = resolver
+        self._maxsize = maxsize
+        self._precision = precision
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, lat: float, lon: float) -> tuple:
+        return round(lat, self._precision), round(lon, self._precision)
+
+    def peek(self, lat: float, lon: float):
+        """Код округу з кешу без точного пошуку; None при промаху (промах рахує наступний get)."""
+        key = self._key(lat, lon)
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return code
+
+    def get(self, lat: float, lon: float) -> int:
+        """Код округу для точки (-1, якщо точка поза NY)."""
+        key = self._key(lat, lon)
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return code
+            self.misses += 1
+
+        # Точний пошук виконується поза блокуванням, щоб не серіалізувати паралельні запити
+        code = self._resolver(*key)
+
+        with self._lock:
+            self._entries[key] = code
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return code
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self._maxsize,
+                "precision": self._precision,
+            }
@@ -0,0 +1,140 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RATES_CSV_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "utils", "nys_tax_rates.csv"))
+
+# Рядок CSV, що задає ставку для всіх боро Нью-Йорка, якщо для боро немає власного рядка
+NYC_ROW = "New York City"
+
+NYC_COUNTIES = ["New York", "Bronx", "Kings", "Queens", "Richmond"]
+MCTD_COUNTIES = [
+    "New York", "Bronx", "Kings", "Queens", "Richmond",
+    "Rockland", "Nassau", "Suffolk", "Orange", "Putnam", "Dutchess", "Westchester"
+]
+
+# Межі дат у наносекундах (int64), відкритий початок/кінець діапазону дії ставки
+OPEN_START = np.iinfo(np.int64).min
+OPEN_END = np.iinfo(np.int64).max
+
+
+def _to_ns(value) -> int:
+    """Дата початку/кінця дії ставки з CSV (UTC) у наносекундах; порожнє значення — None."""
+    if value is None or pd.isna(value) or str(value).strip() == "":
+        return None
+    ts = pd.Timestamp(str(value).strip())
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return int(ts.value)
+
+
+def to_order_times_ns(timestamps) -> np.ndarray:
+    """Переводить мітки часу замовлень (datetime-like, UTC) у масив int64 наносекунд."""
+    series = pd.to_datetime(pd.Series(timestamps), utc=True)
+    return series.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+class RateTable:
+    """
+    Скомпільована таблиця податкових ставок.
+    Округи кодуються цілими числами (індекс у списку county_names геоданих), а складові ставок
+    зберігаються як NumPy-масиви форми (версії, округи). Версія — проміжок часу, протягом якого
+    набір ставок незмінний; вибирається через np.searchsorted по часу замовлення.
+    """
+
+    def __init__(self, county_names, version_starts, state, county, city, special):
+        self.county_names = list(county_names)
+        self.version_starts = version_starts
+        self.state = state
+        self.county = county
+        self.city = city
+        self.special = special
+        self.composite = np.round(state + county + city + special, 6)
+
+        self.is_nyc = np.array([name in NYC_COUNTIES for name in self.county_names], dtype=bool)
+        self.jurisdictions = [self._jurisdictions_for(name) for name in self.county_names]
+
+    @staticmethod
+    def _jurisdictions_for(county: str) -> list:
+        if county in NYC_COUNTIES:
+            return ["New York State", "New York City", f"{county} County (Borough)"]
+        return ["New York State", f"{county} County"]
+
+    @property
+    def versions_count(self) -> int:
+        return len(self.version_starts)
+
+    def version_index(self, order_times_ns: np.ndarray) -> np.ndarray:
+        """Індекс версії ставок, чинної на момент кожного замовлення."""
+        return np.searchsorted(self.version_starts, order_times_ns, side="right") - 1
+
+    def breakdown(self, version: int, code: int) -> dict:
+        return {
+            "state_rate": float(self.state[version, code]),
+            "county_rate": float(self.county[version, code]),
+            "city_rate": float(self.city[version, code]),
+            "special_rates": float(self.special[version, code]),
+        }
+
+
+def compile_rate_table(county_names, csv_path: str = RATES_CSV_PATH) -> RateTable:
+    """
+    Компілює CSV зі ставками (County, Rate, State[, EffectiveFrom, EffectiveTo]) у RateTable.
+    Rate — композитна ставка; складові визначаються так: ставка штату — NY_STATE_TAX_RATE,
+    MCTD — MCTD_TAX_RATE для округів MCTD, решта припадає на місто (боро NYC) або округ.
+    Діапазони дат напіввідкриті: [EffectiveFrom, EffectiveTo), порожнє значення — без обмеження.
+    """
+    df = pd.read_csv(csv_path, dtype=str).fillna("")
+    df = df[df["State"].str.strip() == "NY"]
+
+    rows = []
+    for record in df.to_dict("records"):
+        start = _to_ns(record.get("EffectiveFrom"))
+        end = _to_ns(record.get("EffectiveTo"))
+        rows.append((
+            record["County"].strip(),
+            float(record["Rate"]),
+            OPEN_START if start is None else start,
+            OPEN_END if end is None else end,
+        ))
+
+    breakpoints = {OPEN_START}
+    for _, _, start, end in rows:
+        breakpoints.add(start)
+        if end != OPEN_END:
+            breakpoints.add(end)
+    version_starts = np.array(sorted(breakpoints), dtype=np.int64)
+
+    n_versions, n_counties = len(version_starts), len(county_names)
+    state = np.full((n_versions, n_counties), settings.NY_STATE_TAX_RATE)
+    county = np.zeros((n_versions, n_counties))
+    city = np.zeros((n_versions, n_counties))
+    special = np.zeros((n_versions, n_counties))
+
+    by_county = {}
+    for name, rate, start, end in rows:
+        by_county.setdefault(name, []).append((rate, start, end))
+
+    for code, name in enumerate(county_names):
+        is_nyc = name in NYC_COUNTIES
+        special_rate = settings.MCTD_TAX_RATE if name in MCTD_COUNTIES else 0.0
+        entries = by_county.get(name) or (by_county.get(NYC_ROW, []) if is_nyc else [])
+
+        for v, version_start in enumerate(version_starts):
+            composite = next((rate for rate, start, end in entries if start <= version_start < end), None)
+            if composite is None:
+                # Ставки немає у CSV — базова ставка округу з налаштувань
+                composite = settings.NY_STATE_TAX_RATE + settings.NY_COUNTY_TAX_RATE + special_rate
+
+            local_rate = round(composite - settings.NY_STATE_TAX_RATE - special_rate, 6)
+            special[v, code] = special_rate
+            if is_nyc:
+                city[v, code] = local_rate
+            else:
+                county[v, code] = local_rate
+
+    logger.info(f"Таблицю ставок скомпільовано: {n_counties} округів, версій: {n_versions}.")
+    return RateTable(county_names, version_starts, state, county, city, special)
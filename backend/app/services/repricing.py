@@ -0,0 +1,318 @@
+"""
+Переоцінка збережених замовлень за поточною таблицею ставок (зміна ставки округу, виправлення помилки).
+
+Замовлення читаються блоками в порядку id (keyset, без OFFSET), податки рахуються тим самим
+векторним кодом, що й для нових замовлень (TaxCalculatorService.apply_rates), а змінені рядки
+записуються одним масовим UPDATE разом з корекцією денних агрегатів. Округ береться зі збереженого
+county_fips; просторовий пошук виконується лише для рядків без нього (або для всіх з reresolve).
+
+Запуск з каталогу backend:
+    python -m app.services.repricing --dry-run
+    python -m app.services.repricing --start-date 2025-01-01 --end-date 2025-12-31
+    python -m app.services.repricing --resume <job_id>
+"""
+import json
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, time, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, update, func
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.models import Order, RepricingJob
+from app.services import stats_service
+from app.services.jurisdiction_profiles import profile_registry
+from app.services.tax_service import get_tax_service
+
+logger = logging.getLogger(__name__)
+
+ORDER_FIELDS = [
+    'id', 'timestamp', 'latitude', 'longitude', 'subtotal',
+    'composite_tax_rate', 'tax_amount', 'total_amount', 'profile_id', 'county_fips'
+]
+UPDATE_FIELDS = ['id', 'composite_tax_rate', 'tax_amount', 'total_amount', 'profile_id', 'county_fips']
+
+MAX_SAMPLES = 20
+
+_executor = None
+
+
+def get_repricing_executor() -> ThreadPoolExecutor:
+    """Один воркер: завдання переоцінки виконуються послідовно й не коригують агрегати одночасно."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reprice")
+    return _executor
+
+
+def _day_start(day) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _filtered(query, job: RepricingJob):
+    """Обмеження діапазоном днів завдання [start_date, end_date] (UTC)."""
+    if job.start_date:
+        query = query.where(Order.timestamp >= _day_start(job.start_date))
+    if job.end_date:
+        query = query.where(Order.timestamp < _day_start(job.end_date + timedelta(days=1)))
+    return query
+
+
+def new_job(dry_run: bool = False, reresolve: bool = False, start_date: date = None, end_date: date = None,
+            chunk_size: int = None) -> RepricingJob:
+    return RepricingJob(
+        status="queued",
+        dry_run=dry_run,
+        reresolve=reresolve,
+        start_date=start_date,
+        end_date=end_date,
+        chunk_size=chunk_size or settings.REPRICE_CHUNK_SIZE,
+        rows_total=0,
+        rows_processed=0,
+        rows_changed=0,
+        rows_unresolved=0,
+        tax_delta=0.0,
+        total_delta=0.0,
+    )
+
+
+def count_orders(db, job: RepricingJob) -> int:
+    """Кількість замовлень у діапазоні завдання (для прогресу). Синхронна Session."""
+    return db.execute(_filtered(select(func.count(Order.id)), job)).scalar_one()
+
+
+def submit_job(job_id: str):
+    get_repricing_executor().submit(run_repricing_job, job_id)
+    logger.info(f"Завдання переоцінки {job_id} поставлено в чергу.")
+
+
+class Repricer:
+    """Векторна переоцінка блоку збережених замовлень (DataFrame з колонками ORDER_FIELDS)."""
+
+    def __init__(self, tax_service):
+        self.tax_service = tax_service
+        self.code_by_fips = {fips: code for code, fips in enumerate(tax_service.county_fips)}
+
+    def _county_codes(self, frame: pd.DataFrame, reresolve: bool) -> np.ndarray:
+        codes = frame['county_fips'].map(self.code_by_fips).to_numpy(dtype=np.float64)
+        need = np.isnan(codes) | reresolve
+        codes = np.where(need, -1, codes).astype(np.int64)
+        if need.any():
+            codes[need] = self.tax_service._resolve_county_indices(
+                frame['latitude'].to_numpy()[need], frame['longitude'].to_numpy()[need]
+            )
+        return codes
+
+    def diff(self, frame: pd.DataFrame, reresolve: bool = False) -> dict:
+        """
+        Повертає before/after — збережені та нові значення змінених рядків (однаковий індекс)
+        і кількість рядків, для яких округ не визначено (лишаються без змін).
+        """
+        codes = self._county_codes(frame, reresolve)
+        resolved = codes >= 0
+        before = frame[resolved]
+
+        after = self.tax_service.apply_rates(
+            before[['id', 'timestamp', 'latitude', 'longitude', 'subtotal']].copy(), codes[resolved]
+        )
+        # Округлення як для одиночного та пакетного створення
+        after['composite_tax_rate'] = after['composite_tax_rate'].round(5)
+        after['tax_amount'] = after['tax_amount'].round(2)
+        after['total_amount'] = (after['subtotal'] + after['tax_amount']).round(2)
+        after['profile_id'] = profile_registry.ids(self.tax_service.rate_table, after['rate_version'], after['county_code'])
+
+        # Порівняння з точністю збереження (ставка — 5 знаків, суми — центи): імпорт CSV зберігає
+        # неокруглені значення, і різниця округлення не вважається зміною. NaN != x — теж зміна
+        changed = (
+            (after['composite_tax_rate'] != before['composite_tax_rate'].round(5))
+            | (after['tax_amount'] != before['tax_amount'].round(2))
+            | (after['total_amount'] != before['total_amount'].round(2))
+            | (after['profile_id'] != before['profile_id'])
+            | (after['county_fips'] != before['county_fips'])
+        )
+
+        before = before[changed].copy()
+        for column in ('composite_tax_rate', 'tax_amount', 'total_amount'):
+            before[column] = before[column].fillna(0.0)
+        return {"before": before, "after": after[changed], "unresolved": int((~resolved).sum())}
+
+
+def _summarize(summary: dict, before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """Додає зміни блоку до підсумку: за округами (новий FIPS) та перші MAX_SAMPLES прикладів."""
+    counties = {fips: dict(values) for fips, values in summary.get("counties", {}).items()}
+    tax_delta = after['tax_amount'] - before['tax_amount']
+    grouped = pd.DataFrame({'county_fips': after['county_fips'], 'tax_delta': tax_delta}).groupby('county_fips')
+    for fips, group in grouped:
+        county = counties.setdefault(fips, {"changed": 0, "tax_delta": 0.0})
+        county["changed"] += len(group)
+        county["tax_delta"] = round(county["tax_delta"] + float(group['tax_delta'].sum()), 2)
+
+    samples = list(summary.get("samples", []))
+    remaining = max(MAX_SAMPLES - len(samples), 0)
+    for old, new in zip(before.head(remaining).itertuples(), after.head(remaining).itertuples()):
+        samples.append({
+            "id": old.id,
+            "county_fips": [old.county_fips, new.county_fips],
+            "composite_tax_rate": [old.composite_tax_rate, new.composite_tax_rate],
+            "tax_amount": [old.tax_amount, new.tax_amount],
+        })
+    return {"counties": counties, "samples": samples}
+
+
+def _write_changes(db, before: pd.DataFrame, after: pd.DataFrame):
+    """Масовий UPDATE за первинним ключем і корекція денних агрегатів у поточній транзакції."""
+    records = [dict(zip(UPDATE_FIELDS, row)) for row in after[UPDATE_FIELDS].itertuples(index=False, name=None)]
+    db.execute(update(Order), records)
+    stats_service.apply_deltas(db, stats_service.change_deltas(before, after))
+
+
+def _set_status(job_id: str, **fields):
+    db = SessionLocal()
+    try:
+        db.query(RepricingJob).filter(RepricingJob.id == job_id).update(fields)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_repricing_job(job_id: str, on_chunk=None):
+    """
+    Виконує (або продовжує з last_order_id) завдання переоцінки. Кожен блок — одна транзакція:
+    оновлені замовлення, агрегати та прогрес завдання фіксуються разом. У режимі dry_run
+    замовлення не змінюються, накопичується лише підсумок змін.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(RepricingJob, job_id)
+        if job is None or job.status == "completed":
+            return
+        job.status = "running"
+        job.started_at = job.started_at or datetime.now(timezone.utc)
+        job.detail = None
+        db.commit()
+
+        repricer = Repricer(get_tax_service())
+        while True:
+            query = _filtered(select(*(getattr(Order, field) for field in ORDER_FIELDS)), job)
+            if job.last_order_id:
+                query = query.where(Order.id > job.last_order_id)
+            rows = db.execute(query.order_by(Order.id).limit(job.chunk_size)).all()
+            if not rows:
+                break
+
+            result = repricer.diff(pd.DataFrame(rows, columns=ORDER_FIELDS), job.reresolve)
+            before, after = result["before"], result["after"]
+            if not after.empty:
+                if not job.dry_run:
+                    _write_changes(db, before, after)
+                job.summary = _summarize(job.summary or {}, before, after)
+
+            job.last_order_id = rows[-1].id
+            job.rows_processed += len(rows)
+            job.rows_changed += len(after)
+            job.rows_unresolved += result["unresolved"]
+            job.tax_delta += float((after['tax_amount'] - before['tax_amount']).sum())
+            job.total_delta += float((after['total_amount'] - before['total_amount']).sum())
+            db.commit()
+            if on_chunk is not None:
+                on_chunk(job)
+
+        job.status = "completed"
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info(
+            f"Завдання переоцінки {job_id} завершено: оброблено {job.rows_processed}, "
+            f"змінено {job.rows_changed}{' (dry run)' if job.dry_run else ''}."
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Помилка переоцінки {job_id}: {e}")
+        _set_status(job_id, status="failed", detail=str(e), finished_at=datetime.now(timezone.utc))
+    finally:
+        db.close()
+
+
+def get_job_progress(job: RepricingJob) -> dict:
+    """Стан завдання переоцінки з прогресом, швидкістю та підсумком змін."""
+    throughput, eta = None, None
+    if job.started_at:
+        started_at = job.started_at if job.started_at.tzinfo else job.started_at.replace(tzinfo=timezone.utc)
+        finished_at = job.finished_at or datetime.now(timezone.utc)
+        if finished_at.tzinfo is None:
+            finished_at = finished_at.replace(tzinfo=timezone.utc)
+        elapsed = (finished_at - started_at).total_seconds()
+
+        if elapsed > 0 and job.rows_processed:
+            throughput = round(job.rows_processed / elapsed, 1)
+            if job.status == "running" and job.rows_total > job.rows_processed:
+                eta = round((job.rows_total - job.rows_processed) / throughput, 1)
+
+    progress = min(job.rows_processed / job.rows_total, 1.0) if job.rows_total else 0.0
+    if job.status == "completed":
+        progress = 1.0
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "dry_run": job.dry_run,
+        "reresolve": job.reresolve,
+        "start_date": job.start_date,
+        "end_date": job.end_date,
+        "progress": round(progress, 4),
+        "rows_total": job.rows_total,
+        "rows_processed": job.rows_processed,
+        "rows_changed": job.rows_changed,
+        "rows_unresolved": job.rows_unresolved,
+        "tax_delta": round(job.tax_delta, 2),
+        "total_delta": round(job.total_delta, 2),
+        "rows_per_second": throughput,
+        "eta_seconds": eta,
+        "summary": job.summary or {"counties": {}, "samples": []},
+        "detail": job.detail,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Переоцінка збережених замовлень за поточною таблицею ставок")
+    parser.add_argument("--dry-run", action="store_true", help="Лише підсумок змін, без запису в БД")
+    parser.add_argument("--reresolve", action="store_true", help="Визначати округ за координатами для всіх рядків")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None, help="Перший день YYYY-MM-DD (включно)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Останній день YYYY-MM-DD (включно)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Розмір блоку (за замовчуванням REPRICE_CHUNK_SIZE)")
+    parser.add_argument("--resume", metavar="JOB_ID", default=None, help="Продовжити перерване завдання")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    with SessionLocal() as db:
+        if args.resume:
+            job_id = args.resume
+        else:
+            job = new_job(args.dry_run, args.reresolve, args.start_date, args.end_date, args.chunk_size)
+            job.rows_total = count_orders(db, job)
+            db.add(job)
+            db.commit()
+            job_id = job.id
+    print(f"Завдання переоцінки {job_id}")
+
+    def report(job: RepricingJob):
+        print(f"  {job.rows_processed}/{job.rows_total} рядків, змінено {job.rows_changed}, "
+              f"зміна податку {job.tax_delta:+.2f}")
+
+    run_repricing_job(job_id, on_chunk=report)
+    with SessionLocal() as db:
+        job = db.get(RepricingJob, job_id)
+        if job is None:
+            raise SystemExit(f"Завдання {job_id} не знайдено")
+        print(json.dumps(get_job_progress(job), ensure_ascii=False, indent=2, default=str))
+        if job.status == "failed":
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
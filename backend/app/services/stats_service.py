@@ -0,0 +1,203 @@
+import logging
+import pandas as pd
+from datetime import date, datetime, timezone
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db.models.models import OrderDailyStats, OrderCountyDailyStats
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = ['order_count', 'subtotal_sum', 'tax_sum', 'total_sum', 'rate_sum']
+COUNTY_STAT_COLUMNS = ['order_count', 'subtotal_sum', 'tax_sum', 'total_sum']
+
+
+# Кількість змін агрегатів в одному executemany
+UPSERT_BATCH_SIZE = 1000
+
+
+def _group_deltas(values: pd.DataFrame, keys: list, columns: list, sign: int) -> list:
+    grouped = values.groupby(keys, sort=True)[columns].sum()
+    for column in columns:
+        # Приведення типу один раз на колонку, а не для кожної групи
+        grouped[column] = sign * grouped[column].astype('int64' if column == 'order_count' else 'float64')
+    return grouped.reset_index().to_dict('records')
+
+
+def daily_deltas(frame: pd.DataFrame, sign: int = 1) -> dict:
+    """
+    Групує замовлення за днем (UTC) і повертає зміни агрегатів:
+    'daily' — для кожного дня, 'county' — для кожної пари (день, FIPS округу).
+    Рядки без county_fips (замовлення, створені до появи колонки) потрапляють лише в 'daily'.
+    """
+    if 'timestamp' in frame.columns:
+        days = pd.to_datetime(frame['timestamp'], utc=True).dt.date
+    else:
+        days = pd.Series(datetime.now(timezone.utc).date(), index=frame.index)
+
+    values = pd.DataFrame({
+        'day': days,
+        'county_fips': frame['county_fips'] if 'county_fips' in frame.columns else None,
+        'order_count': 1,
+        'subtotal_sum': frame['subtotal'],
+        'tax_sum': frame['tax_amount'],
+        'total_sum': frame['total_amount'],
+        'rate_sum': frame['composite_tax_rate'],
+    })
+
+    return {
+        'daily': _group_deltas(values, ['day'], STAT_COLUMNS, sign),
+        # groupby відкидає рядки з порожнім county_fips
+        'county': _group_deltas(values, ['day', 'county_fips'], COUNTY_STAT_COLUMNS, sign),
+    }
+
+
+def change_deltas(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """
+    Зміни агрегатів при оновленні замовлень (before — збережені значення, after — нові, ті самі рядки):
+    before віднімається, after додається, зміни з однаковим ключем об'єднуються.
+    """
+    removed, added = daily_deltas(before, -1), daily_deltas(after, 1)
+    merged = {}
+    for kind, keys, columns in (('daily', ['day'], STAT_COLUMNS), ('county', ['day', 'county_fips'], COUNTY_STAT_COLUMNS)):
+        combined = {}
+        for delta in removed[kind] + added[kind]:
+            key = tuple(delta[k] for k in keys)
+            if key not in combined:
+                combined[key] = dict(delta)
+            else:
+                for column in columns:
+                    combined[key][column] += delta[column]
+        merged[kind] = list(combined.values())
+    return merged
+
+
+_UPSERT_STATEMENTS = {}
+
+
+def _upsert_statement(dialect: str, model, keys: list, columns: list):
+    """
+    Параметризований INSERT ... ON CONFLICT DO UPDATE для агрегату (один на модель і діалект):
+    значення передаються як executemany, тож SQL не залежить від кількості змін і компілюється один раз.
+    """
+    cache_key = (dialect, model)
+    stmt = _UPSERT_STATEMENTS.get(cache_key)
+    if stmt is None:
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(model, key) for key in keys],
+            set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in columns}
+        )
+        _UPSERT_STATEMENTS[cache_key] = stmt
+    return stmt
+
+
+def _upsert(db, model, keys: list, columns: list, deltas: list):
+    """Атомарно додає зміни до агрегатів (INSERT ... ON CONFLICT DO UPDATE) партіями по UPSERT_BATCH_SIZE."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        # Загальний варіант для інших СУБД: читання та оновлення рядків по днях
+        for delta in deltas:
+            stats = db.get(model, tuple(delta[key] for key in keys))
+            if stats is None:
+                db.add(model(**delta))
+            else:
+                for column in columns:
+                    setattr(stats, column, getattr(stats, column) + delta[column])
+        db.flush()
+        return
+
+    stmt = _upsert_statement(dialect, model, keys, columns)
+    for start in range(0, len(deltas), UPSERT_BATCH_SIZE):
+        db.execute(stmt, deltas[start:start + UPSERT_BATCH_SIZE])
+
+
+def apply_orders(db, frame: pd.DataFrame, sign: int = 1):
+    """
+    Оновлює денні агрегати для набору замовлень у поточній транзакції.
+    sign=1 — замовлення додано, sign=-1 — видалено. frame має містити timestamp, subtotal,
+    tax_amount, total_amount, composite_tax_rate та (для агрегатів за округами) county_fips.
+    """
+    if frame.empty:
+        return
+    apply_deltas(db, daily_deltas(frame, sign))
+
+
+def apply_deltas(db, deltas: dict):
+    """
+    Записує заздалегідь пораховані зміни (див. daily_deltas). Розділення дозволяє рахувати
+    зміни поза транзакцією (у пулі CPU), а в БД виконувати лише upsert.
+    """
+    for model, keys, columns, model_deltas in (
+        (OrderDailyStats, ['day'], STAT_COLUMNS, deltas.get('daily')),
+        (OrderCountyDailyStats, ['day', 'county_fips'], COUNTY_STAT_COLUMNS, deltas.get('county')),
+    ):
+        if not model_deltas:
+            continue
+        _upsert(db, model, keys, columns, model_deltas)
+        if any(delta['order_count'] < 0 for delta in model_deltas):
+            db.query(model).filter(model.order_count <= 0).delete(synchronize_session=False)
+
+
+def apply_order(db, order, sign: int = 1):
+    """Оновлює агрегати для одного ORM-замовлення."""
+    apply_orders(db, pd.DataFrame([{
+        'timestamp': order.timestamp or datetime.now(timezone.utc),
+        'subtotal': order.subtotal,
+        'tax_amount': order.tax_amount or 0.0,
+        'total_amount': order.total_amount or 0.0,
+        'composite_tax_rate': order.composite_tax_rate or 0.0,
+        'county_fips': order.county_fips,
+    }]), sign)
+
+
+def clear(db):
+    db.query(OrderDailyStats).delete(synchronize_session=False)
+    db.query(OrderCountyDailyStats).delete(synchronize_session=False)
+
+
+def get_totals(db, start_day: date = None, end_day: date = None) -> dict:
+    """Підсумки дашборду з денних агрегатів за діапазон днів [start_day, end_day] (включно)."""
+    query = db.query(
+        func.coalesce(func.sum(OrderDailyStats.order_count), 0),
+        func.coalesce(func.sum(OrderDailyStats.tax_sum), 0.0),
+        func.coalesce(func.sum(OrderDailyStats.rate_sum), 0.0),
+    )
+    if start_day:
+        query = query.filter(OrderDailyStats.day >= start_day)
+    if end_day:
+        query = query.filter(OrderDailyStats.day <= end_day)
+
+    order_count, tax_sum, rate_sum = query.one()
+    return {
+        "total": int(order_count),
+        "total_tax": float(tax_sum),
+        "avg_rate": float(rate_sum) / order_count if order_count else 0.0,
+    }
+
+
+def get_county_totals(db, start_day: date = None, end_day: date = None) -> list:
+    """Підсумки за округами (FIPS) з агрегатів за округом і днем за діапазон [start_day, end_day]."""
+    query = db.query(
+        OrderCountyDailyStats.county_fips,
+        func.sum(OrderCountyDailyStats.order_count),
+        func.sum(OrderCountyDailyStats.subtotal_sum),
+        func.sum(OrderCountyDailyStats.tax_sum),
+        func.sum(OrderCountyDailyStats.total_sum),
+    )
+    if start_day:
+        query = query.filter(OrderCountyDailyStats.day >= start_day)
+    if end_day:
+        query = query.filter(OrderCountyDailyStats.day <= end_day)
+
+    rows = query.group_by(OrderCountyDailyStats.county_fips).order_by(OrderCountyDailyStats.county_fips).all()
+    return [
+        {
+            "county_fips": county_fips,
+            "order_count": int(order_count),
+            "subtotal_sum": float(subtotal_sum),
+            "tax_sum": float(tax_sum),
+            "total_sum": float(total_sum),
+        }
+        for county_fips, order_count, subtotal_sum, tax_sum, total_sum in rows
+    ]
@@ -1,15 +1,24 @@
-import json
-import os
 import logging
+import threading
+import multiprocessing
 import shapely
 import numpy as np
 import pandas as pd
+from datetime import datetime, timezone
 from fastapi import HTTPException
-from shapely.geometry import Point, shape
 from shapely.strtree import STRtree
+from concurrent.futures import ProcessPoolExecutor
+from app.core.config import settings
+from app.core import metrics
+from app.services import geo_cache, rate_engine
+from app.services.quote_cache import CountyLookupCache
+from app.services.cpu_executor import cpu_executor
 
 logger = logging.getLogger(__name__)
 
+CELL_OUTSIDE = geo_cache.CELL_OUTSIDE
+CELL_MIXED = geo_cache.CELL_MIXED
+
 class TaxCalculatorService:
     """
     Сервіс для геопросторового розрахунку податків на доставку у штаті Нью-Йорк.
@@ -17,146 +26,322 @@ class TaxCalculatorService:
     """
     def __init__(self):
         self.polygons = []
+        self.boundaries = []
         self.county_names = []
+        self.county_fips = []
         self.spatial_index = None
+        self.lookup_grid = None
         
         self._load_geodata()
+        self._build_lookup_grid()
         
-        self.state_tax_rate = 0.04
-        self.mctd_rate = 0.00375
-        
-        self.mctd_counties = [
-            "New York", "Bronx", "Kings", "Queens", "Richmond", 
-            "Rockland", "Nassau", "Suffolk", "Orange", "Putnam", "Dutchess", "Westchester"
-        ]
-        
-        self.nyc_counties = ["New York", "Bronx", "Kings", "Queens", "Richmond"]
-        self.nyc_city_rate = 0.045
-        
-        self.county_tax_rates = {
-            "Erie": 0.0475, "Oneida": 0.0475,
-            "Allegany": 0.045,
-            "Nassau": 0.0425, "Suffolk": 0.0425, "Herkimer": 0.0425,
-            "Dutchess": 0.0375, "Orange": 0.0375,
-            "Ontario": 0.035,
-            "Saratoga": 0.03, "Warren": 0.03, "Washington": 0.03
-        }
+        # Ставки компілюються з nys_tax_rates.csv у масиви, індексовані кодом округу
+        self.rate_table = rate_engine.compile_rate_table(self.county_names)
+
+        # Кеш визначення округу для котирувань (повторні доставки на ті самі адреси)
+        self.county_cache = CountyLookupCache(
+            self._get_county_index,
+            maxsize=settings.QUOTE_CACHE_SIZE,
+            precision=settings.QUOTE_CACHE_PRECISION
+        )
 
     def _load_geodata(self):
-        """Завантажує GeoJSON та ініціалізує просторовий індекс (R-Tree)."""
-        filepath = os.path.join(os.path.dirname(__file__), "..", "data", "ny_counties.geojson")
+        """
+        Завантажує оброблені полігони округів та ініціалізує просторовий індекс (R-Tree).
+        Спочатку пробує бінарний кеш (див. geo_cache), інакше парсить GeoJSON.
+        """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for feature in data.get('features', []):
-                    name = feature['properties'].get('name', '').replace(' County', '').strip()
-                    
-                    # Буфер 0.001 градуса (~100м) для обробки локацій на мостах або узбережжях
-                    polygon = shape(feature['geometry']).buffer(0.001).simplify(0.002)
-                    
-                    self.polygons.append(polygon)
-                    self.county_names.append(name)
-                
-                self.spatial_index = STRtree(self.polygons)
+            cached = geo_cache.load_cache()
+            if cached is not None:
+                self.county_names, self.county_fips = cached["names"], cached["fips"]
+                self.polygons, self.boundaries = cached["polygons"], cached["boundaries"]
+                if cached["grid_params"] == self._grid_params():
+                    self.lookup_grid = cached["grid"]
+                logger.info("Геодані NY завантажено з бінарного кешу.")
+            else:
+                self.county_names, self.polygons, self.boundaries, self.county_fips = geo_cache.process_geojson()
+
+            # Підготовлені (prepared) полігони: перевірка точки без повного обходу контуру
+            self.polygons = np.asarray(self.polygons, dtype=object)
+            self.boundaries = np.asarray(self.boundaries, dtype=object)
+            shapely.prepare(self.polygons)
+            self.spatial_index = STRtree(self.polygons)
             logger.info("Просторовий індекс геоданих NY успішно ініціалізовано.")
         except Exception as e:
             logger.error(f"Помилка завантаження геоданих NY: {e}")
 
-    def _get_county_by_coords(self, lat: float, lon: float) -> str:
-        """Пошук округу за координатами через просторовий індекс."""
+    def _grid_params(self) -> dict:
+        return {
+            "cell_size": settings.GEO_GRID_CELL_SIZE,
+            "lat_min": settings.NY_LAT_MIN,
+            "lat_max": settings.NY_LAT_MAX,
+            "lon_min": settings.NY_LON_MIN,
+            "lon_max": settings.NY_LON_MAX,
+        }
+
+    def _build_lookup_grid(self):
+        """Будує сітку швидкого пошуку округу, якщо її не було в кеші, та зберігає її у кеш."""
+        if not self.spatial_index or self.lookup_grid is not None:
+            return
+
+        grid_params = self._grid_params()
+        self.lookup_grid = geo_cache.build_grid(self.polygons, self.spatial_index, grid_params)
+        try:
+            geo_cache.write_cache(
+                self.county_names, self.polygons, self.boundaries, self.county_fips, self.lookup_grid, grid_params
+            )
+        except OSError as e:
+            logger.warning(f"Не вдалося зберегти кеш геоданих: {e}")
+
+    def _grid_lookup(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Повертає код комірки сітки для кожної точки (CELL_MIXED для точок поза сіткою)."""
+        codes = np.full(len(lats), CELL_MIXED, dtype=np.int16)
+        if self.lookup_grid is None:
+            return codes
+
+        cell = settings.GEO_GRID_CELL_SIZE
+        n_rows, n_cols = self.lookup_grid.shape
+        finite = np.isfinite(lats) & np.isfinite(lons)
+        rows = np.full(len(lats), -1, dtype=np.int64)
+        cols = np.full(len(lats), -1, dtype=np.int64)
+        rows[finite] = np.floor((lats[finite] - settings.NY_LAT_MIN) / cell)
+        cols[finite] = np.floor((lons[finite] - settings.NY_LON_MIN) / cell)
+
+        in_grid = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        codes[in_grid] = self.lookup_grid[rows[in_grid], cols[in_grid]]
+        return codes
+
+    def _resolve_county_indices(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Векторизоване визначення індексу округу для масиву точок (-1, якщо точка поза NY).
+        Внутрішні точки визначаються через сітку за O(1), точна перевірка — лише для прикордонних.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        codes = self._grid_lookup(lats, lons)
+
+        result = codes.astype(np.int64)
+        result[codes == CELL_OUTSIDE] = -1
+
+        mixed = np.flatnonzero(codes == CELL_MIXED)
+        result[mixed] = -1
+        metrics.GRID_LOOKUPS_TOTAL.inc(len(codes) - len(mixed), result="resolved")
+        metrics.GRID_LOOKUPS_TOTAL.inc(len(mixed), result="mixed")
+        if len(mixed) > 0 and self.spatial_index:
+            metrics.SPATIAL_QUERIES_TOTAL.inc(kind="bulk")
+            metrics.SPATIAL_QUERY_POINTS_TOTAL.inc(len(mixed), kind="bulk")
+            result[mixed] = self._match_polygons(lats[mixed], lons[mixed], kind="bulk")
+
+        return result
+
+    def _match_polygons(self, lats: np.ndarray, lons: np.ndarray, kind: str) -> np.ndarray:
+        """
+        Точна перевірка точок через R-Tree та підготовлені полігони (-1, якщо точка поза NY).
+        Буферизовані полігони сусідніх округів перекриваються; точку з кількома збігами отримує
+        округ з найближчою вихідною (без буфера) межею, за рівної відстані — з меншим індексом.
+        """
+        result = np.full(len(lats), -1, dtype=np.int64)
+        pt_idx, poly_idx = self.spatial_index.query(shapely.points(lons, lats))
+        hit = shapely.intersects_xy(self.polygons[poly_idx], lons[pt_idx], lats[pt_idx])
+        pt_idx, poly_idx = pt_idx[hit], poly_idx[hit]
+
+        ambiguous = np.bincount(pt_idx, minlength=len(lats))[pt_idx] > 1
+        result[pt_idx[~ambiguous]] = poly_idx[~ambiguous]
+        if not ambiguous.any():
+            return result
+
+        pt_idx, poly_idx = pt_idx[ambiguous], poly_idx[ambiguous]
+        distance = shapely.distance(self.boundaries[poly_idx], shapely.points(lons[pt_idx], lats[pt_idx]))
+        order = np.lexsort((poly_idx, distance, pt_idx))
+        pt_idx, poly_idx = pt_idx[order], poly_idx[order]
+        nearest = np.r_[True, pt_idx[1:] != pt_idx[:-1]]
+        result[pt_idx[nearest]] = poly_idx[nearest]
+
+        ambiguous_count = int(nearest.sum())
+        metrics.SPATIAL_AMBIGUOUS_POINTS_TOTAL.inc(ambiguous_count, kind=kind)
+        if kind == "bulk":
+            logger.info(f"Точок у перекритті кількох округів: {ambiguous_count}.")
+        return result
+
+    def _get_county_index(self, lat: float, lon: float) -> int:
+        """Пошук коду округу за координатами: спочатку сітка, для прикордонних комірок — просторовий індекс."""
         if not self.spatial_index: 
+            return -1
+
+        code = self._grid_lookup(np.array([lat], dtype=np.float64), np.array([lon], dtype=np.float64))[0]
+        if code >= 0:
+            metrics.GRID_LOOKUPS_TOTAL.inc(result="resolved")
+            return int(code)
+        if code == CELL_OUTSIDE:
+            metrics.GRID_LOOKUPS_TOTAL.inc(result="resolved")
+            return -1
+
+        metrics.GRID_LOOKUPS_TOTAL.inc(result="mixed")
+        metrics.SPATIAL_QUERIES_TOTAL.inc(kind="single")
+        metrics.SPATIAL_QUERY_POINTS_TOTAL.inc(kind="single")
+        # Та сама перевірка, що й у пакетному шляху, — результати одиночного і пакетного пошуку збігаються
+        return int(self._match_polygons(np.array([lat], dtype=np.float64), np.array([lon], dtype=np.float64), kind="single")[0])
+
+    def _get_county_by_coords(self, lat: float, lon: float) -> str:
+        """Пошук назви округу за координатами."""
+        code = self._get_county_index(lat, lon)
+        return self.county_names[code] if code >= 0 else None
+
+    def _order_times_ns(self, df: pd.DataFrame) -> np.ndarray:
+        """Час замовлень (int64 нс, UTC) для вибору версії ставок; без дати — поточний час."""
+        now_utc = pd.Timestamp.now(tz='UTC')
+        if 'timestamp' not in df.columns:
+            return np.full(len(df), now_utc.value, dtype=np.int64)
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce', utc=True).fillna(now_utc)
+        return rate_engine.to_order_times_ns(timestamps)
+
+    async def calculate_full_tax_info(self, lat: float, lon: float, subtotal: float, timestamp: datetime = None) -> dict:
+        """Розрахунок податків для одиночного замовлення з точним розподілом юрисдикцій (у пулі CPU)."""
+        return await cpu_executor.run(self.tax_info, lat, lon, subtotal, timestamp)
+
+    def tax_info(self, lat: float, lon: float, subtotal: float, timestamp: datetime = None) -> dict:
+        """Синхронне ядро calculate_full_tax_info."""
+        code = self._get_county_index(lat, lon)
+        if code < 0:
+            raise HTTPException(status_code=400, detail="Точка знаходиться поза межами штату Нью-Йорк.")
+
+        return self.build_tax_info(code, subtotal, timestamp)
+
+    def quote(self, lat: float, lon: float, subtotal: float, timestamp: datetime = None) -> dict:
+        """
+        Котирування податку без створення замовлення.
+        Округ визначається через LRU-кеш квантованих координат, решта — як у calculate_full_tax_info.
+        """
+        return self._quote_for(self.county_cache.get(lat, lon), subtotal, timestamp)
+
+    def quote_cached(self, lat: float, lon: float, subtotal: float, timestamp: datetime = None):
+        """Котирування лише з кешу округів (без точного пошуку); None при промаху кешу."""
+        code = self.county_cache.peek(lat, lon)
+        if code is None:
             return None
-        point = Point(lon, lat) 
-        candidate_indices = self.spatial_index.query(point)
-        for idx in candidate_indices:
-            if self.polygons[idx].contains(point):
-                return self.county_names[idx]
-        return None 
-
-    async def calculate_full_tax_info(self, lat: float, lon: float, subtotal: float) -> dict:
-        """Розрахунок податків для одиночного замовлення з точним розподілом юрисдикцій."""
-        county = self._get_county_by_coords(lat, lon)
-        if not county:
+        return self._quote_for(code, subtotal, timestamp)
+
+    def _quote_for(self, code: int, subtotal: float, timestamp: datetime = None) -> dict:
+        if code < 0:
             raise HTTPException(status_code=400, detail="Точка знаходиться поза межами штату Нью-Йорк.")
+        return {"county": self.county_names[code], **self.build_tax_info(code, subtotal, timestamp)}
 
-        is_nyc = county in self.nyc_counties
-        
-        city_rate = self.nyc_city_rate if is_nyc else 0.0
-        county_rate = 0.0 if is_nyc else self.county_tax_rates.get(county, 0.04)
-        special_rate = self.mctd_rate if county in self.mctd_counties else 0.0
-        
-        total_rate = self.state_tax_rate + county_rate + city_rate + special_rate
-        tax_amount = subtotal * total_rate
+    def build_tax_info(self, code: int, subtotal: float, timestamp: datetime = None) -> dict:
+        """Податки для округу з кодом code за ставками, чинними на момент timestamp (за замовчуванням — зараз)."""
+        order_time = timestamp or datetime.now(timezone.utc)
+        version = self.rate_table.version_index(rate_engine.to_order_times_ns([order_time]))[0]
 
-        jurisdictions = ["New York State"]
-        if is_nyc:
-            jurisdictions.extend(["New York City", f"{county} County (Borough)"])
-        else:
-            jurisdictions.append(f"{county} County")
+        total_rate = float(self.rate_table.composite[version, code])
+        tax_amount = subtotal * total_rate
 
         return {
             "composite_tax_rate": round(total_rate, 5),
             "tax_amount": round(tax_amount, 2),
             "total_amount": round(subtotal + tax_amount, 2),
-            "breakdown": {
-                "state_rate": self.state_tax_rate,
-                "county_rate": county_rate,
-                "city_rate": city_rate,
-                "special_rates": special_rate
-            },
-            "jurisdictions": jurisdictions
+            "breakdown": self.rate_table.breakdown(version, code),
+            "jurisdictions": list(self.rate_table.jurisdictions[code]),
+            # Координати профілю юрисдикцій (див. jurisdiction_profiles) для збереження замовлення
+            "county_code": int(code),
+            "county_fips": self.county_fips[code],
+            "rate_version": int(version)
         }
 
     def enrich_dataframe_with_taxes(self, df: pd.DataFrame):
-        """Векторизована обробка податків для масиву замовлень (Pandas DataFrame)."""
-        points = shapely.points(df['longitude'], df['latitude'])
-        pt_idx, poly_idx = self.spatial_index.query(points, predicate='intersects')
+        """
+        Векторизована обробка податків для масиву замовлень (Pandas DataFrame).
+        Великі батчі (від TAX_PARALLEL_MIN_ROWS рядків) розбиваються на шарди і обробляються
+        пулом процесів, якщо TAX_PARALLEL_WORKERS > 1. Порядок рядків зберігається.
+        """
+        workers = settings.TAX_PARALLEL_WORKERS
+        if workers <= 1 or len(df) < settings.TAX_PARALLEL_MIN_ROWS:
+            return self._enrich_single(df)
+
+        bounds = np.linspace(0, len(df), workers + 1, dtype=int)
+        shards = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        # Метрики етапів у процесах пулу недоступні головному процесу — вимірюється весь розрахунок
+        with metrics.stage("enrich_parallel"):
+            results = list(get_enrich_pool().map(_enrich_shard, shards))
+
+        valid_df = pd.concat([valid for valid, _ in results])
+        invalid_df = pd.concat([invalid for _, invalid in results])
+        return valid_df, invalid_df
+
+    def _enrich_single(self, df: pd.DataFrame):
+        """Однопроцесна векторизована обробка податків."""
+        with metrics.stage("spatial_join"):
+            county_idx = self._resolve_county_indices(df['latitude'].to_numpy(), df['longitude'].to_numpy())
         
-        df['county'] = None
-        if len(pt_idx) > 0:
-            county_array = np.array(self.county_names)
-            df.iloc[pt_idx, df.columns.get_loc('county')] = county_array[poly_idx]
+        county_array = np.array(self.county_names, dtype=object)
+        df['county'] = np.where(county_idx >= 0, county_array[np.maximum(county_idx, 0)], None)
 
-        valid_df = df[df['county'].notnull()].copy()
-        invalid_df = df[df['county'].isnull()].copy()
+        is_valid = county_idx >= 0
+        valid_df = df[is_valid].copy()
+        invalid_df = df[~is_valid].copy()
         
         if valid_df.empty:
             return valid_df, invalid_df
 
-        valid_df['state_tax_rate'] = self.state_tax_rate
-        valid_df['is_nyc'] = valid_df['county'].isin(self.nyc_counties)
-        
-        valid_df['city_rate'] = np.where(valid_df['is_nyc'], self.nyc_city_rate, 0.0)
-        valid_df['county_tax_rate'] = np.where(
-            valid_df['is_nyc'], 
-            0.0, 
-            valid_df['county'].map(self.county_tax_rates).fillna(0.04)
-        )
-        
-        valid_df['mctd_rate'] = 0.0
-        is_mctd = valid_df['county'].isin(self.mctd_counties)
-        valid_df.loc[is_mctd, 'mctd_rate'] = self.mctd_rate
-        
-        valid_df['composite_tax_rate'] = valid_df['state_tax_rate'] + valid_df['county_tax_rate'] + valid_df['city_rate'] + valid_df['mctd_rate']
-        valid_df['tax_amount'] = valid_df['subtotal'] * valid_df['composite_tax_rate']
-        valid_df['total_amount'] = valid_df['subtotal'] + valid_df['tax_amount']
-        
-        valid_df['breakdown'] = [
-            json.dumps({"state_rate": sr, "county_rate": cr, "city_rate": cir, "special_rates": mr})
-            for sr, cr, cir, mr in zip(valid_df['state_tax_rate'], valid_df['county_tax_rate'], valid_df['city_rate'], valid_df['mctd_rate'])
-        ]
-        
-        valid_df['jurisdictions'] = [
-            json.dumps(["New York State", "New York City", f"{county} County"] if is_nyc else ["New York State", f"{county} County"])
-            for county, is_nyc in zip(valid_df['county'], valid_df['is_nyc'])
-        ]
+        return self.apply_rates(valid_df, county_idx[is_valid]), invalid_df
+
+    def apply_rates(self, df: pd.DataFrame, codes: np.ndarray) -> pd.DataFrame:
+        """
+        Векторний розрахунок податків для рядків з уже відомими кодами округів (усі codes >= 0).
+        Спільний для нових замовлень та переоцінки збережених (див. repricing).
+        """
+        # Усі ставки батчу — одна вибірка з масивів (версія ставок × код округу)
+        rates = self.rate_table
+        codes = np.asarray(codes, dtype=np.int64)
+        with metrics.stage("tax_math"):
+            versions = rates.version_index(self._order_times_ns(df))
+
+            df['county_code'] = codes
+            df['county_fips'] = np.asarray(self.county_fips, dtype=object)[codes]
+            df['is_nyc'] = rates.is_nyc[codes]
+            df['state_tax_rate'] = rates.state[versions, codes]
+            df['county_tax_rate'] = rates.county[versions, codes]
+            df['city_rate'] = rates.city[versions, codes]
+            df['mctd_rate'] = rates.special[versions, codes]
+            
+            df['composite_tax_rate'] = rates.composite[versions, codes]
+            df['tax_amount'] = df['subtotal'] * df['composite_tax_rate']
+            df['total_amount'] = df['subtotal'] + df['tax_amount']
+
+            # Деталізація не серіалізується в кожен рядок: (версія, округ) визначають профіль юрисдикцій
+            df['rate_version'] = versions
         
-        return valid_df, invalid_df
+        return df
 
 _instance = None
+_instance_lock = threading.Lock()
+_enrich_pool = None
 
 def get_tax_service():
     global _instance
     if _instance is None:
-        _instance = TaxCalculatorService()
-    return _instance
\ No newline at end of file
+        # Прогрів під час старту та перші запити можуть звернутися одночасно — сервіс будується один раз
+        with _instance_lock:
+            if _instance is None:
+                _instance = TaxCalculatorService()
+    return _instance
+
+def is_tax_service_ready() -> bool:
+    """Сервіс побудовано і просторовий індекс завантажено (без побудови сервісу)."""
+    return _instance is not None and _instance.spatial_index is not None
+
+def _init_enrich_worker():
+    """Ініціалізатор процесу пулу: власна копія просторового індексу завантажується один раз."""
+    get_tax_service()
+
+def _enrich_shard(shard: pd.DataFrame):
+    return get_tax_service()._enrich_single(shard)
+
+def get_enrich_pool() -> ProcessPoolExecutor:
+    """Пул процесів для шардованого розрахунку податків (створюється при першому використанні)."""
+    global _enrich_pool
+    if _enrich_pool is None:
+        _enrich_pool = ProcessPoolExecutor(
+            max_workers=settings.TAX_PARALLEL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_enrich_worker
+        )
+    return _enrich_pool
\ No newline at end of file
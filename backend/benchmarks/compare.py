@@ -0,0 +1,55 @@
+"""
+Порівняння двох JSON-результатів benchmarks.run (наприклад, base-коміт проти нового).
+
+    python -m benchmarks.compare base.json new.json --threshold 1.10
+
+Для кожного вимірювання виводиться медіана до/після та відношення; код виходу 1,
+якщо хоча б одне вимірювання повільніше за поріг (регресія).
+"""
+import sys
+import json
+import argparse
+
+
+def _key(result: dict) -> tuple:
+    params = {k: v for k, v in result["params"].items() if k != "cursor"}
+    return result["name"], json.dumps(params, sort_keys=True)
+
+
+def compare(base: dict, new: dict, threshold: float) -> int:
+    base_results = {_key(result): result for result in base["results"]}
+    regressions = 0
+
+    print(f"{'benchmark':<28} {'params':<44} {'base':>10} {'new':>10} {'ratio':>7}")
+    for result in new["results"]:
+        key = _key(result)
+        before = base_results.get(key)
+        after_median = result["seconds"]["median"]
+        if before is None:
+            print(f"{key[0]:<28} {key[1][:44]:<44} {'—':>10} {after_median:>10.4f} {'new':>7}")
+            continue
+        ratio = after_median / before["seconds"]["median"]
+        marker = " !" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{key[0]:<28} {key[1][:44]:<44} {before['seconds']['median']:>10.4f} {after_median:>10.4f} {ratio:>7.2f}{marker}")
+
+    print(f"\nbase: {base.get('revision', '?')[:12]}  new: {new.get('revision', '?')[:12]}  регресій: {regressions}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Порівняння результатів бенчмарків")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.10, help="Допустиме відношення new/base для медіани")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    sys.exit(compare(base, new, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
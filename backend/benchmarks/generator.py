@@ -0,0 +1,91 @@
+"""
+Генератор синтетичних замовлень для бенчмарків.
+Точки всередині штату рівномірно вибираються з полігонів округів ny_counties.geojson
+(округ — пропорційно площі), точки поза штатом — з розширеного bounding box за межами полігонів
+(NJ, PA, CT, океан, Канада). Генерація детермінована для заданого seed.
+"""
+import numpy as np
+import pandas as pd
+import shapely
+from app.services import geo_cache
+
+# Розширення bounding box штату (у градусах) для точок поза NY
+OUTSIDE_MARGIN_DEG = 1.0
+
+
+class OrderGenerator:
+    def __init__(self, seed: int = 42):
+        self.rng = np.random.default_rng(seed)
+        cached = geo_cache.load_cache()
+        if cached is not None:
+            self.names, self.polygons = cached["names"], cached["polygons"]
+        else:
+            self.names, self.polygons = geo_cache.process_geojson()[:2]
+
+        self.areas = np.array([polygon.area for polygon in self.polygons])
+        self.union = shapely.union_all(self.polygons)
+        shapely.prepare(self.union)
+        for polygon in self.polygons:
+            shapely.prepare(polygon)
+
+    def _sample_in(self, geometry, count: int, bounds=None, inside: bool = True):
+        """Рівномірні точки в межах bounds, що потрапляють (inside=True) або не потрапляють у geometry."""
+        min_x, min_y, max_x, max_y = bounds or geometry.bounds
+        xs, ys = [np.empty(0)], [np.empty(0)]
+        remaining = count
+        while remaining > 0:
+            batch = max(remaining * 2, 64)
+            x = self.rng.uniform(min_x, max_x, batch)
+            y = self.rng.uniform(min_y, max_y, batch)
+            mask = shapely.contains_xy(geometry, x, y)
+            if not inside:
+                mask = ~mask
+            xs.append(x[mask][:remaining])
+            ys.append(y[mask][:remaining])
+            remaining -= len(xs[-1])
+        return np.concatenate(xs), np.concatenate(ys)
+
+    def inside_points(self, count: int):
+        """(lats, lons, county_idx) точок усередині полігонів округів."""
+        per_county = self.rng.multinomial(count, self.areas / self.areas.sum())
+        lats, lons, counties = [], [], []
+        for idx, county_count in enumerate(per_county):
+            if county_count == 0:
+                continue
+            lon, lat = self._sample_in(self.polygons[idx], int(county_count))
+            lats.append(lat)
+            lons.append(lon)
+            counties.append(np.full(len(lat), idx))
+        return np.concatenate(lats), np.concatenate(lons), np.concatenate(counties)
+
+    def outside_points(self, count: int):
+        """(lats, lons) точок у розширеному bounding box штату, що не належать жодному округу."""
+        min_x, min_y, max_x, max_y = self.union.bounds
+        bounds = (min_x - OUTSIDE_MARGIN_DEG, min_y - OUTSIDE_MARGIN_DEG, max_x + OUTSIDE_MARGIN_DEG, max_y + OUTSIDE_MARGIN_DEG)
+        lon, lat = self._sample_in(self.union, count, bounds=bounds, inside=False)
+        return lat, lon
+
+    def orders(self, count: int, outside_ratio: float = 0.1, years: int = 1) -> pd.DataFrame:
+        """
+        DataFrame замовлень (latitude, longitude, subtotal, timestamp) у випадковому порядку;
+        час рівномірно розподілений на years років до 2026-01-01.
+        """
+        outside_count = int(round(count * outside_ratio))
+        in_lat, in_lon, _ = self.inside_points(count - outside_count)
+        out_lat, out_lon = self.outside_points(outside_count)
+
+        order = self.rng.permutation(count)
+        end = pd.Timestamp("2026-01-01")
+        start = (end - pd.DateOffset(years=years)).value
+        end = end.value
+        timestamps = pd.to_datetime(self.rng.integers(start, end, count)).floor("s")
+
+        return pd.DataFrame({
+            "latitude": np.concatenate([in_lat, out_lat])[order].round(6),
+            "longitude": np.concatenate([in_lon, out_lon])[order].round(6),
+            "subtotal": np.round(self.rng.lognormal(mean=4.0, sigma=0.8, size=count), 2),
+            "timestamp": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    def csv_bytes(self, count: int, outside_ratio: float = 0.1) -> bytes:
+        return self.orders(count, outside_ratio).to_csv(index=False).encode("utf-8")
@@ -0,0 +1,333 @@
+"""
+Набір бенчмарків: пошук округу, векторний розрахунок податків, агрегати, імпорт CSV та список замовлень.
+
+Запуск з каталогу backend:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick                      # швидкий прогін з малими розмірами
+    python -m benchmarks.run --only enrich --sizes 10000,100000,1000000
+
+Результати — JSON (метадані середовища + вимірювання), які порівнюються між комітами
+через python -m benchmarks.compare base.json new.json.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+BENCHMARKS = ["lookup", "enrich", "rollup", "import", "list"]
+
+
+def _configure_environment(database_url: str):
+    # Бенчмарк працює з власною тимчасовою БД, налаштування задаються до імпорту app
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _summary(samples: list, rows: int = None) -> dict:
+    result = {
+        "repeat": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+    }
+    if rows:
+        result["rows"] = rows
+        result["rows_per_second"] = rows / result["median"]
+    return result
+
+
+def _measure(func, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _measure_async(func, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _log(message: str):
+    print(message, file=sys.stderr, flush=True)
+
+
+def bench_lookup(service, generator, args) -> list:
+    """Одиночні виклики _get_county_by_coords (як для ручного створення замовлення)."""
+    frame = generator.orders(args.lookup_count, outside_ratio=0.1)
+    points = list(zip(frame["latitude"], frame["longitude"]))
+
+    def run():
+        for lat, lon in points:
+            service._get_county_by_coords(lat, lon)
+
+    samples = _measure(run, args.repeat)
+    per_call = [sample / len(points) for sample in samples]
+    return [{
+        "name": "lookup.single",
+        "params": {"points": len(points)},
+        "seconds": _summary(samples, rows=len(points)),
+        "per_call_us": statistics.median(per_call) * 1e6,
+    }]
+
+
+def bench_enrich(service, generator, args) -> list:
+    """enrich_dataframe_with_taxes на батчах різного розміру (10% точок поза NY)."""
+    results = []
+    for size in args.sizes:
+        frame = generator.orders(size, outside_ratio=0.1)
+        repeat = 1 if size >= 1_000_000 else args.repeat
+        samples = _measure(lambda: service.enrich_dataframe_with_taxes(frame.copy()), repeat)
+        results.append({"name": "enrich", "params": {"rows": size}, "seconds": _summary(samples, rows=size)})
+        _log(f"  enrich {size}: {statistics.median(samples):.3f} s")
+    return results
+
+
+def bench_rollup(service, generator, args) -> list:
+    """
+    Оновлення денних агрегатів і агрегатів за округами для імпорту, розподіленого на кілька років
+    (багато пар день × округ), порівняно з масовим записом тих самих рядків.
+    rollup_to_write — відношення часу агрегатів до часу запису рядків: агрегати не мають
+    непомітно домінувати над імпортом.
+    """
+    import pandas as pd
+    from app.db.database import SessionLocal
+    from app.services import stats_service
+    from app.services.order_service import OrderService
+
+    results = []
+    for size in args.import_sizes:
+        frame = generator.orders(size, outside_ratio=0.0, years=args.rollup_years)
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+        valid_df, _ = service.enrich_dataframe_with_taxes(frame)
+
+        with SessionLocal() as db:
+            order_service = OrderService(db, service)
+            start = time.perf_counter()
+            payload, deltas = order_service._prepare_rows(valid_df)
+            prepare_seconds = time.perf_counter() - start
+
+            rollup_samples, write_samples = [], []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                stats_service.apply_deltas(db, deltas)
+                rollup_samples.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                order_service.writer.write(db, payload)
+                write_samples.append(time.perf_counter() - start)
+                # Кожен повтор — на порожніх таблицях
+                db.rollback()
+
+        groups = {"days": len(deltas["daily"]), "county_days": len(deltas["county"])}
+        params = {"rows": len(valid_df), "years": args.rollup_years}
+        ratio = statistics.median(rollup_samples) / statistics.median(write_samples)
+        results.append({
+            "name": "rollup.apply", "params": params, "groups": groups,
+            "seconds": _summary(rollup_samples, rows=len(valid_df)),
+            "prepare_seconds": prepare_seconds,
+            "rollup_to_write": ratio,
+        })
+        results.append({"name": "rollup.write_rows", "params": params, "seconds": _summary(write_samples, rows=len(valid_df))})
+        _log(f"  rollup {size} ({groups['county_days']} день×округ): {statistics.median(rollup_samples):.3f} s, "
+             f"{ratio:.2f}× запису рядків")
+    return results
+
+
+async def _reset_orders(client):
+    await client.delete("/orders/clear")
+
+
+async def bench_import(client, generator, args) -> list:
+    """Наскрізний імпорт CSV через HTTP (звичайний та потоковий) на чистій таблиці."""
+    results = []
+    for size in args.import_sizes:
+        payload = generator.csv_bytes(size)
+        for mode, params in (("memory", {}), ("stream", {"stream": "true"})):
+            samples = []
+            for _ in range(args.repeat):
+                await _reset_orders(client)
+                start = time.perf_counter()
+                response = await client.post(
+                    "/orders/import", params=params, files={"file": ("orders.csv", payload, "text/csv")}
+                )
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+            results.append({
+                "name": f"import.{mode}",
+                "params": {"rows": size, "bytes": len(payload)},
+                "seconds": _summary(samples, rows=size),
+            })
+            _log(f"  import {mode} {size}: {statistics.median(samples):.3f} s")
+    return results
+
+
+async def bench_list(client, generator, args) -> list:
+    """GET /orders на великій таблиці: перша та глибока сторінки, курсор, фільтри."""
+    from sqlalchemy import func, select
+    from app.db.database import AsyncSessionLocal
+    from app.db.models.models import Order
+    from app.services.pagination import encode_cursor
+
+    await _reset_orders(client)
+    remaining = args.table_size
+    while remaining > 0:
+        size = min(remaining, 200_000)
+        response = await client.post(
+            "/orders/import", params={"stream": "true"},
+            files={"file": ("orders.csv", generator.csv_bytes(size, outside_ratio=0.0), "text/csv")}
+        )
+        response.raise_for_status()
+        remaining -= size
+
+    async with AsyncSessionLocal() as db:
+        total = (await db.execute(select(func.count(Order.id)))).scalar_one()
+        middle = (await db.execute(
+            select(Order).order_by(Order.timestamp.desc(), Order.id.desc()).offset(total // 2).limit(1)
+        )).scalar_one()
+    middle_cursor = encode_cursor(middle.timestamp, middle.id, "next")
+    limit = 50
+
+    scenarios = {
+        "first_page": {"page": 1, "limit": limit},
+        "deep_offset": {"page": max(total // limit // 2, 1), "limit": limit},
+        "deep_cursor": {"pagination": "cursor", "cursor": middle_cursor, "limit": limit},
+        "date_range": {"start_date": "2025-06-01", "end_date": "2025-06-30", "limit": limit},
+        "id_prefix": {"search": middle.id[:4], "limit": limit},
+    }
+
+    results = []
+    for name, params in scenarios.items():
+        async def request():
+            response = await client.get("/orders", params=params)
+            response.raise_for_status()
+
+        samples = await _measure_async(request, args.list_repeat)
+        results.append({"name": f"list.{name}", "params": {"table_rows": total, **params}, "seconds": _summary(samples)})
+        _log(f"  list {name}: {statistics.median(samples) * 1000:.2f} ms")
+    return results
+
+
+async def _run_http_benchmarks(generator, args, selected) -> list:
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+    from app.core.security import get_current_admin
+    from app.db.models.models import Admin
+
+    app.dependency_overrides[get_current_admin] = lambda: Admin(id=1, email="bench@test.com", is_active=True)
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        if "import" in selected:
+            _log("import...")
+            results += await bench_import(client, generator, args)
+        if "list" in selected:
+            _log("list...")
+            results += await bench_list(client, generator, args)
+    return results
+
+
+def _parse_sizes(value: str) -> list:
+    return [int(size) for size in value.split(",") if size]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки розрахунку податків та API замовлень")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Набір бенчмарків через кому: {','.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", type=_parse_sizes, default=[10_000, 100_000, 1_000_000], help="Розміри батчів для enrich")
+    parser.add_argument("--import-sizes", type=_parse_sizes, default=[100_000], help="Розміри файлів для імпорту")
+    parser.add_argument("--rollup-years", type=int, default=3, help="Кількість років у файлі для rollup")
+    parser.add_argument("--table-size", type=int, default=500_000, help="Кількість замовлень у таблиці для list")
+    parser.add_argument("--lookup-count", type=int, default=10_000, help="Кількість одиночних пошуків округу")
+    parser.add_argument("--repeat", type=int, default=3, help="Повтори кожного вимірювання")
+    parser.add_argument("--list-repeat", type=int, default=20, help="Повтори запитів списку")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="БД для import/list (за замовчуванням — тимчасова SQLite)")
+    parser.add_argument("--quick", action="store_true", help="Малі розміри для швидкої перевірки")
+    parser.add_argument("--output", default=None, help="Файл для JSON-результатів (за замовчуванням stdout)")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.sizes, args.import_sizes, args.table_size = [10_000], [10_000], 20_000
+        args.lookup_count, args.repeat, args.list_repeat = 2_000, 1, 5
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Невідомі бенчмарки: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix="tax-bench-")
+    _configure_environment(args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    from app.core.config import settings
+    from app.db.database import Base, engine
+    from app.db import models  # noqa: F401  (реєстрація моделей у metadata)
+    from app.services.tax_service import TaxCalculatorService
+    from benchmarks.generator import OrderGenerator
+
+    Base.metadata.create_all(bind=engine)
+
+    start = time.perf_counter()
+    service = TaxCalculatorService()
+    init_seconds = time.perf_counter() - start
+    generator = OrderGenerator(seed=args.seed)
+
+    results = [{"name": "tax_service.init", "params": {}, "seconds": _summary([init_seconds])}]
+    if "lookup" in selected:
+        _log("lookup...")
+        results += bench_lookup(service, generator, args)
+    if "enrich" in selected:
+        _log("enrich...")
+        results += bench_enrich(service, generator, args)
+    if "rollup" in selected:
+        _log("rollup...")
+        results += bench_rollup(service, generator, args)
+    if {"import", "list"} & set(selected):
+        results += asyncio.run(_run_http_benchmarks(generator, args, selected))
+
+    report = {
+        "revision": _git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": engine.dialect.name,
+            "tax_parallel_workers": settings.TAX_PARALLEL_WORKERS,
+            "cpu_workers": settings.CPU_WORKERS,
+        },
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        _log(f"Результати збережено у {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
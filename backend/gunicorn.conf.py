@@ -0,0 +1,27 @@
+"""
+Конфігурація gunicorn для кількох воркерів uvicorn.
+
+preload_app: app.main (а з ним pandas, numpy, shapely та роутери) імпортується один раз у
+майстер-процесі; when_ready будує податковий сервіс (геодані, R-Tree, сітку, ставки) ще до fork,
+тож воркери отримують його готовим і спільно використовують пам'ять у режимі copy-on-write.
+gc.freeze() переносить створені об'єкти в постійне покоління: збирач сміття воркерів їх не обходить
+і не торкається лічильників посилань, що інакше копіювало б спільні сторінки в кожен воркер.
+"""
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def when_ready(server):
+    # До fork у майстрі не можна відкривати з'єднання з БД чи запускати потоки — лише CPU-дані
+    from app.main import warm_up
+
+    warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info("Податковий сервіс побудовано до fork, об'єкти заморожено (gc.freeze).")
@@ -6,5 +6,12 @@ python -m alembic upgrade head || echo "⚠️ Міграції вже заст
 echo "🌱 Запуск Seeder'а..."
 python seed.py
 python create_admin.py
+
+echo "🗺️ Підготовка кешу геоданих..."
+python -m app.services.geo_cache --grid || echo "⚠️ Не вдалося зібрати кеш геоданих, воркери побудують індекс самостійно..."
 echo "🔥 Запуск сервера FastAPI..."
+# Кілька воркерів — через gunicorn з preload: геодані будуються один раз до fork (див. gunicorn.conf.py)
+if [ "${WEB_CONCURRENCY:-1}" -gt 1 ]; then
+    exec gunicorn -c gunicorn.conf.py app.main:app
+fi
 exec python -m uvicorn app.main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
@@ -0,0 +1,43 @@
+import os
+
+# Мінімальні змінні середовища для запуску тестів без .env файлу
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+
+@pytest.fixture
+def db_tables():
+    """Створює чисту схему БД для тесту."""
+    from app.db.database import Base, engine
+    from app.db import models  # noqa: F401  (реєстрація моделей у metadata)
+    from app.services.jurisdiction_profiles import profile_registry
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    # id профілів юрисдикцій, закешовані попереднім тестом, у новій схемі недійсні
+    profile_registry.reset()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest_asyncio.fixture
+async def client(db_tables):
+    """HTTP-клієнт до додатку з вимкненою перевіркою JWT для роутів /orders."""
+    from app.main import app
+    from app.core.security import get_current_admin
+    from app.db.models.models import Admin
+
+    app.dependency_overrides[get_current_admin] = lambda: Admin(id=1, email="admin@test.com", is_active=True)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+    # Пул async-з'єднань прив'язаний до циклу подій тесту
+    from app.db.database import async_engine
+    await async_engine.dispose()
@@ -0,0 +1,113 @@
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+
+@pytest_asyncio.fixture
+async def raw_client(db_tables):
+    """Клієнт без підміни get_current_admin: перевірка JWT та кешу адміністраторів."""
+    from app.main import app
+    from app.core.security import principal_cache
+    from app.db.database import async_engine
+
+    principal_cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    principal_cache.clear()
+    await async_engine.dispose()
+
+
+async def _login(client) -> dict:
+    from app.db.database import SessionLocal
+    from app.db.models.models import Admin
+    from app.core.security import get_password_hash
+
+    db = SessionLocal()
+    db.add(Admin(email="admin@test.com", hashed_password=get_password_hash("secret"), is_active=True))
+    db.commit()
+    db.close()
+
+    response = await client.post("/admins/login", data={"username": "admin@test.com", "password": "secret"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_principal_is_cached_and_invalidated(raw_client):
+    from app.db.database import SessionLocal
+    from app.db.models.models import Admin
+    from app.core.security import principal_cache
+
+    headers = await _login(raw_client)
+    assert (await raw_client.get("/orders", headers=headers)).status_code == 200
+    assert principal_cache.get("admin@test.com") is not None
+
+    db = SessionLocal()
+    admin = db.query(Admin).filter(Admin.email == "admin@test.com").first()
+    admin.is_active = False
+    db.commit()
+    db.close()
+
+    assert principal_cache.get("admin@test.com") is None
+    assert (await raw_client.get("/orders", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_clears_cache_and_wrong_password_is_rejected(raw_client):
+    from app.db.database import SessionLocal
+    from app.db.models.models import Admin
+    from app.core.security import principal_cache
+
+    headers = await _login(raw_client)
+    assert (await raw_client.get("/orders", headers=headers)).status_code == 200
+
+    db = SessionLocal()
+    db.query(Admin).update({Admin.is_active: False})
+    db.commit()
+    db.close()
+    assert principal_cache.get("admin@test.com") is None
+
+    response = await raw_client.post("/admins/login", data={"username": "admin@test.com", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_cache_ttl_and_size_limits(monkeypatch):
+    from app.core import security
+    from app.db.models.models import Admin
+
+    cache = security.PrincipalCache(ttl=10, maxsize=2)
+    now = [1000.0]
+    monkeypatch.setattr(security.time, "monotonic", lambda: now[0])
+
+    for i in range(3):
+        cache.put(Admin(id=i, email=f"a{i}@test.com", is_active=True))
+    assert cache.get("a0@test.com") is None
+    assert cache.get("a2@test.com") == (2, "a2@test.com", True)
+
+    now[0] += 11
+    assert cache.get("a2@test.com") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_is_invalidated_after_commit_not_flush(raw_client):
+    from app.db.database import SessionLocal
+    from app.db.models.models import Admin
+    from app.core.security import principal_cache
+
+    headers = await _login(raw_client)
+    assert (await raw_client.get("/orders", headers=headers)).status_code == 200
+
+    db = SessionLocal()
+    admin = db.query(Admin).filter(Admin.email == "admin@test.com").first()
+    admin.is_active = False
+    db.flush()
+    # До фиксации другие сессии видят прежнюю запись, и кэш ее не теряет
+    assert principal_cache.get("admin@test.com") is not None
+    db.rollback()
+    assert principal_cache.get("admin@test.com") is not None
+
+    admin.is_active = False
+    db.flush()
+    db.commit()
+    db.close()
+    assert principal_cache.get("admin@test.com") is None
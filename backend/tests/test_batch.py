@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_create_orders_batch(client):
+    response = await client.post("/orders/batch", json=[
+        {"latitude": 40.7128, "longitude": -74.0060, "subtotal": 100.0},
+        {"latitude": 34.0522, "longitude": -118.2437, "subtotal": 10.0},
+        {"latitude": 42.6526, "longitude": -73.7562, "subtotal": 50.0},
+    ])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["total"], data["success_count"], data["error_count"]) == (3, 2, 1)
+    assert [r["status"] for r in data["results"]] == ["created", "error", "created"]
+
+    nyc_order = data["results"][0]["order"]
+    assert nyc_order["composite_tax_rate"] == 0.08875
+    assert nyc_order["tax_amount"] == 8.88
+    assert nyc_order["total_amount"] == 108.88
+    assert nyc_order["jurisdictions"] == ["New York State", "New York City", "New York County (Borough)"]
+
+    listing = (await client.get("/orders")).json()
+    assert listing["total"] == 2
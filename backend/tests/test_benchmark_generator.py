@@ -0,0 +1,25 @@
+import numpy as np
+
+from benchmarks.generator import OrderGenerator
+from app.services.tax_service import get_tax_service
+
+
+def test_generated_points_match_service_counties():
+    generator = OrderGenerator(seed=7)
+    service = get_tax_service()
+
+    lats, lons, counties = generator.inside_points(500)
+    resolved = service._resolve_county_indices(lats, lons)
+    # Полігони буферизовані й можуть перекриватися на межах — перевіряємо переважну більшість
+    assert np.mean(resolved == counties) > 0.98
+    assert (resolved >= 0).all()
+
+    out_lats, out_lons = generator.outside_points(200)
+    assert (service._resolve_county_indices(out_lats, out_lons) < 0).all()
+
+
+def test_orders_frame_is_deterministic():
+    first = OrderGenerator(seed=1).orders(100, outside_ratio=0.2)
+    second = OrderGenerator(seed=1).orders(100, outside_ratio=0.2)
+    assert first.equals(second)
+    assert list(first.columns) == ["latitude", "longitude", "subtotal", "timestamp"]
@@ -0,0 +1,74 @@
+import csv
+import io
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+
+from app.services.bulk_writer import (
+    ORDER_COLUMNS, SQLiteWriter, PsycopgCopyWriter, AsyncpgCopyWriter, CoreInsertWriter, get_bulk_writer
+)
+
+
+def _frame(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({
+        'id': [f"id-{i}" for i in range(rows)],
+        'timestamp': pd.to_datetime(["2025-11-04 10:00:00"] * rows, utc=True),
+        'latitude': [40.7128] * rows,
+        'longitude': [-74.006] * rows,
+        'subtotal': [100.0] * rows,
+        'composite_tax_rate': [0.08875] * rows,
+        'tax_amount': [8.875] * rows,
+        'total_amount': [108.875] * rows,
+        'profile_id': [7] * rows,
+        'county_fips': ['36061'] * rows,
+        'fingerprint': [f"fp-{i}" for i in range(rows)],
+        'import_hash': None,
+    })
+
+
+@pytest.mark.parametrize("name, driver, expected", [
+    ("sqlite", "pysqlite", SQLiteWriter),
+    ("sqlite", "aiosqlite", SQLiteWriter),
+    ("postgresql", "psycopg2", PsycopgCopyWriter),
+    ("postgresql", "asyncpg", AsyncpgCopyWriter),
+    ("mysql", "pymysql", CoreInsertWriter),
+])
+def test_writer_is_chosen_by_dialect(name, driver, expected):
+    assert isinstance(get_bulk_writer(SimpleNamespace(name=name, driver=driver)), expected)
+
+
+def test_sqlite_payload_uses_orm_timestamp_format():
+    records = SQLiteWriter().prepare(_frame(1))
+    assert records[0][1] == "2025-11-04 10:00:00.000000"
+    assert len(records[0]) == len(ORDER_COLUMNS)
+
+
+def test_copy_payload_is_batched_csv():
+    chunks = PsycopgCopyWriter(batch_size=2).prepare(_frame(3))
+    assert len(chunks) == 2
+    assert [count for _, count in chunks] == [2, 1]
+    rows = list(csv.reader(io.StringIO("".join(text for text, _ in chunks))))
+    assert len(rows) == 3
+    assert rows[0][1] == "2025-11-04 10:00:00+00:00"
+    assert rows[0][ORDER_COLUMNS.index('profile_id')] == "7"
+
+
+def test_core_insert_writer_round_trip(db_tables):
+    from app.db.database import SessionLocal
+    from app.db.models.models import Order, JurisdictionProfile
+
+    writer = CoreInsertWriter(batch_size=2)
+    db = SessionLocal()
+    try:
+        db.add(JurisdictionProfile(
+            id=7, county="New York", state_rate=0.04, county_rate=0.0, city_rate=0.045,
+            special_rates=0.00375, jurisdictions=["New York State", "New York City"]
+        ))
+        db.commit()
+        assert writer.write(db, writer.prepare(_frame(3))) == 3
+        db.commit()
+        order = db.get(Order, "id-2")
+        assert order.profile_id == 7
+        assert order.timestamp is not None
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+import pytest
+
+from tests.test_import import CSV_CONTENT
+
+
+async def _report(client, **params):
+    response = await client.get("/orders/reports/counties", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"stream": "true", "chunk_size": 2}])
+async def test_import_maintains_county_rollups(client, params):
+    response = await client.post("/orders/import", params=params, files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    assert response.json()["success_count"] == 3
+
+    report = await _report(client, month="2025-11")
+    assert report["start_date"] == "2025-11-01"
+    assert report["end_date"] == "2025-11-30"
+    by_fips = {item["county_fips"]: item for item in report["items"]}
+    assert set(by_fips) == {"36061", "36001", "36047"}
+    assert by_fips["36061"]["county"] == "New York"
+    assert by_fips["36061"]["subtotal_sum"] == 100
+    assert by_fips["36061"]["tax_sum"] == pytest.approx(8.88, abs=0.01)
+    assert by_fips["36001"]["order_count"] == 1
+    assert report["order_count"] == 3
+    assert report["subtotal_sum"] == 170
+
+    # Діапазон дат обмежує дні агрегатів
+    report = await _report(client, start_date="2025-11-05", end_date="2025-11-05")
+    assert [item["county_fips"] for item in report["items"]] == ["36047"]
+    assert (await _report(client, month="2025-12"))["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_delete_updates_county_rollups(client):
+    await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+
+    from app.db.database import SessionLocal
+    from app.db.models.models import Order
+
+    with SessionLocal() as db:
+        order = db.query(Order).filter(Order.county_fips == "36047").one()
+        order_id = order.id
+
+    assert (await client.delete(f"/orders/{order_id}")).status_code == 200
+    report = await _report(client)
+    assert "36047" not in {item["county_fips"] for item in report["items"]}
+    assert report["order_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_report_rejects_bad_month(client):
+    response = await client.get("/orders/reports/counties", params={"month": "2025-13"})
+    assert response.status_code == 400
+
+
+def test_rollup_upsert_is_batched_executemany(db_tables, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from sqlalchemy import event
+    from app.db.database import SessionLocal, engine
+    from app.db.models.models import OrderCountyDailyStats
+    from app.services import stats_service
+
+    monkeypatch.setattr(stats_service, "UPSERT_BATCH_SIZE", 100)
+    # 250 днів × 2 округи: кількість змін не повинна впливати на SQL-оператор
+    days = pd.date_range("2024-01-01", periods=250, freq="D", tz="UTC")
+    frame = pd.DataFrame({
+        "timestamp": np.repeat(days, 2),
+        "county_fips": ["36047", "36061"] * len(days),
+        "subtotal": 10.0, "tax_amount": 1.0, "total_amount": 11.0, "composite_tax_rate": 0.1,
+    })
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO order_"):
+            statements.append((statement, executemany, len(parameters) if executemany else 1))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            stats_service.apply_orders(db, frame)
+            stats_service.apply_orders(db, frame)
+            db.commit()
+            stored = db.query(OrderCountyDailyStats).filter(OrderCountyDailyStats.county_fips == "36047").first()
+            assert stored.order_count == 2
+            assert db.query(OrderCountyDailyStats).count() == 500
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Один параметризований оператор на модель; зміни передаються партіями executemany
+    assert all(executemany for _, executemany, _ in statements)
+    assert len({sql for sql, _, _ in statements}) == 2
+    assert max(size for _, _, size in statements) <= 100
+    assert sum(size for _, _, size in statements) == 2 * (250 + 500)
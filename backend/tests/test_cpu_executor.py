@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+
+from app.services.cpu_executor import CPUExecutor
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    executor = CPUExecutor(max_workers=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0.05)
+    assert executor.stats()["in_flight"] == 2
+
+    with pytest.raises(HTTPException) as exc:
+        await executor.run(lambda: "rejected")
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "7"
+
+    release.set()
+    assert await queued == "queued"
+    await running
+    assert executor.stats() == {"in_flight": 0, "max_workers": 1, "max_queue": 1, "rejected": 1}
+
+
+@pytest.mark.asyncio
+async def test_saturated_executor_returns_503(client, monkeypatch):
+    from app.services import cpu_executor as module
+
+    monkeypatch.setattr(module.cpu_executor, "_in_flight", 1)
+    monkeypatch.setattr(module.cpu_executor, "max_queue", 0)
+    monkeypatch.setattr(module.cpu_executor, "max_workers", 1)
+
+    from app.services.tax_service import get_tax_service
+
+    get_tax_service().county_cache.clear()
+    payload = {"latitude": 40.7128, "longitude": -74.0060, "subtotal": 100.0}
+    for path in ("/orders", "/orders/quote"):
+        response = await client.post(path, json=payload)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(module.cpu_executor.retry_after)
+
+    # Точку з кешу округів котирування обслуговує без пулу навіть при насиченні
+    get_tax_service().county_cache.get(payload["latitude"], payload["longitude"])
+    response = await client.post("/orders/quote", json=payload)
+    assert response.status_code == 200
+    assert response.json()["county"] == "New York"
@@ -0,0 +1,26 @@
+import pytest
+
+from app.db.database import to_async_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+    ("postgresql://user:pass@db:5432/orders", "postgresql+asyncpg://user:***@db:5432/orders"),
+    ("postgresql+psycopg2://user:pass@db/orders", "postgresql+asyncpg://user:***@db/orders"),
+    ("postgresql+asyncpg://user:pass@db/orders", "postgresql+asyncpg://user:***@db/orders"),
+])
+def test_to_async_url(url, expected):
+    assert str(to_async_url(url)) == expected
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_async_pool(client):
+    import asyncio
+
+    created = await asyncio.gather(*[
+        client.post("/orders", json={"latitude": 40.7128, "longitude": -74.0060, "subtotal": 10.0 + i})
+        for i in range(5)
+    ])
+    assert all(response.status_code == 201 for response in created)
+    listing = (await client.get("/orders")).json()
+    assert listing["total"] == 5
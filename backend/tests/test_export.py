@@ -0,0 +1,43 @@
+import io
+import csv
+import json
+import pytest
+
+from tests.test_import import CSV_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_export_csv_and_ndjson(client, monkeypatch):
+    from app.services import export_service
+    await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    # Маленька партія, щоб перевірити склеювання кількох блоків відповіді
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 1)
+
+    response = await client.get("/orders/export", params={"format": "csv", "sortBy": "subtotal", "sortOrder": "asc"})
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert [float(row["subtotal"]) for row in rows] == [20.0, 50.0, 100.0]
+    assert rows[0]["jurisdictions"].startswith("New York State")
+
+    response = await client.get("/orders/export", params={"format": "ndjson", "start_date": "2025-11-05"})
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 1 and records[0]["subtotal"] == 20.0
+
+
+@pytest.mark.asyncio
+async def test_export_parquet(client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+
+    response = await client.get("/orders/export", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 3
+    assert set(table.column("county_rate").to_pylist()) >= {0.04}
+
+    import pyarrow as pa
+    from datetime import datetime, timezone
+
+    assert table.schema.field("timestamp").type == pa.timestamp("us", tz="UTC")
+    assert min(table.column("timestamp").to_pylist()) == datetime(2025, 11, 4, 10, 0, tzinfo=timezone.utc)
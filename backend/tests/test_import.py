@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+
+CSV_CONTENT = (
+    "latitude,longitude,subtotal,timestamp\n"
+    "40.7128,-74.0060,100,2025-11-04 10:00:00\n"
+    "42.6526,-73.7562,50,2025-11-04 11:00:00\n"
+    "34.0522,-118.2437,10,2025-11-04 12:00:00\n"
+    "not-a-number,-74.0060,10,2025-11-04 12:00:00\n"
+    "40.6782,-73.9442,20,2025-11-05 09:30:00\n"
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"stream": "true", "chunk_size": 2, "commit_every": 2}])
+async def test_csv_import(client, params):
+    response = await client.post(
+        "/orders/import",
+        params=params,
+        files={"file": ("orders.csv", CSV_CONTENT, "text/csv")},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_processed"] == 4
+    assert data["success_count"] == 3
+    assert data["error_count"] == 1
+    assert data["errors"] == [{"row": 4, "reason": "Координати знаходяться поза межами штату Нью-Йорк"}]
+
+    listing = (await client.get("/orders")).json()
+    assert listing["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_background_import_job(client):
+    response = await client.post(
+        "/orders/import",
+        params={"background": "true"},
+        files={"file": ("orders.csv", CSV_CONTENT, "text/csv")},
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    # Опитуємо стан завдання, доки воркер не завершить обробку
+    for _ in range(100):
+        job = (await client.get(f"/orders/import/{job_id}")).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        await asyncio.sleep(0.1)
+
+    assert job["status"] == "completed"
+    assert job["rows_processed"] == 4
+    assert job["success_count"] == 3
+    assert job["error_count"] == 1
+    assert job["progress"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_import_job_not_found(client):
+    response = await client.get("/orders/import/unknown")
+    assert response.status_code == 404
+
+
+def test_import_job_removes_file_when_status_update_fails(db_tables, tmp_path, monkeypatch):
+    from app.services import import_jobs
+
+    path = tmp_path / "upload.csv"
+    path.write_text(CSV_CONTENT)
+    updates = []
+
+    def failing_update(job_id, **fields):
+        updates.append(fields["status"])
+        if fields["status"] == "running":
+            raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(import_jobs, "_update_job", failing_update)
+    import_jobs.run_import_job("job-1", str(path))
+
+    assert updates == ["running", "failed"]
+    assert not path.exists()
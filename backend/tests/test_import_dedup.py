@@ -0,0 +1,115 @@
+import pytest
+
+from tests.test_import import CSV_CONTENT
+
+
+async def _import(client, content: str, **params):
+    response = await client.post("/orders/import", params=params, files={"file": ("orders.csv", content, "text/csv")})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"stream": "true", "chunk_size": 2}])
+async def test_repeat_upload_returns_stored_result(client, params):
+    first = await _import(client, CSV_CONTENT, **params)
+    assert first["success_count"] == 3
+    assert "already_imported" not in first
+
+    second = await _import(client, CSV_CONTENT, **params)
+    assert second["already_imported"] is True
+    assert second["success_count"] == 3
+    assert second["errors"] == first["errors"]
+
+    listing = (await client.get("/orders")).json()
+    assert listing["total"] == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"stream": "true", "chunk_size": 2}])
+async def test_dedupe_skips_existing_rows(client, params):
+    await _import(client, CSV_CONTENT)
+
+    # Інший файл (новий рядок + дублікат усередині файлу) з тими самими замовленнями
+    extended = CSV_CONTENT + "40.7580,-73.9855,75,2025-11-06 08:00:00\n40.7580,-73.9855,75,2025-11-06 08:00:00\n"
+    result = await _import(client, extended, dedupe="true", **params)
+    assert result["success_count"] == 1
+    assert result["duplicate_count"] == 4
+    assert result["error_count"] == 1
+
+    listing = (await client.get("/orders")).json()
+    assert listing["total"] == 4
+    assert listing["total_tax"] == pytest.approx(sum(item["tax_amount"] for item in listing["items"]))
+
+
+@pytest.mark.asyncio
+async def test_without_dedupe_changed_file_is_imported_again(client):
+    await _import(client, CSV_CONTENT)
+    result = await _import(client, CSV_CONTENT + "\n")
+    assert result["success_count"] == 3
+    assert result["duplicate_count"] == 0
+    assert (await client.get("/orders")).json()["total"] == 6
+
+
+@pytest.mark.asyncio
+async def test_clear_allows_reimport_of_same_file(client):
+    await _import(client, CSV_CONTENT)
+    assert (await client.delete("/orders/clear")).status_code == 200
+
+    result = await _import(client, CSV_CONTENT)
+    assert "already_imported" not in result
+    assert result["success_count"] == 3
+    assert (await client.get("/orders")).json()["total"] == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"stream": "true", "chunk_size": 2}])
+async def test_reupload_after_delete_restores_missing_rows(client, params):
+    await _import(client, CSV_CONTENT, **params)
+    listing = (await client.get("/orders")).json()
+    assert (await client.delete(f"/orders/{listing['items'][0]['id']}")).status_code == 200
+
+    # Збережений результат застарів: файл обробляється знову, решта рядків пропускається
+    result = await _import(client, CSV_CONTENT, **params)
+    assert "already_imported" not in result
+    assert result["success_count"] == 1
+    assert result["duplicate_count"] == 2
+    assert (await client.get("/orders")).json()["total"] == 3
+
+    repeat = await _import(client, CSV_CONTENT, **params)
+    assert repeat["already_imported"] is True
+    assert repeat["success_count"] == 1
+    assert (await client.get("/orders")).json()["total"] == 3
+
+
+NO_TIMESTAMP_CSV = "latitude,longitude,subtotal\n40.7128,-74.0060,100\n40.6782,-73.9442,50\n"
+
+
+@pytest.mark.asyncio
+async def test_delete_marks_only_source_file_stale(client):
+    await _import(client, CSV_CONTENT)
+    await _import(client, NO_TIMESTAMP_CSV)
+
+    # Видалення замовлення з першого файлу не зачіпає запис про другий
+    listing = (await client.get("/orders", params={"limit": 10})).json()
+    from_first = next(item for item in listing["items"] if item["timestamp"].startswith("2025-11"))
+    assert (await client.delete(f"/orders/{from_first['id']}")).status_code == 200
+
+    repeat = await _import(client, NO_TIMESTAMP_CSV)
+    assert repeat["already_imported"] is True
+    assert (await client.get("/orders")).json()["total"] == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{}, {"stream": "true"}])
+async def test_stale_file_without_timestamps_is_rejected(client, params):
+    await _import(client, NO_TIMESTAMP_CSV, **params)
+    listing = (await client.get("/orders")).json()
+    assert (await client.delete(f"/orders/{listing['items'][0]['id']}")).status_code == 200
+
+    # Рядки без часу неможливо зіставити з наявними — повторний імпорт відхиляється без запису
+    response = await client.post(
+        "/orders/import", params=params, files={"file": ("orders.csv", NO_TIMESTAMP_CSV, "text/csv")}
+    )
+    assert response.status_code == 409
+    assert (await client.get("/orders")).json()["total"] == 1
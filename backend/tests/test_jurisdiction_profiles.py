@@ -0,0 +1,75 @@
+import pytest
+
+from tests.test_import import CSV_CONTENT
+
+
+def _profile_count() -> int:
+    from app.db.database import SessionLocal
+    from app.db.models.models import JurisdictionProfile
+
+    with SessionLocal() as db:
+        return db.query(JurisdictionProfile).count()
+
+
+def test_registry_creates_each_profile_once(db_tables):
+    from app.services.jurisdiction_profiles import ProfileRegistry
+    from app.services.tax_service import get_tax_service
+
+    rates = get_tax_service().rate_table
+    registry = ProfileRegistry()
+    ids = registry.ids(rates, [0, 0], [0, 1])
+    count = _profile_count()
+    assert 0 < count <= rates.state.size
+
+    # Інший процес з тією ж таблицею ставок використовує вже створені профілі
+    other = ProfileRegistry()
+    assert other.ids(rates, [0, 0], [0, 1]).tolist() == ids.tolist()
+    assert _profile_count() == count
+
+    profile = other.get(int(ids[1]))
+    assert profile["county"] == rates.county_names[1]
+    assert profile["breakdown"] == rates.breakdown(0, 1)
+    assert profile["jurisdictions"] == rates.jurisdictions[1]
+
+
+@pytest.mark.asyncio
+async def test_orders_api_shape_is_built_from_profiles(client):
+    response = await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    assert response.json()["success_count"] == 3
+
+    items = (await client.get("/orders", params={"sortBy": "subtotal", "sortOrder": "desc"})).json()["items"]
+    nyc = items[0]
+    assert nyc["subtotal"] == 100
+    assert nyc["jurisdictions"] == ["New York State", "New York City", "New York County (Borough)"]
+    assert nyc["breakdown"] == {"state_rate": 0.04, "county_rate": 0.0, "city_rate": 0.045, "special_rates": 0.00375}
+    assert "profile_id" not in nyc
+
+    # Замовлення одного округу посилаються на один профіль
+    from app.db.database import SessionLocal
+    from app.db.models.models import Order
+
+    with SessionLocal() as db:
+        profile_ids = {order.profile_id for order in db.query(Order)}
+    assert None not in profile_ids
+    assert len(profile_ids) == 3
+
+
+@pytest.mark.asyncio
+async def test_profiles_from_other_process_are_loaded_before_serialization(client):
+    from app.services.jurisdiction_profiles import profile_registry
+
+    response = await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    assert response.json()["success_count"] == 3
+
+    # Кеш процесу не знає профілів (їх створив інший процес): get не звертається до БД
+    profile_registry.reset()
+    from app.db.database import SessionLocal
+    from app.db.models.models import Order
+
+    with SessionLocal() as db:
+        profile_id = db.query(Order.profile_id).first()[0]
+    assert profile_registry.get(profile_id) is None
+
+    items = (await client.get("/orders")).json()["items"]
+    assert all(item["breakdown"] is not None and item["jurisdictions"] for item in items)
+    assert profile_registry.get(profile_id) is not None
@@ -0,0 +1,59 @@
+import pytest
+
+from app.core import metrics
+from tests.test_import import CSV_CONTENT
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Тест", labels=("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage='x"y')
+
+    lines = histogram.render()
+    assert '# TYPE test_seconds histogram' in lines
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 2' in lines
+    assert 'test_seconds_count{stage="a"} 2' in lines
+    assert 'test_seconds_bucket{stage="x\\"y",le="+Inf"} 1' in lines
+
+
+def test_counter_accumulates_by_labels():
+    counter = metrics.Counter("test_total", "Тест", labels=("kind",))
+    counter.inc(kind="bulk")
+    counter.inc(3, kind="bulk")
+    counter.inc(kind="single")
+
+    assert counter.value(kind="bulk") == 4
+    assert 'test_total{kind="single"} 1.0' in counter.render()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_after_import(client):
+    before = metrics.PIPELINE_STAGE_SECONDS.count(stage="db_insert")
+    response = await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    assert response.status_code == 200
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    for stage in ("upload_read", "csv_parse", "validate", "spatial_join", "tax_math", "prepare_rows", "db_insert"):
+        assert f'order_pipeline_stage_seconds_count{{stage="{stage}"}}' in text
+    assert metrics.PIPELINE_STAGE_SECONDS.count(stage="db_insert") == before + 1
+
+    assert 'order_import_rows_per_second_count{mode="memory"}' in text
+    assert 'http_request_duration_seconds_count{method="POST",route="/orders/import",status="200"}' in text
+    assert 'db_query_duration_seconds_count{operation="SELECT"}' in text
+    assert "spatial_index_queries_total" in text
+    assert "cpu_executor_in_flight 0.0" in text
+
+
+@pytest.mark.asyncio
+async def test_route_label_uses_path_template(client):
+    await client.delete("/orders/missing-order-id")
+    text = (await client.get("/metrics")).text
+    assert 'route="/orders/{order_id}"' in text
+    assert "missing-order-id" not in text
@@ -0,0 +1,74 @@
+import pytest
+
+from tests.test_import import CSV_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_dashboard_totals_follow_writes(client):
+    await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    created = (await client.post("/orders", json={"latitude": 40.7128, "longitude": -74.0060, "subtotal": 100.0})).json()
+
+    listing = (await client.get("/orders")).json()
+    assert listing["total"] == 4
+    by_search = (await client.get("/orders", params={"search": created["id"]})).json()
+    assert by_search["total"] == 1
+
+    day = (await client.get("/orders", params={"date": "2025-11-04"})).json()
+    assert day["total"] == 2
+
+    await client.delete(f"/orders/{created['id']}")
+    after_delete = (await client.get("/orders")).json()
+    assert after_delete["total"] == 3
+    assert after_delete["total_tax"] == pytest.approx(sum(item["tax_amount"] for item in after_delete["items"]))
+
+    await client.delete("/orders/clear")
+    cleared = (await client.get("/orders")).json()
+    assert (cleared["total"], cleared["total_tax"], cleared["avg_rate"]) == (0, 0.0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_walks_all_orders(client):
+    await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    for subtotal in (10.0, 20.0, 20.0, 30.0):
+        await client.post("/orders", json={"latitude": 40.7128, "longitude": -74.0060, "subtotal": subtotal})
+
+    params = {"pagination": "cursor", "limit": 2, "sortBy": "subtotal", "sortOrder": "asc"}
+    expected = (await client.get("/orders", params={**params, "pagination": "offset", "limit": 100})).json()["items"]
+
+    pages, cursor = [], None
+    while True:
+        page = (await client.get("/orders", params={**params, **({"cursor": cursor} if cursor else {})})).json()
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    walked = [item["id"] for page in pages for item in page["items"]]
+    assert walked == [item["id"] for item in expected]
+    assert len(walked) == 7
+
+    back = (await client.get("/orders", params={**params, "cursor": pages[-1]["prev_cursor"]})).json()
+    assert [item["id"] for item in back["items"]] == [item["id"] for item in pages[-2]["items"]]
+
+    bad = await client.get("/orders", params={**params, "cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_date_range_and_prefix_search(client):
+    await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+
+    both = (await client.get("/orders", params={"start_date": "2025-11-04", "end_date": "2025-11-05"})).json()
+    assert both["total"] == 3 and len(both["items"]) == 3
+    second_day = (await client.get("/orders", params={"start_date": "2025-11-05"})).json()
+    assert [item["timestamp"][:10] for item in second_day["items"]] == ["2025-11-05"]
+    first_day = (await client.get("/orders", params={"end_date": "2025-11-04"})).json()
+    assert first_day["total"] == len(first_day["items"]) == 2
+
+    order_id = both["items"][0]["id"]
+    found = (await client.get("/orders", params={"search": order_id[:8].upper()})).json()
+    assert order_id in [item["id"] for item in found["items"]]
+    assert all(item["id"].startswith(order_id[:8]) for item in found["items"])
+
+    bad = await client.get("/orders", params={"start_date": "2025-11-06", "end_date": "2025-11-05"})
+    assert bad.status_code == 400
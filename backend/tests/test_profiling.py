@@ -0,0 +1,77 @@
+import os
+import pstats
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+
+def _busy_work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+@pytest_asyncio.fixture
+async def profiled_client(db_tables, tmp_path, monkeypatch):
+    """Окремий додаток з middleware профілювання (в основному воно вимкнене налаштуваннями)."""
+    from app.main import profile_admin_request
+    from app.core.config import settings
+    from app.core.security import principal_cache
+    from app.services.cpu_executor import cpu_executor
+    from app.db.database import async_engine
+
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    app = FastAPI()
+    app.middleware("http")(profile_admin_request)
+
+    @app.get("/work/{size}")
+    async def work(size: int):
+        return {"value": await cpu_executor.run(_busy_work, size)}
+
+    principal_cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    principal_cache.clear()
+    await async_engine.dispose()
+
+
+def _admin_headers() -> dict:
+    from app.db.database import SessionLocal
+    from app.db.models.models import Admin
+    from app.core.security import create_access_token
+
+    db = SessionLocal()
+    db.add(Admin(email="admin@test.com", hashed_password="not-used", is_active=True))
+    db.commit()
+    db.close()
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'admin@test.com'})}"}
+
+
+@pytest.mark.asyncio
+async def test_admin_request_is_profiled(profiled_client, tmp_path):
+    headers = {**_admin_headers(), "X-Profile": "1"}
+    response = await profiled_client.get("/work/20000", headers=headers)
+
+    assert response.status_code == 200
+    filename = response.headers["X-Profile-File"]
+    assert "_GET_work_size_" in filename and filename.endswith("ms.prof")
+    assert os.listdir(tmp_path) == [filename]
+
+    # Робота з пулу CPU потрапляє у профіль запиту
+    stats = pstats.Stats(str(tmp_path / filename))
+    assert any(func_name == "_busy_work" for _, _, func_name in stats.stats)
+
+
+@pytest.mark.asyncio
+async def test_query_flag_requires_admin(profiled_client, tmp_path):
+    response = await profiled_client.get("/work/10", params={"profile": "1"})
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+
+    response = await profiled_client.get(
+        "/work/10", params={"profile": "1"}, headers={"Authorization": "Bearer invalid"}
+    )
+    assert "X-Profile-File" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+    response = await profiled_client.get("/work/10", params={"profile": "pstats"}, headers=_admin_headers())
+    assert response.headers["X-Profile-File"].endswith(".prof")
@@ -0,0 +1,44 @@
+import pytest
+
+from app.services.quote_cache import CountyLookupCache
+
+
+def test_county_cache_quantizes_and_evicts():
+    calls = []
+
+    def resolver(lat, lon):
+        calls.append((lat, lon))
+        return 7
+
+    cache = CountyLookupCache(resolver, maxsize=2, precision=3)
+    assert cache.get(40.71281, -74.00601) == 7
+    assert cache.get(40.71279, -74.00599) == 7  # та сама квантована точка
+    cache.get(41.0, -74.0)
+    cache.get(42.0, -74.0)
+
+    assert calls[0] == (40.713, -74.006)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_quote_endpoint(client):
+    payload = {"latitude": 40.7128, "longitude": -74.0060, "subtotal": 100.0}
+    first = await client.post("/orders/quote", json=payload)
+    second = await client.post("/orders/quote", json=payload)
+
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["county"] == "New York"
+    assert first.json()["tax_amount"] == 8.88
+
+    outside = await client.post("/orders/quote", json={"latitude": 34.05, "longitude": -118.24, "subtotal": 10.0})
+    assert outside.status_code == 400
+
+    stats = (await client.get("/orders/quote/stats")).json()
+    assert stats["hits"] >= 1
+
+    # Котирування не створює замовлень
+    assert (await client.get("/orders")).json()["total"] == 0
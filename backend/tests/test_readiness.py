@@ -0,0 +1,30 @@
+import pytest
+
+from app.services import tax_service
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_warm_index(client, monkeypatch):
+    monkeypatch.setattr(tax_service, "_instance", None)
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "warming_up"}
+
+    from app.main import warm_up
+
+    warm_up()
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_service_before_shutdown(db_tables, monkeypatch):
+    from app.main import app, lifespan
+    from app.services.jurisdiction_profiles import profile_registry
+
+    monkeypatch.setattr(tax_service, "_instance", None)
+    async with lifespan(app):
+        pass
+    assert tax_service.is_tax_service_ready()
+    assert profile_registry.is_synced(tax_service.get_tax_service().rate_table)
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from tests.test_import import CSV_CONTENT
+
+
+@pytest.fixture
+def raise_albany_rate(tmp_path, monkeypatch):
+    """Підміняє таблицю ставок: ставка Albany змінюється з 0.08 на 0.085 (після імпорту замовлень)."""
+    from app.services import rate_engine
+    from app.services.tax_service import get_tax_service
+
+    csv_path = tmp_path / "rates.csv"
+    with open(rate_engine.RATES_CSV_PATH, encoding="utf-8") as f:
+        csv_path.write_text(f.read().replace("Albany,0.08,NY,,", "Albany,0.085,NY,,"), encoding="utf-8")
+
+    def apply():
+        service = get_tax_service()
+        monkeypatch.setattr(service, "rate_table", rate_engine.compile_rate_table(service.county_names, str(csv_path)))
+    return apply
+
+
+async def _import(client):
+    response = await client.post("/orders/import", files={"file": ("orders.csv", CSV_CONTENT, "text/csv")})
+    assert response.json()["success_count"] == 3
+
+
+def _create_job(**kwargs) -> str:
+    from app.db.database import SessionLocal
+    from app.services import repricing
+
+    with SessionLocal() as db:
+        job = repricing.new_job(**kwargs)
+        job.rows_total = repricing.count_orders(db, job)
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def _job(job_id: str) -> dict:
+    from app.db.database import SessionLocal
+    from app.db.models.models import RepricingJob
+    from app.services import repricing
+
+    with SessionLocal() as db:
+        return repricing.get_job_progress(db.get(RepricingJob, job_id))
+
+
+def _albany_order():
+    from app.db.database import SessionLocal
+    from app.db.models.models import Order
+
+    with SessionLocal() as db:
+        return db.query(Order).filter(Order.county_fips == "36001").one()
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_diff_without_writing(client, raise_albany_rate):
+    from app.services import repricing
+
+    await _import(client)
+    raise_albany_rate()
+    job_id = _create_job(dry_run=True)
+    repricing.run_repricing_job(job_id)
+
+    job = _job(job_id)
+    assert job["status"] == "completed"
+    assert job["rows_processed"] == 3
+    assert job["rows_changed"] == 1
+    assert job["tax_delta"] == pytest.approx(0.25)
+    assert job["summary"]["counties"] == {"36001": {"changed": 1, "tax_delta": 0.25}}
+    assert job["summary"]["samples"][0]["composite_tax_rate"] == [0.08, 0.085]
+
+    assert _albany_order().tax_amount == pytest.approx(4.0)
+
+
+@pytest.mark.asyncio
+async def test_repricing_updates_orders_and_rollups(client, raise_albany_rate):
+    from app.services import repricing
+
+    await _import(client)
+    raise_albany_rate()
+    job_id = _create_job(chunk_size=2)
+    repricing.run_repricing_job(job_id)
+    assert _job(job_id)["rows_changed"] == 1
+
+    order = _albany_order()
+    assert order.composite_tax_rate == 0.085
+    assert order.tax_amount == 4.25
+    assert order.total_amount == 54.25
+
+    listing = (await client.get("/orders", params={"limit": 50})).json()
+    assert listing["total"] == 3
+    assert listing["total_tax"] == pytest.approx(sum(item["tax_amount"] for item in listing["items"]))
+    albany = next(item for item in listing["items"] if item["id"] == order.id)
+    assert albany["breakdown"]["county_rate"] == pytest.approx(0.045)
+
+    report = (await client.get("/orders/reports/counties")).json()
+    assert {item["county_fips"]: item["tax_sum"] for item in report["items"]}["36001"] == pytest.approx(4.25)
+
+    # Повторний запуск нічого не змінює
+    second = _create_job()
+    repricing.run_repricing_job(second)
+    assert _job(second)["rows_changed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interrupted_job_resumes_from_last_chunk(client, raise_albany_rate):
+    from app.services import repricing
+
+    await _import(client)
+    raise_albany_rate()
+    job_id = _create_job(chunk_size=1)
+
+    def interrupt(job):
+        raise RuntimeError("зупинка воркера")
+
+    repricing.run_repricing_job(job_id, on_chunk=interrupt)
+    job = _job(job_id)
+    assert job["status"] == "failed"
+    assert job["rows_processed"] == 1
+
+    repricing.run_repricing_job(job_id)
+    job = _job(job_id)
+    assert job["status"] == "completed"
+    assert job["rows_processed"] == 3
+    assert job["rows_changed"] == 1
+    assert _albany_order().tax_amount == 4.25
+
+
+@pytest.mark.asyncio
+async def test_missing_county_is_resolved_from_coordinates(client):
+    from sqlalchemy import update
+    from app.db.database import SessionLocal
+    from app.db.models.models import Order
+    from app.services import repricing
+
+    await _import(client)
+    with SessionLocal() as db:
+        db.execute(update(Order).where(Order.subtotal == 50).values(county_fips=None))
+        db.commit()
+
+    job_id = _create_job()
+    repricing.run_repricing_job(job_id)
+    assert _job(job_id)["rows_changed"] == 1
+    assert _albany_order().tax_amount == 4.0
+
+
+@pytest.mark.asyncio
+async def test_reprice_endpoint_runs_in_background(client, raise_albany_rate):
+    await _import(client)
+    raise_albany_rate()
+    response = await client.post("/orders/reprice", params={"dry_run": "true"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    for _ in range(100):
+        job = (await client.get(f"/orders/reprice/{job_id}")).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        await asyncio.sleep(0.1)
+
+    assert job["status"] == "completed"
+    assert job["dry_run"] is True
+    assert job["rows_changed"] == 1
+    assert job["progress"] == 1.0
+    assert (await client.post(f"/orders/reprice/{job_id}/resume")).status_code == 409
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from app.services.tax_service import get_tax_service, CELL_MIXED
+
+
+@pytest.fixture(scope="module")
+def tax_service():
+    return get_tax_service()
+
+
+def test_grid_resolves_manhattan_interior(tax_service):
+    # Центр Мангеттена має потрапляти у внутрішню комірку сітки без точної перевірки
+    code = tax_service._grid_lookup(np.array([40.7831]), np.array([-73.9712]))[0]
+    assert code >= 0
+    assert tax_service.county_names[code] == "New York"
+    assert tax_service._get_county_by_coords(40.7831, -73.9712) == "New York"
+
+
+def test_grid_matches_exact_lookup(tax_service):
+    rng = np.random.default_rng(42)
+    lats = rng.uniform(40.3, 45.2, 2000)
+    lons = rng.uniform(-80.0, -71.5, 2000)
+
+    resolved = tax_service._resolve_county_indices(lats, lons)
+    for lat, lon, idx in zip(lats, lons, resolved):
+        expected = tax_service._get_county_by_coords(lat, lon)
+        actual = tax_service.county_names[idx] if idx >= 0 else None
+        if tax_service._grid_lookup(np.array([lat]), np.array([lon]))[0] != CELL_MIXED:
+            assert actual == expected
+
+
+def test_enrich_dataframe_marks_points_outside_ny(tax_service):
+    df = pd.DataFrame({
+        "latitude": [40.7128, 34.0522],
+        "longitude": [-74.0060, -118.2437],
+        "subtotal": [100.0, 50.0],
+    })
+    valid_df, invalid_df = tax_service.enrich_dataframe_with_taxes(df)
+    assert list(valid_df["county"]) == ["New York"]
+    assert list(invalid_df.index) == [1]
+
+
+def test_parallel_enrichment_preserves_row_order(tax_service, monkeypatch):
+    from app.core.config import settings
+
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        "latitude": rng.uniform(40.4, 45.1, 3000),
+        "longitude": rng.uniform(-79.8, -71.8, 3000),
+        "subtotal": rng.uniform(1, 500, 3000),
+    })
+    expected_valid, expected_invalid = tax_service.enrich_dataframe_with_taxes(df.copy())
+
+    monkeypatch.setattr(settings, "TAX_PARALLEL_WORKERS", 2)
+    monkeypatch.setattr(settings, "TAX_PARALLEL_MIN_ROWS", 1000)
+    valid_df, invalid_df = tax_service.enrich_dataframe_with_taxes(df.copy())
+
+    pd.testing.assert_frame_equal(valid_df, expected_valid)
+    pd.testing.assert_frame_equal(invalid_df, expected_invalid)
+
+
+def test_rate_table_picks_version_in_force(tmp_path):
+    from app.services import rate_engine
+
+    csv_path = tmp_path / "rates.csv"
+    csv_path.write_text(
+        "County,Rate,State,EffectiveFrom,EffectiveTo\n"
+        "Albany,0.07,NY,,2025-03-01\n"
+        "Albany,0.08,NY,2025-03-01,\n"
+        "New York City,0.08875,NY,,\n"
+    )
+    table = rate_engine.compile_rate_table(["Albany", "Kings"], str(csv_path))
+
+    times = rate_engine.to_order_times_ns(pd.to_datetime(["2025-02-28 23:59", "2025-03-01 00:00"], utc=True))
+    versions = table.version_index(times)
+    assert list(table.composite[versions, 0]) == [0.07, 0.08]
+
+    # Боро без власного рядка отримує ставку рядка "New York City"
+    assert table.composite[versions[0], 1] == 0.08875
+    assert table.breakdown(versions[0], 1) == {
+        "state_rate": 0.04, "county_rate": 0.0, "city_rate": 0.045, "special_rates": 0.00375
+    }
+
+
+def test_overlap_points_resolve_to_unbuffered_county(tax_service):
+    from app.core import metrics
+
+    # Точки поблизу меж боро: буферизовані полігони сусідніх округів тут перекриваються
+    rng = np.random.default_rng(3)
+    lats = rng.uniform(40.55, 40.85, 20000)
+    lons = rng.uniform(-74.05, -73.75, 20000)
+    pt_idx, _ = tax_service.spatial_index.query(shapely.points(lons, lats), predicate="intersects")
+    overlap = np.flatnonzero(np.bincount(pt_idx, minlength=len(lats)) > 1)
+    assert len(overlap) > 0
+
+    before = metrics.SPATIAL_AMBIGUOUS_POINTS_TOTAL.value(kind="bulk")
+    resolved = tax_service._resolve_county_indices(lats[overlap], lons[overlap])
+    assert metrics.SPATIAL_AMBIGUOUS_POINTS_TOTAL.value(kind="bulk") - before == len(overlap)
+    assert (resolved >= 0).all()
+
+    for lat, lon, idx in zip(lats[overlap], lons[overlap], resolved):
+        # Одиночний пошук дає той самий округ, що й пакетний
+        assert tax_service._get_county_index(lat, lon) == idx
+        containing = np.flatnonzero(shapely.contains_xy(tax_service.boundaries, lon, lat))
+        if len(containing) == 1:
+            assert idx == containing[0]
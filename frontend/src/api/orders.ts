@@ -1,6 +1,6 @@
 import api from './axiosInstance';
 import axios from 'axios';
-import type { Order, ImportCSVResponse } from '../types/order';
+import type { Order, ImportCSVResponse, ImportJob } from '../types/order';
 
 /**
  * Створює нове замовлення вручну.
@@ -49,6 +49,59 @@ export const importOrdersCSV = async (file: File): Promise<ImportCSVResponse> =>
   }
 };
 
+/**
+ * Запускає фоновий імпорт CSV. Сервер одразу повертає ідентифікатор завдання.
+ * * @param file - Файл у форматі CSV.
+ * @returns Початковий стан завдання імпорту.
+ * @throws {Error} Якщо файл невалідний або сталася помилка завантаження.
+ */
+export const startImportJob = async (file: File): Promise<ImportJob> => {
+  const formData = new FormData();
+  formData.append('file', file);
+
+  try {
+    const response = await api.post<ImportJob>('/orders/import', formData, {
+      params: { background: true },
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  } catch (error: unknown) {
+    if (axios.isAxiosError(error) && error.response?.data?.detail) {
+      throw new Error(String(error.response.data.detail));
+    }
+    throw new Error('Помилка завантаження файлу. Перевірте з\'єднання з сервером.');
+  }
+};
+
+/**
+ * Отримує поточний стан фонового завдання імпорту.
+ * * @param jobId - Ідентифікатор завдання.
+ * @returns Прогрес, кількість оброблених рядків, швидкість та ETA.
+ */
+export const getImportJob = async (jobId: string): Promise<ImportJob> => {
+  const response = await api.get<ImportJob>(`/orders/import/${jobId}`);
+  return response.data;
+};
+
+export type ExportFormat = 'csv' | 'ndjson' | 'parquet';
+
+/**
+ * Завантажує файл експорту замовлень, який сервер формує потоково (без обмеження кількості рядків).
+ * * @param params - Фільтри та сортування, ті самі, що й для списку замовлень.
+ * @param format - Формат файлу: csv, ndjson або parquet.
+ * @returns Вміст файлу.
+ */
+export const exportOrders = async (
+  params: Record<string, string>,
+  format: ExportFormat = 'csv'
+): Promise<Blob> => {
+  const response = await api.get<Blob>('/orders/export', {
+    params: { ...params, format },
+    responseType: 'blob',
+  });
+  return response.data;
+};
+
 /**
  * Очищає базу даних від усіх поточних замовлень.
  * * @throws {Error} Якщо сервер повертає помилку під час видалення.
@@ -1,11 +1,16 @@
 import { useState, useCallback } from 'react';
 import { useDropzone } from 'react-dropzone';
-import { Box, Button, Typography, Paper, CircularProgress, Stack, Alert, AlertTitle, List, ListItem, ListItemText,Dialog, DialogTitle, DialogContent, DialogActions} from '@mui/material';
-import { importOrdersCSV } from '../../api/orders';
+import { Box, Button, Typography, Paper, CircularProgress, Stack, Alert, AlertTitle, List, ListItem, ListItemText,Dialog, DialogTitle, DialogContent, DialogActions, LinearProgress} from '@mui/material';
+import { startImportJob, getImportJob } from '../../api/orders';
 import { toast } from 'react-toastify';
-import type { ImportCSVResponse } from '../../types/order';
+import type { ImportCSVResponse, ImportJob } from '../../types/order';
 import UploadIcon from '@mui/icons-material/Upload';
 
+/** Інтервал опитування стану фонового імпорту (мс). */
+const POLL_INTERVAL_MS = 1000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 /**
  * Компонент для завантаження CSV-файлів із замовленнями.
  * Підтримує drag-and-drop, клієнтську валідацію формату та розміру файлу,
@@ -15,6 +20,7 @@ export const FileUploader = () => {
   const [file, setFile] = useState<File | null>(null);
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState<ImportCSVResponse | null>(null);
+  const [job, setJob] = useState<ImportJob | null>(null);
   const [modalOpen, setModalOpen] = useState(false);
 
   /**
@@ -49,7 +55,7 @@ export const FileUploader = () => {
   });
 
   /**
-   * Відправляє обраний файл на сервер.
+   * Відправляє обраний файл на сервер як фонове завдання та опитує його прогрес.
    * Оновлює стан компонента залежно від успішності операції та кількості помилок у CSV.
    */
   const handleUpload = async () => {
@@ -57,8 +63,25 @@ export const FileUploader = () => {
 
     setLoading(true);
     try {
-      const data = await importOrdersCSV(file);
-      setResult(data);
+      let current = await startImportJob(file);
+      setJob(current);
+
+      while (current.status === 'queued' || current.status === 'running') {
+        await sleep(POLL_INTERVAL_MS);
+        current = await getImportJob(current.job_id);
+        setJob(current);
+      }
+
+      if (current.status === 'failed') {
+        throw new Error(current.detail || 'Помилка під час імпорту');
+      }
+
+      setResult({
+        total_processed: current.rows_processed,
+        success_count: current.success_count,
+        error_count: current.error_count,
+        errors: current.errors,
+      });
       setModalOpen(true);
       setFile(null);
     } catch (error: unknown) {
@@ -66,6 +89,7 @@ export const FileUploader = () => {
       toast.error(errorMessage);
     } finally {
       setLoading(false);
+      setJob(null);
     }
   };
 
@@ -126,6 +150,23 @@ export const FileUploader = () => {
       
       
 
+      {job && (
+        <Box sx={{ mt: 3, width: '100%', maxWidth: 600 }}>
+          <LinearProgress
+            variant={job.status === 'queued' ? 'indeterminate' : 'determinate'}
+            value={job.progress * 100}
+            sx={{ height: 8, borderRadius: 4 }}
+          />
+          <Typography variant="caption" sx={{ color: 'text.secondary', display: 'block', mt: 1, textAlign: 'center' }}>
+            {job.status === 'queued'
+              ? 'Файл у черзі на обробку...'
+              : `Оброблено рядків: ${job.rows_processed}` +
+                (job.rows_per_second ? ` · ${Math.round(job.rows_per_second)} рядків/с` : '') +
+                (job.eta_seconds != null ? ` · залишилось ~${Math.ceil(job.eta_seconds)} с` : '')}
+          </Typography>
+        </Box>
+      )}
+
       <Button
         variant="contained"
         size="large"
@@ -19,7 +19,7 @@ import api from '../api/axiosInstance';
 import { toast } from 'react-toastify';
 import SummaryCard from '../components/SummaryCard';
 import type { Order } from '../types/order';
-import { clearAllOrders } from '../api/orders';
+import { clearAllOrders, exportOrders } from '../api/orders';
 import { OrderRow } from '../components/orders/OrderRow';
 
 type OrderDirection = 'asc' | 'desc';
@@ -114,55 +114,25 @@ export const OrdersListPage = () => {
   const handleExportCSV = async () => {
     setExporting(true);
     try {
-      let url = `http://localhost:8000/orders?page=1&limit=10000&sortBy=${orderBy}&sortOrder=${order}`;
-      if (searchId) url += `&search=${searchId}`;
-      
-      // Для експорту також використовуємо діапазон
-      if (startDate) url += `&start_date=${startDate.toISOString().split('T')[0]}`;
-      if (endDate) url += `&end_date=${endDate.toISOString().split('T')[0]}`;
+      // Файл формує сервер потоково, з тими ж фільтрами, що й у таблиці
+      const params: Record<string, string> = { sortBy: orderBy, sortOrder: order };
+      if (searchId) params.search = searchId;
+      if (startDate) params.start_date = startDate.toISOString().split('T')[0];
+      if (endDate) params.end_date = endDate.toISOString().split('T')[0];
 
-      const response = await api.get(url);
-      const dataToExport: Order[] = response.data.items || [];
-
-      if (dataToExport.length === 0) {
+      if (totalCount === 0) {
         toast.warning("Немає даних для експорту");
         return;
       }
 
-      const headers = [
-        'ID Замовлення', 'Статус', 'Широта (Lat)', 'Довгота (Lon)', 'Сума (Subtotal)', 
-        'Композитна ставка', 'Сума податку', 'Всього до сплати', 
-        'Ставка Штату', 'Ставка Округу', 'Спец. Ставка (MCTD)', 'Юрисдикції'
-      ];
-      const csvRows = [headers.join(',')];
-
-      dataToExport.forEach(o => {
-        const bd = o.breakdown || { state_rate: 0, county_rate: 0, city_rate: 0, special_rates: 0 };
-        const row = [
-          o.id,
-          o.status || 'active', // Додали статус в експорт
-          o.latitude,
-          o.longitude,
-          o.subtotal.toFixed(2),
-          (o.composite_tax_rate || 0).toFixed(5),
-          (o.tax_amount || 0).toFixed(2),
-          (o.total_amount || 0).toFixed(2),
-          bd.state_rate,
-          bd.county_rate,
-          bd.special_rates,
-          `"${(o.jurisdictions || []).join(', ')}"`
-        ];
-        csvRows.push(row.join(','));
-      });
-
-      const csvString = "\uFEFF" + csvRows.join('\n');
-      const blob = new Blob([csvString], { type: 'text/csv;charset=utf-8;' });
+      const blob = await exportOrders(params, 'csv');
       const link = document.createElement('a');
       link.href = URL.createObjectURL(blob);
       link.download = `tax_orders_report_${new Date().toISOString().split('T')[0]}.csv`;
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
+      URL.revokeObjectURL(link.href);
       
       toast.success("Звіт успішно завантажено!");
     } catch (error) {
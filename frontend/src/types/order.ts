@@ -41,11 +41,34 @@ export interface ImportCSVResponse {
   error_count: number;
   /** Детальний перелік помилок у розрізі рядків CSV-файлу. */
   errors: {
-    row: number;
+    row: number | string;
     reason: string;
   }[];
 }
 
+/**
+ * Стан фонового завдання імпорту CSV (відповідь `GET /orders/import/{job_id}`).
+ */
+export interface ImportJob {
+  job_id: string;
+  filename?: string;
+  /** queued | running | completed | failed */
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  /** Частка обробленого файлу (від 0 до 1). */
+  progress: number;
+  rows_processed: number;
+  success_count: number;
+  error_count: number;
+  rows_per_second?: number | null;
+  /** Оцінка часу до завершення у секундах. */
+  eta_seconds?: number | null;
+  errors: {
+    row: number | string;
+    reason: string;
+  }[];
+  detail?: string | null;
+}
+
 /**
  * Структура помилки валідації полів (стандартний формат FastAPI).
  */